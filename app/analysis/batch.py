@@ -0,0 +1,255 @@
+"""
+Headless batch analysis over many job directories.
+
+    python -m app.analysis.batch --output scores.csv
+    python -m app.analysis.batch --jobs-dir /data/boltz_jobs --output scores.parquet
+    python -m app.analysis.batch --job-list ids.txt --output scores.csv
+    python -m app.analysis.batch --output scores.csv JOB_ID [JOB_ID ...]
+
+Each finished job is appended to <output>.jsonl straight away. That
+journal is what makes a run resumable: running the same command again
+skips every job already in it (--retry-failed re-runs the errors). The
+CSV/Parquet table is rebuilt from the journal when the run ends or is
+interrupted.
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from app.analysis import sasa
+from app.analysis.pipeline import CIF_FILENAME, PAE_FILENAME, PREDICTION_SUBDIR, analyze_prediction
+from app.utils import workspace
+
+logger = logging.getLogger("boltz.batch")
+
+DEFAULT_CHUNK_SIZE = 16
+
+# Chunks queued per worker, so a slow chunk never leaves a worker idle
+# while the work list itself stays out of the pool's queue.
+CHUNKS_PER_WORKER = 2
+
+OUTPUT_FORMATS = ("csv", "parquet")
+
+# Leading columns of the output table; metric columns follow, flattened
+# with "." (e.g. protein_ligand_metrics.steric_clashes.clash_score).
+LEADING_COLUMNS = ["job_id", "status", "prediction_type", "seconds", "error"]
+
+
+def discover_jobs(jobs_dir: Path) -> Iterator[str]:
+    """
+    Job directories under jobs_dir that contain a predicted structure.
+    """
+    for entry in sorted(os.scandir(jobs_dir), key=lambda e: e.name):
+        if entry.is_dir() and (Path(entry.path) / PREDICTION_SUBDIR / CIF_FILENAME).exists():
+            yield entry.name
+
+
+def analyze_job_dir(job_dir: Path, staged: bool = False) -> Dict:
+    """
+    One output row; failures are recorded rather than raised.
+    """
+    row = {"job_id": job_dir.name}
+    start = time.perf_counter()
+    cif_path = job_dir / PREDICTION_SUBDIR / CIF_FILENAME
+    pae_path = job_dir / PREDICTION_SUBDIR / PAE_FILENAME
+
+    try:
+        if not cif_path.exists():
+            raise FileNotFoundError(f"CIF file not found for job_id: {job_dir.name}")
+        row.update(analyze_prediction(str(cif_path), str(pae_path) if pae_path.exists() else None, staged))
+        row["status"] = "ok"
+    except Exception as e:
+        row["status"] = "error"
+        row["error"] = f"{type(e).__name__}: {e}"
+
+    row["seconds"] = round(time.perf_counter() - start, 3)
+    return row
+
+
+def analyze_chunk(job_dirs: List[str], staged: bool = False) -> List[Dict]:
+    return [analyze_job_dir(Path(job_dir), staged) for job_dir in job_dirs]
+
+
+def _init_worker(algorithm: Optional[str], resolution: Optional[int]):
+    if algorithm:
+        sasa.SASA_ALGORITHM = algorithm
+    if resolution:
+        sasa.SASA_RESOLUTION = resolution
+
+
+def journal_path(output: Path) -> Path:
+    return output.with_name(output.name + ".jsonl")
+
+
+def read_journal(path: Path) -> Dict[str, Dict]:
+    """
+    Rows by job_id, last one winning. A line cut short by an interrupted
+    write is ignored (that job simply runs again).
+    """
+    rows = {}
+    if not path.exists():
+        return rows
+
+    with open(path) as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            rows[row["job_id"]] = row
+    return rows
+
+
+def output_format(output: Path, fmt: Optional[str] = None) -> str:
+    fmt = fmt or output.suffix.lstrip(".").lower()
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format {fmt!r}; use one of {', '.join(OUTPUT_FORMATS)}")
+    if fmt == "parquet" and not importlib.util.find_spec("pyarrow"):
+        raise RuntimeError("Parquet output requires the 'pyarrow' package (pip install pyarrow)")
+    return fmt
+
+
+def write_table(journal: Path, output: Path, fmt: str) -> int:
+    import pandas as pd
+
+    rows = list(read_journal(journal).values())
+    table = pd.json_normalize(rows, sep=".")
+
+    leading = [c for c in LEADING_COLUMNS if c in table.columns]
+    table = table[leading + sorted(c for c in table.columns if c not in leading)]
+
+    tmp_path = output.with_name(output.name + ".tmp")
+    if fmt == "parquet":
+        table.to_parquet(tmp_path, index=False)
+    else:
+        table.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, output)
+    return len(table)
+
+
+def run_batch(
+    job_ids: List[str],
+    jobs_dir: Path,
+    output: Path,
+    fmt: Optional[str] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    retry_failed: bool = False,
+    sasa_algorithm: Optional[str] = None,
+    sasa_resolution: Optional[int] = None,
+    staged: bool = False,
+) -> Dict:
+    """
+    Analyze job_ids across a process pool, resuming from the journal.
+    """
+    fmt = output_format(output, fmt)
+    workers = workers or os.cpu_count() or 1
+    journal = journal_path(output)
+
+    done = read_journal(journal)
+    pending = [
+        job_id for job_id in dict.fromkeys(job_ids)
+        if job_id not in done or (retry_failed and done[job_id]["status"] != "ok")
+    ]
+    chunks = iter(
+        [str(jobs_dir / job_id) for job_id in pending[i:i + chunk_size]]
+        for i in range(0, len(pending), chunk_size)
+    )
+
+    summary = {"skipped": len(job_ids) - len(pending), "ok": 0, "error": 0}
+    logger.info("%d jobs to analyze, %d already done", len(pending), summary["skipped"])
+
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(sasa_algorithm, sasa_resolution),
+    )
+    in_flight = set()
+
+    def fill():
+        while len(in_flight) < workers * CHUNKS_PER_WORKER:
+            chunk = next(chunks, None)
+            if chunk is None:
+                return
+            in_flight.add(pool.submit(analyze_chunk, chunk, staged))
+
+    try:
+        with open(journal, "a") as out:
+            fill()
+            while in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    in_flight.discard(future)
+                    for row in future.result():
+                        out.write(json.dumps(row) + "\n")
+                        summary[row["status"]] += 1
+                    out.flush()
+                logger.info("%d ok, %d failed", summary["ok"], summary["error"])
+                fill()
+        pool.shutdown()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        if journal.exists():
+            summary["rows"] = write_table(journal, output, fmt)
+
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("job_ids", nargs="*", help="Jobs to analyze (default: every job in --jobs-dir)")
+    parser.add_argument("--jobs-dir", type=Path, default=workspace.BASE_JOBS_DIR)
+    parser.add_argument("--job-list", type=Path, help="File with one job id per line")
+    parser.add_argument("--output", type=Path, required=True, help="Output .csv or .parquet")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--retry-failed", action="store_true")
+    parser.add_argument("--sasa-algorithm", choices=sorted(sasa.SASA_ALGORITHMS))
+    parser.add_argument("--sasa-resolution", type=int)
+    parser.add_argument(
+        "--staged",
+        action="store_true",
+        help="Skip the SASA-based metrics for poses failing the BOLTZ_PREFILTER_* checks",
+    )
+    args = parser.parse_args(argv)
+
+    job_ids = list(args.job_ids)
+    if args.job_list:
+        job_ids += [line.strip() for line in args.job_list.read_text().splitlines() if line.strip()]
+    if not job_ids:
+        job_ids = list(discover_jobs(args.jobs_dir))
+
+    try:
+        output_format(args.output, args.format)
+    except (ValueError, RuntimeError) as e:
+        parser.error(str(e))
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    summary = run_batch(
+        job_ids,
+        args.jobs_dir,
+        args.output,
+        fmt=args.format,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        retry_failed=args.retry_failed,
+        sasa_algorithm=args.sasa_algorithm,
+        sasa_resolution=args.sasa_resolution,
+        staged=args.staged,
+    )
+    logger.info(
+        "done: %d ok, %d failed, %d skipped; %d rows in %s",
+        summary["ok"], summary["error"], summary["skipped"], summary.get("rows", 0), args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
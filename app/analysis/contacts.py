@@ -0,0 +1,183 @@
+"""
+Interface contact maps: residue–residue contacts between chains as
+sparse COO arrays.
+
+A contact map holds, for every pair of residues in different chains with
+any two heavy atoms within the cutoff, the residue indices (row < col)
+and their closest atom distance, plus the residue table needed to slice
+it by chain or entity. It is written once per prediction as an .npz
+next to the structure, so clients can draw interface heatmaps without
+recomputing anything.
+"""
+
+from pathlib import Path
+from typing import Dict, List
+
+DEFAULT_CONTACT_CUTOFF = 5.0
+
+RESIDUE_FIELDS = ("residue_chain", "residue_number", "residue_name", "residue_kind", "residue_entity")
+
+
+def chain_entities(tokenized: Dict) -> Dict[str, int]:
+    """
+    Entity number of each chain; chains with the same residue sequence
+    (copies in a homo-oligomer) share one, as in mmCIF _entity.
+    """
+    sequences: Dict[str, List[str]] = {}
+    for residue in tokenized["residues"]:
+        sequences.setdefault(residue["chain"], []).append(residue["resname"])
+
+    entities: Dict[tuple, int] = {}
+    return {
+        chain: entities.setdefault(tuple(sequence), len(entities) + 1)
+        for chain, sequence in sequences.items()
+    }
+
+
+def build_contact_map(tokenized: Dict, cutoff: float = DEFAULT_CONTACT_CUTOFF) -> Dict:
+    """
+    One KD-tree per chain; every chain pair is searched once and atom
+    pairs are reduced to the minimum distance per residue pair.
+    """
+    import numpy as np
+    from scipy.spatial import cKDTree
+
+    residues = tokenized["residues"]
+    entities = chain_entities(tokenized)
+    residue_chain = np.array([r["chain"] for r in residues])
+    atom_chain = residue_chain[tokenized["atom_residue"]]
+
+    chain_atoms = {chain: np.flatnonzero(atom_chain == chain) for chain in entities}
+    trees = {chain: cKDTree(tokenized["coords"][atoms]) for chain, atoms in chain_atoms.items()}
+
+    atom_i, atom_j, distances = [], [], []
+    chains = list(entities)
+    for a, chain_a in enumerate(chains):
+        for chain_b in chains[a + 1:]:
+            pairs = trees[chain_a].sparse_distance_matrix(trees[chain_b], cutoff, output_type="ndarray")
+            atom_i.append(chain_atoms[chain_a][pairs["i"]])
+            atom_j.append(chain_atoms[chain_b][pairs["j"]])
+            distances.append(pairs["v"])
+
+    if atom_i:
+        res_i = tokenized["atom_residue"][np.concatenate(atom_i)]
+        res_j = tokenized["atom_residue"][np.concatenate(atom_j)]
+        distances = np.concatenate(distances)
+    else:
+        res_i = res_j = np.empty(0, dtype=int)
+        distances = np.empty(0)
+
+    # Chains are parsed in order, so residue indices already satisfy
+    # row < col; sort by pair then distance and keep each pair's first.
+    row, col = np.minimum(res_i, res_j), np.maximum(res_i, res_j)
+    order = np.lexsort((distances, col, row))
+    row, col, distances = row[order], col[order], distances[order]
+    first = np.ones(len(row), dtype=bool)
+    first[1:] = (row[1:] != row[:-1]) | (col[1:] != col[:-1])
+
+    return {
+        "residue_chain": residue_chain,
+        "residue_number": np.array([r["residue_number"] for r in residues], dtype=np.int32),
+        "residue_name": np.array([r["resname"] for r in residues]),
+        "residue_kind": np.array([r["kind"] for r in residues]),
+        "residue_entity": np.array([entities[r["chain"]] for r in residues], dtype=np.int32),
+        "row": row[first].astype(np.int32),
+        "col": col[first].astype(np.int32),
+        "min_distance": distances[first].astype(np.float32),
+        "cutoff": np.float32(cutoff),
+    }
+
+
+def save_contact_map(path: Path, contact_map: Dict) -> Path:
+    import numpy as np
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(f, **contact_map)
+    tmp_path.replace(path)
+    return path
+
+
+def load_contact_map(path: Path) -> Dict:
+    import numpy as np
+
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+def select_contacts(contact_map: Dict, a, b, by: str = "chain", kinds=None) -> Dict:
+    """
+    The block of the map between two chains (or two entities), as COO
+    indices into its own row and column residue lists. Both orientations
+    of the stored upper triangle are folded into rows from a, columns
+    from b; for a == b (e.g. entity 1 with itself in a homodimer) every
+    pair appears once, in stored order.
+    """
+    import numpy as np
+
+    if by not in ("chain", "entity"):
+        raise ValueError(f"Contacts can be selected by chain or entity, not {by!r}")
+
+    labels = contact_map[f"residue_{by}"]
+    if by == "entity":
+        a, b = int(a), int(b)
+
+    in_a = labels == a
+    in_b = labels == b
+    if kinds is not None:
+        kind = np.isin(contact_map["residue_kind"], list(kinds))
+        in_a &= kind
+        in_b &= kind
+    if not in_a.any() or not in_b.any():
+        raise KeyError(f"No residues for {by} {a if not in_a.any() else b}")
+
+    row, col = contact_map["row"], contact_map["col"]
+    forward = in_a[row] & in_b[col]
+    backward = in_b[row] & in_a[col] & ~forward
+    rows = np.concatenate([row[forward], col[backward]])
+    cols = np.concatenate([col[forward], row[backward]])
+    distances = np.concatenate([contact_map["min_distance"][forward], contact_map["min_distance"][backward]])
+
+    row_residues = np.flatnonzero(in_a)
+    col_residues = np.flatnonzero(in_b)
+
+    return {
+        "row_residues": row_residues,
+        "col_residues": col_residues,
+        "row": np.searchsorted(row_residues, rows),
+        "col": np.searchsorted(col_residues, cols),
+        "min_distance": distances,
+    }
+
+
+def residue_labels(contact_map: Dict, indices) -> List[str]:
+    return [
+        f"{contact_map['residue_chain'][i]}:{int(contact_map['residue_number'][i])}:{contact_map['residue_name'][i]}"
+        for i in indices
+    ]
+
+
+def contact_pairs(contact_map: Dict) -> List[Dict]:
+    """
+    Chain pairs that touch, with their number of residue contacts.
+    """
+    import numpy as np
+
+    chains = contact_map["residue_chain"]
+    entity = contact_map["residue_entity"]
+    pairs = np.stack([contact_map["row"], contact_map["col"]], axis=1)
+    chain_pairs, counts = np.unique(
+        np.stack([chains[pairs[:, 0]], chains[pairs[:, 1]]], axis=1), axis=0, return_counts=True
+    ) if len(pairs) else (np.empty((0, 2)), np.empty(0))
+
+    first_residue = {chain: i for i, chain in reversed(list(enumerate(chains)))}
+    return [
+        {
+            "chain_a": str(a),
+            "chain_b": str(b),
+            "entity_a": int(entity[first_residue[a]]),
+            "entity_b": int(entity[first_residue[b]]),
+            "residue_contacts": int(count),
+        }
+        for (a, b), count in zip(chain_pairs, counts)
+    ]
@@ -0,0 +1,177 @@
+"""
+Nucleic-acid engine: helical axis, groove classification and per-base
+protein contact maps.
+
+Every protein–DNA/RNA metric works from one KD-tree query between the
+nucleic and protein atoms of a structure (nucleic_contacts), cached so
+that the electrostatic and groove metrics share it.
+"""
+
+from typing import Dict, Optional
+
+from app.analysis.pocket import STRUCTURE_CACHE_SIZE, protein_contacts
+from app.utils.cache import LRUCache
+
+# Sugar-phosphate atoms (PDB v3 and legacy names)
+BACKBONE_ATOMS = {
+    "P", "OP1", "OP2", "OP3", "O1P", "O2P", "O3P",
+    "O5'", "C5'", "C4'", "O4'", "C3'", "O3'", "C2'", "O2'", "C1'",
+}
+PHOSPHATE_ATOMS = {"P", "OP1", "OP2", "O1P", "O2P"}
+
+# Base atoms by the groove their edge faces. The glycosidic nitrogen and
+# the Watson-Crick edge sit on the sugar side of the base pair and count
+# towards the minor groove.
+MAJOR_GROOVE_ATOMS = {
+    "A": {"N6", "N7", "C8", "C5", "C6"},
+    "G": {"O6", "N7", "C8", "C5", "C6"},
+    "C": {"N4", "C4", "C5", "C6"},
+    "T": {"O4", "C4", "C5", "C6", "C7", "C5M"},
+    "U": {"O4", "C4", "C5", "C6"},
+}
+MINOR_GROOVE_ATOMS = {
+    "A": {"N3", "C2", "C4", "N1", "N9"},
+    "G": {"N2", "N3", "C2", "C4", "N1", "N9"},
+    "C": {"O2", "C2", "N3", "N1"},
+    "T": {"O2", "C2", "N3", "N1"},
+    "U": {"O2", "C2", "N3", "N1"},
+}
+
+CONTACT_CLASSES = ("major_groove", "minor_groove", "backbone")
+
+# Contacts are searched once at this radius and filtered per metric
+CONTACT_SEARCH_RADIUS = 5.0
+
+# Phosphates needed for a meaningful axis fit
+MIN_AXIS_ATOMS = 4
+
+contact_cache = LRUCache(STRUCTURE_CACHE_SIZE)
+
+
+def contact_class(resname: str, atom_name: str) -> Optional[str]:
+    """
+    major_groove, minor_groove or backbone; None for atoms outside the
+    standard base tables.
+    """
+    if atom_name in BACKBONE_ATOMS:
+        return "backbone"
+    base = resname[-1]
+    if atom_name in MAJOR_GROOVE_ATOMS.get(base, ()):
+        return "major_groove"
+    if atom_name in MINOR_GROOVE_ATOMS.get(base, ()):
+        return "minor_groove"
+    return None
+
+
+def helical_axis(tokenized: Dict) -> Dict:
+    """
+    Least-squares helical axis through the phosphates: the centroid and
+    the first right singular vector of the centred coordinates. Needs a
+    helix longer than its ~20 Å diameter (about six base pairs) for the
+    principal direction to be the axis.
+    """
+    import numpy as np
+
+    phosphates = np.flatnonzero(
+        (tokenized["atom_kind"] == "nucleic") & (tokenized["atom_name"] == "P")
+    )
+    if len(phosphates) < MIN_AXIS_ATOMS:
+        raise ValueError("Too few phosphates to fit a helical axis")
+
+    points = tokenized["coords"][phosphates]
+    origin = points.mean(axis=0)
+    _, _, vt = np.linalg.svd(points - origin, full_matrices=False)
+    direction = vt[0]
+
+    _, radius = axis_coordinates(origin, direction, points)
+    return {
+        "origin": origin,
+        "direction": direction,
+        "backbone_radius": float(radius.mean()),
+    }
+
+
+def axis_coordinates(origin, direction, points):
+    """
+    Position along the axis and distance from it, for each point.
+    """
+    import numpy as np
+
+    offset = points - origin
+    along = offset @ direction
+    radius = np.linalg.norm(offset - np.outer(along, direction), axis=1)
+    return along, radius
+
+
+def nucleic_contacts(tokenized: Dict, radius: float = CONTACT_SEARCH_RADIUS) -> Dict:
+    """
+    Every nucleic/protein atom pair within radius, as parallel arrays
+    (nucleic_atoms, protein_atoms, distances, contact_class), cached per
+    structure.
+    """
+    import numpy as np
+
+    key = (tokenized.get("key"), radius)
+    contacts = contact_cache.get(key) if key[0] is not None else None
+    if contacts is not None:
+        return contacts
+
+    nucleic_atoms = np.flatnonzero(tokenized["atom_kind"] == "nucleic")
+    nucleic_idx, protein_idx, distances = protein_contacts(tokenized, nucleic_atoms, radius)
+
+    residues = tokenized["residues"]
+    classes = np.array(
+        [
+            contact_class(residues[tokenized["atom_residue"][atom]]["resname"], tokenized["atom_name"][atom])
+            for atom in nucleic_idx
+        ],
+        dtype=object,
+    )
+
+    contacts = {
+        "nucleic_atoms": nucleic_idx,
+        "protein_atoms": protein_idx,
+        "distances": distances,
+        "contact_class": classes,
+    }
+    if key[0] is not None:
+        contact_cache.put(key, contacts)
+    return contacts
+
+
+def contacts_within(tokenized: Dict, cutoff: float) -> Dict:
+    """
+    nucleic_contacts restricted to cutoff, reusing the shared search
+    whenever cutoff fits inside it.
+    """
+    contacts = nucleic_contacts(tokenized, max(cutoff, CONTACT_SEARCH_RADIUS))
+    within = contacts["distances"] <= cutoff
+    return {name: values[within] for name, values in contacts.items()}
+
+
+def residue_label(residue: Dict) -> str:
+    return f"{residue['chain']}:{residue['residue_number']}"
+
+
+def per_base_contacts(tokenized: Dict, contacts: Dict) -> Dict[str, Dict]:
+    """
+    For each contacted nucleotide: contacts per class, the protein
+    residues touching it and the closest approach.
+    """
+    import numpy as np
+
+    residues = tokenized["residues"]
+    nucleotide = tokenized["atom_residue"][contacts["nucleic_atoms"]]
+    protein_residue = tokenized["atom_residue"][contacts["protein_atoms"]]
+
+    bases = {}
+    for index in np.unique(nucleotide):
+        mask = nucleotide == index
+        classes = contacts["contact_class"][mask]
+        bases[residue_label(residues[index])] = {
+            "resname": residues[index]["resname"],
+            **{name: int((classes == name).sum()) for name in CONTACT_CLASSES},
+            "protein_residues": [residue_label(residues[r]) for r in np.unique(protein_residue[mask])],
+            "min_distance": round(float(contacts["distances"][mask].min()), 3),
+        }
+    return bases
@@ -0,0 +1,187 @@
+"""
+Prediction-type detection and the metric set run for each type, shared
+by POST /analysis/{job_id} and the batch CLI.
+"""
+
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.analysis.protein_ligand import (
+    MIN_LIGAND_ATOMS,
+    detect_prediction_type,
+    compute_ligand_metrics,
+)
+
+from app.analysis.protein_protein import (
+    compute_buried_surface_area,
+    compute_contact_residue_overlap,
+)
+
+from app.analysis.protein_dna_rna import (
+    compute_electrostatic_contact_density,
+    compute_groove_consistency,
+)
+
+from app.analysis.prefilter import run_prefilter
+from app.analysis.summary import load_structure_summary
+
+# Boltz output layout inside a job directory
+PREDICTION_SUBDIR = Path("outputs") / "boltz_results_input" / "predictions" / "input"
+CIF_FILENAME = "input_model_0.cif"
+PAE_FILENAME = "pae_input_model_0.npz"
+CONTACTS_FILENAME = "contacts_input_model_0.npz"
+
+
+def write_contact_artifact(pred_dir: Path) -> Dict:
+    """
+    Build the residue contact map of a prediction, store it next to the
+    structure and return it. The only writer of CONTACTS_FILENAME.
+    """
+    from app.analysis.contacts import build_contact_map, save_contact_map
+    from app.analysis.pocket import load_tokenized_structure
+
+    contact_map = build_contact_map(load_tokenized_structure(str(pred_dir / CIF_FILENAME)))
+    save_contact_map(pred_dir / CONTACTS_FILENAME, contact_map)
+    return contact_map
+
+
+def write_structure_artifacts(pred_dir: Path):
+    """
+    Post-prediction stage: the residue contact map and the structure
+    summary (which takes its interface chain pairs from the map), from a
+    single parse of the structure.
+    """
+    from app.analysis.summary import write_structure_summary
+
+    contact_map = write_contact_artifact(pred_dir)
+    write_structure_summary(pred_dir / CIF_FILENAME, contact_map)
+
+
+def primary_ligand(ligands: dict) -> str:
+    """
+    The ligand reported in the top-level fields: the first with at least
+    MIN_LIGAND_ATOMS heavy atoms (as has_ligand counts them), else the
+    largest.
+    """
+    for key, ligand in ligands.items():
+        if ligand["heavy_atoms"] >= MIN_LIGAND_ATOMS:
+            return key
+    return max(ligands, key=lambda key: ligands[key]["heavy_atoms"])
+
+
+def analyze_prediction(
+    cif_path: str,
+    pae_path: Optional[str] = None,
+    staged: bool = False,
+    thresholds: Optional[Dict] = None,
+) -> dict:
+    """
+    Detect the prediction type and compute its metrics. PAE is required
+    for protein–ligand predictions only.
+
+    Staged, the cheap prefilters run first (with thresholds overriding
+    their defaults) and a pose that fails them is returned without the
+    metrics; either way the response carries a "staged" block.
+    """
+    prediction_type = detect_prediction_type(cif_path)
+    if prediction_type == "protein_ligand" and pae_path is None:
+        raise FileNotFoundError("PAE file not found")
+
+    if not staged:
+        return prediction_metrics(cif_path, prediction_type, pae_path)
+
+    ligand_key = None
+    if prediction_type == "protein_ligand":
+        ligands = load_structure_summary(cif_path)["ligands"]
+        ligand_key = primary_ligand({ligand["key"]: ligand for ligand in ligands})
+
+    prefilter = run_prefilter(cif_path, prediction_type, ligand_key, **(thresholds or {}))
+    if not prefilter["passed"]:
+        return {"prediction_type": prediction_type, "staged": prefilter}
+
+    return {**prediction_metrics(cif_path, prediction_type, pae_path), "staged": prefilter}
+
+
+def prediction_metrics(cif_path: str, prediction_type: str, pae_path: Optional[str] = None) -> dict:
+    """
+    The full metric set of a prediction type.
+    """
+    # -------------------------
+    # Protein–Ligand
+    # -------------------------
+    if prediction_type == "protein_ligand":
+        metrics = compute_ligand_metrics(cif_path, pae_path)
+        primary_key = primary_ligand(metrics["ligands"])
+        primary = metrics["ligands"][primary_key]
+
+        return {
+            "prediction_type": "protein_ligand",
+            "protein_ligand_metrics": {
+                "ligand_burial_percentage": {
+                    "value": primary["burial"]["ligand_burial_percent"],
+                    "units": "percent",
+                    "details": {
+                        "sasa_free_ligand": primary["burial"]["sasa_free_ligand"],
+                        "sasa_bound_ligand": primary["burial"]["sasa_bound_ligand"]
+                    }
+                },
+                "pocket_consistency": primary["pocket"],
+                "steric_clashes": primary["steric_clashes"],
+                "primary_ligand": primary_key,
+                "ligands": metrics["ligands"]
+            }
+        }
+
+    # -------------------------
+    # Protein–Protein
+    # -------------------------
+    elif prediction_type == "protein_protein":
+        bsa = compute_buried_surface_area(cif_path)
+        contacts = compute_contact_residue_overlap(cif_path)
+
+        return {
+            "prediction_type": "protein_protein",
+            "protein_protein_metrics": {
+                "buried_surface_area": {
+                    "value": bsa["buried_surface_area"],
+                    "units": "Å²",
+                    "details": {
+                        "chain_A": bsa["chain_A"],
+                        "chain_B": bsa["chain_B"],
+                        "sasa_chain_A": bsa["sasa_chain_A"],
+                        "sasa_chain_B": bsa["sasa_chain_B"],
+                        "sasa_complex": bsa["sasa_complex"]
+                    }
+                },
+                "contact_residue_overlap": {
+                    "chain_A_contact_residues": contacts["chain_A_contact_residues"],
+                    "chain_B_contact_residues": contacts["chain_B_contact_residues"],
+                    "shared_interface_contacts": contacts["shared_interface_contacts"],
+                    "contact_cutoff_angstrom": contacts["contact_cutoff_angstrom"]
+                }
+            }
+        }
+
+    # -------------------------
+    # Protein–DNA / RNA
+    # -------------------------
+    elif prediction_type == "protein_dna_rna":
+        electro = compute_electrostatic_contact_density(cif_path)
+        groove = compute_groove_consistency(cif_path)
+
+        return {
+            "prediction_type": "protein_dna_rna",
+            "protein_dna_rna_metrics": {
+                "electrostatic_contact_density": electro,
+                "groove_consistency": groove
+            }
+        }
+
+    # -------------------------
+    # Protein-only
+    # -------------------------
+    else:
+        return {
+            "prediction_type": prediction_type,
+            "message": "No analysis metrics implemented for this prediction type."
+        }
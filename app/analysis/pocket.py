@@ -0,0 +1,274 @@
+"""
+Pocket engine: structure tokenization, pocket detection and PAE blocks.
+
+Boltz assigns one token per standard residue (amino acid or nucleotide)
+and one token per heavy atom of anything else (ligands, ions, modified
+residues), in chain order. The PAE matrix is indexed by those tokens, so
+metrics that read it must go through the same mapping rather than
+residue numbers, which restart in every chain.
+"""
+
+import os
+from typing import Dict, List
+
+from app.utils.cache import LRUCache
+
+PROTEIN_RESIDUES = {
+    "ALA","ARG","ASN","ASP","CYS","GLU","GLN","GLY","HIS",
+    "ILE","LEU","LYS","MET","PHE","PRO","SER","THR","TRP",
+    "TYR","VAL"
+}
+
+NUCLEIC_RESIDUES = {
+    "DA","DT","DG","DC",   # DNA
+    "A","U","G","C"       # RNA
+}
+
+# Not ligands; ions still occupy a token each, water none.
+EXCLUDED = {"HOH", "WAT", "NA", "CL", "K", "MG", "ZN", "CA"}
+SOLVENT = {"HOH", "WAT"}
+
+DEFAULT_POCKET_CUTOFF = 4.5
+
+# Parsed structures by (path, mtime, size); prediction outputs do not change
+STRUCTURE_CACHE_SIZE = 32
+
+# Van der Waals radii (Å, Bondi), used for clash cutoffs and as SASA radii
+# for atoms the freesasa classifier does not know.
+VDW_RADII = {
+    "H": 1.20,
+    "C": 1.70,
+    "N": 1.55,
+    "O": 1.52,
+    "F": 1.47,
+    "P": 1.80,
+    "S": 1.80,
+    "CL": 1.75,
+    "BR": 1.85,
+    "I": 1.98,
+    "SE": 1.90,
+    "MG": 1.73,
+    "ZN": 1.39,
+    "NA": 2.27,
+    "K": 2.75,
+    "CA": 2.31,
+    "FE": 1.94,
+}
+
+
+def residue_kind(resname: str) -> str:
+    if resname in PROTEIN_RESIDUES:
+        return "protein"
+    if resname in NUCLEIC_RESIDUES:
+        return "nucleic"
+    if resname in EXCLUDED:
+        return "excluded"
+    return "ligand"
+
+
+structure_cache = LRUCache(STRUCTURE_CACHE_SIZE)
+
+
+def structure_key(cif_path: str):
+    stat = os.stat(cif_path)
+    return (os.path.abspath(cif_path), stat.st_mtime_ns, stat.st_size)
+
+
+def load_tokenized_structure(cif_path: str) -> Dict:
+    """
+    Cached parse_tokenized_structure; callers must not modify the result.
+    """
+    key = structure_key(cif_path)
+    tokenized = structure_cache.get(key)
+    if tokenized is None:
+        tokenized = structure_cache.put(key, {**parse_tokenized_structure(cif_path), "key": key})
+    return tokenized
+
+
+def parse_tokenized_structure(cif_path: str) -> Dict:
+    """
+    Parse the first model of a CIF into flat per-atom arrays.
+
+    Returns coords (N, 3), atom_kind, atom_name, atom_element,
+    atom_residue and atom_token arrays, the residue table (chain, number,
+    name, kind, first token) and the total token count. Hydrogens and
+    water are dropped, as in Boltz.
+    """
+    from Bio.PDB import MMCIFParser
+    import numpy as np
+
+    structure = MMCIFParser(QUIET=True).get_structure("model", cif_path)
+    model = next(structure.get_models())
+
+    coords = []
+    atom_kind = []
+    atom_name = []
+    atom_element = []
+    atom_residue = []
+    atom_token = []
+    residues = []
+    token = 0
+
+    for chain in model:
+        for residue in chain:
+            resname = residue.get_resname().strip()
+            if resname in SOLVENT:
+                continue
+
+            atoms = [a for a in residue.get_atoms() if a.element.strip().upper() != "H"]
+            if not atoms:
+                continue
+
+            kind = residue_kind(resname)
+            residues.append(
+                {
+                    "chain": chain.id,
+                    "residue_number": residue.get_id()[1],
+                    "resname": resname,
+                    "kind": kind,
+                    "token": token,
+                }
+            )
+
+            standard = kind in ("protein", "nucleic")
+            for i, atom in enumerate(atoms):
+                coords.append(atom.coord)
+                atom_kind.append(kind)
+                atom_name.append(atom.get_name().strip())
+                atom_element.append(atom.element.strip().upper())
+                atom_residue.append(len(residues) - 1)
+                atom_token.append(token if standard else token + i)
+
+            token += 1 if standard else len(atoms)
+
+    return {
+        "coords": np.asarray(coords, dtype=float).reshape(-1, 3),
+        "atom_kind": np.asarray(atom_kind),
+        "atom_name": np.asarray(atom_name),
+        "atom_element": np.asarray(atom_element),
+        "atom_residue": np.asarray(atom_residue, dtype=int),
+        "atom_token": np.asarray(atom_token, dtype=int),
+        "residues": residues,
+        "n_tokens": token,
+    }
+
+
+def find_pocket(tokenized: Dict, ligand_atoms, cutoff: float = DEFAULT_POCKET_CUTOFF) -> Dict:
+    """
+    Protein atoms within cutoff of any ligand atom.
+
+    One KD-tree over the ligand, one vectorized nearest-neighbour query
+    for all protein atoms. Returns the pocket atom indices, their distance
+    to the nearest ligand atom, and the pocket residue indices.
+    """
+    import numpy as np
+    from scipy.spatial import cKDTree
+
+    coords = tokenized["coords"]
+    protein_atoms = np.flatnonzero(tokenized["atom_kind"] == "protein")
+
+    if len(ligand_atoms) == 0 or len(protein_atoms) == 0:
+        empty = np.empty(0, dtype=int)
+        return {"atoms": empty, "distances": np.empty(0), "residues": empty}
+
+    tree = cKDTree(coords[ligand_atoms])
+    # nextafter: include atoms at exactly the cutoff
+    distances, _ = tree.query(
+        coords[protein_atoms],
+        distance_upper_bound=np.nextafter(cutoff, np.inf),
+    )
+    within = np.isfinite(distances)
+
+    pocket_atoms = protein_atoms[within]
+    return {
+        "atoms": pocket_atoms,
+        "distances": distances[within],
+        "residues": np.unique(tokenized["atom_residue"][pocket_atoms]),
+    }
+
+
+def ligand_instances(tokenized: Dict) -> List[Dict]:
+    """
+    Each ligand residue with its atom indices, keyed by chain (Boltz puts
+    every ligand in its own chain; the residue number disambiguates
+    chains holding several).
+    """
+    import numpy as np
+
+    ligand_atoms = np.flatnonzero(tokenized["atom_kind"] == "ligand")
+    by_residue = {}
+    for atom in ligand_atoms:
+        by_residue.setdefault(int(tokenized["atom_residue"][atom]), []).append(atom)
+
+    per_chain = {}
+    for index in by_residue:
+        chain = tokenized["residues"][index]["chain"]
+        per_chain[chain] = per_chain.get(chain, 0) + 1
+
+    instances = []
+    for index, atoms in by_residue.items():
+        residue = tokenized["residues"][index]
+        chain = residue["chain"]
+        key = chain if per_chain[chain] == 1 else f"{chain}:{residue['residue_number']}"
+        instances.append(
+            {
+                "key": key,
+                "chain": chain,
+                "resname": residue["resname"],
+                "residue_number": residue["residue_number"],
+                "atoms": np.asarray(atoms, dtype=int),
+            }
+        )
+    return instances
+
+
+def protein_contacts(tokenized: Dict, atoms, radius: float):
+    """
+    All (atom, protein atom, distance) pairs within radius, from one pair
+    of KD-trees, as three parallel arrays.
+    """
+    import numpy as np
+    from scipy.spatial import cKDTree
+
+    coords = tokenized["coords"]
+    protein_atoms = np.flatnonzero(tokenized["atom_kind"] == "protein")
+    atoms = np.asarray(atoms, dtype=int)
+
+    if len(atoms) == 0 or len(protein_atoms) == 0:
+        empty = np.empty(0, dtype=int)
+        return empty, empty, np.empty(0)
+
+    pairs = cKDTree(coords[atoms]).sparse_distance_matrix(
+        cKDTree(coords[protein_atoms]), radius, output_type="ndarray"
+    )
+    return atoms[pairs["i"]], protein_atoms[pairs["j"]], pairs["v"]
+
+
+def pae_blocks(pae, pocket_tokens, ligand_tokens) -> Dict:
+    """
+    Mean PAE of the pocket-internal and pocket/ligand cross blocks.
+
+    pae[i, j] is the expected error at token j when aligned on token i,
+    so the two cross blocks differ and are reported separately.
+    """
+    import numpy as np
+
+    pocket_tokens = np.asarray(pocket_tokens, dtype=int)
+    ligand_tokens = np.asarray(ligand_tokens, dtype=int)
+
+    return {
+        "pocket_internal": float(pae[np.ix_(pocket_tokens, pocket_tokens)].mean()),
+        "pocket_to_ligand": float(pae[np.ix_(pocket_tokens, ligand_tokens)].mean()),
+        "ligand_to_pocket": float(pae[np.ix_(ligand_tokens, pocket_tokens)].mean()),
+    }
+
+
+def load_pae(pae_path: str, n_tokens: int):
+    import numpy as np
+
+    pae = np.load(pae_path)["pae"]
+    if pae.shape[0] != n_tokens:
+        raise ValueError(
+            f"PAE matrix covers {pae.shape[0]} tokens but the structure has {n_tokens}"
+        )
+    return pae
@@ -0,0 +1,224 @@
+"""
+Cheap pose checks run ahead of the SASA-based metrics in staged analysis.
+
+Screens mostly want bad poses thrown away quickly. Whether a ligand is
+near the protein at all, and whether it sits inside it, is answered from
+the structure summary and one small neighbour query. The full metrics
+need a complex SASA run, so a pose that fails here is reported without
+them. Checks run cheapest first and stop at the first failure.
+
+Thresholds default to the BOLTZ_PREFILTER_* settings below and can be
+overridden per call.
+"""
+
+import os
+import time
+from typing import Dict, List, Optional
+
+from app.utils.metrics import ANALYSIS_METRIC_SECONDS, analysis_phase
+
+# Slack around the protein bounding box the ligand's box must touch (Å)
+PREFILTER_BOX_MARGIN = float(os.environ.get("BOLTZ_PREFILTER_BOX_MARGIN", 4.0))
+
+# Farthest the ligand centroid may be from the nearest protein atom (Å)
+PREFILTER_MAX_LIGAND_DISTANCE = float(os.environ.get("BOLTZ_PREFILTER_MAX_LIGAND_DISTANCE", 8.0))
+
+# Most ligand/protein atom pairs closer than scale * (sum of VDW radii)
+PREFILTER_MAX_CLASHES = int(os.environ.get("BOLTZ_PREFILTER_MAX_CLASHES", 10))
+
+# Fewest residue contacts between the two partners of an interface
+PREFILTER_MIN_INTERFACE_CONTACTS = int(os.environ.get("BOLTZ_PREFILTER_MIN_INTERFACE_CONTACTS", 1))
+
+# Metrics a failed prefilter skips, per prediction type
+SKIPPED_METRICS = {
+    "protein_ligand": ["ligand_metrics"],
+    "protein_protein": ["buried_surface_area", "contact_residue_overlap"],
+    "protein_dna_rna": ["electrostatic_contact_density", "groove_consistency"],
+}
+
+# Chain kinds on each side of the interface a prediction type is about
+INTERFACE_KINDS = {
+    "protein_protein": ({"protein"}, {"protein"}),
+    "protein_dna_rna": ({"protein"}, {"dna", "rna"}),
+}
+
+
+def boxes_overlap(a: Dict, b: Dict, margin: float = 0.0) -> bool:
+    return all(
+        a["min"][axis] <= b["max"][axis] + margin and b["min"][axis] <= a["max"][axis] + margin
+        for axis in range(3)
+    )
+
+
+def bounding_box_check(summary: Dict, ligand_chain: str, margin: float) -> Dict:
+    """
+    Does the ligand chain's bounding box come within margin of any protein
+    chain's? Read from the summary: no coordinates needed.
+    """
+    ligand_box = summary["chains"][ligand_chain]["bounding_box"]
+    passed = any(
+        boxes_overlap(ligand_box, chain["bounding_box"], margin)
+        for chain in summary["chains"].values()
+        if chain["kind"] == "protein"
+    )
+    return {"passed": passed, "margin_angstrom": margin}
+
+
+def ligand_distance_check(tokenized: Dict, ligand_atoms, max_distance: float) -> Dict:
+    """
+    Distance from the ligand centroid to the nearest protein atom.
+    """
+    import numpy as np
+
+    coords = tokenized["coords"]
+    protein = coords[tokenized["atom_kind"] == "protein"]
+    centroid = coords[ligand_atoms].mean(axis=0)
+    distance = float(np.sqrt(((protein - centroid) ** 2).sum(axis=1)).min()) if len(protein) else float("inf")
+
+    return {
+        "passed": distance <= max_distance,
+        "value": round(distance, 2),
+        "max_angstrom": max_distance,
+    }
+
+
+def clash_check(tokenized: Dict, ligand_atoms, max_clashes: int, scale: float = 0.75) -> Dict:
+    """
+    Ligand/protein clash count, as compute_ligand_metrics counts it.
+    """
+    from app.analysis.pocket import VDW_RADII, protein_contacts
+    from app.analysis.protein_ligand import clash_cutoffs, steric_clash_summary
+
+    ligand_idx, protein_idx, dist = protein_contacts(
+        tokenized, ligand_atoms, 2 * scale * max(VDW_RADII.values())
+    )
+    cutoffs = clash_cutoffs(tokenized, ligand_idx, protein_idx, scale)
+    clash_count = steric_clash_summary(dist, cutoffs)["clash_count"]
+
+    return {
+        "passed": clash_count <= max_clashes,
+        "clash_count": clash_count,
+        "max_clashes": max_clashes,
+    }
+
+
+def ligand_prefilter(
+    cif_path: str,
+    ligand_key: str,
+    box_margin: Optional[float] = None,
+    max_ligand_distance: Optional[float] = None,
+    max_clashes: Optional[int] = None,
+) -> Dict[str, Dict]:
+    """
+    Bounding-box, centroid-distance and clash checks of one ligand, in
+    that order, stopping at the first that fails.
+    """
+    from app.analysis.pocket import ligand_instances, load_tokenized_structure
+    from app.analysis.summary import load_structure_summary
+
+    summary = load_structure_summary(cif_path)
+    ligand = next(entry for entry in summary["ligands"] if entry["key"] == ligand_key)
+
+    checks = {}
+    with analysis_phase("prefilter", "summary"):
+        checks["bounding_box"] = bounding_box_check(
+            summary, ligand["chain"], PREFILTER_BOX_MARGIN if box_margin is None else box_margin
+        )
+    if not checks["bounding_box"]["passed"]:
+        return checks
+
+    with analysis_phase("prefilter", "parse"):
+        tokenized = load_tokenized_structure(cif_path)
+    atoms = next(inst["atoms"] for inst in ligand_instances(tokenized) if inst["key"] == ligand_key)
+
+    with analysis_phase("prefilter", "neighbor_search"):
+        checks["ligand_distance"] = ligand_distance_check(
+            tokenized, atoms,
+            PREFILTER_MAX_LIGAND_DISTANCE if max_ligand_distance is None else max_ligand_distance,
+        )
+        if checks["ligand_distance"]["passed"]:
+            checks["clashes"] = clash_check(
+                tokenized, atoms, PREFILTER_MAX_CLASHES if max_clashes is None else max_clashes
+            )
+    return checks
+
+
+def interface_prefilter(
+    cif_path: str,
+    prediction_type: str,
+    min_interface_contacts: Optional[int] = None,
+) -> Dict[str, Dict]:
+    """
+    Residue contacts between the partners of a protein–protein or
+    protein–nucleic acid prediction, from the summary's interface pairs.
+    """
+    from app.analysis.summary import load_structure_summary
+
+    minimum = PREFILTER_MIN_INTERFACE_CONTACTS if min_interface_contacts is None else min_interface_contacts
+    side_a, side_b = INTERFACE_KINDS[prediction_type]
+
+    with analysis_phase("prefilter", "summary"):
+        summary = load_structure_summary(cif_path)
+        kind = {chain: entry["kind"] for chain, entry in summary["chains"].items()}
+        contacts = sum(
+            pair["residue_contacts"]
+            for pair in summary["interface_pairs"]
+            if (kind[pair["chain_a"]] in side_a and kind[pair["chain_b"]] in side_b)
+            or (kind[pair["chain_a"]] in side_b and kind[pair["chain_b"]] in side_a)
+        )
+
+    return {
+        "interface_contacts": {
+            "passed": contacts >= minimum,
+            "value": contacts,
+            "min_contacts": minimum,
+        }
+    }
+
+
+def estimated_seconds(metrics: List[str]) -> Optional[float]:
+    """
+    What the given metrics have cost on average in this process, or None
+    before any of them has run.
+    """
+    means = [ANALYSIS_METRIC_SECONDS.mean(metric=metric) for metric in metrics]
+    if any(mean is None for mean in means):
+        return None
+    return sum(means)
+
+
+def run_prefilter(
+    cif_path: str,
+    prediction_type: str,
+    ligand_key: Optional[str] = None,
+    box_margin: Optional[float] = None,
+    max_ligand_distance: Optional[float] = None,
+    max_clashes: Optional[int] = None,
+    min_interface_contacts: Optional[int] = None,
+) -> Dict:
+    """
+    The prefilter block of a staged analysis: every check run, whether the
+    pose passed, and (when it did not) the metrics skipped and the time
+    that saved, estimated from their average cost so far.
+    """
+    start = time.perf_counter()
+    if prediction_type == "protein_ligand":
+        checks = ligand_prefilter(cif_path, ligand_key, box_margin, max_ligand_distance, max_clashes)
+    elif prediction_type in INTERFACE_KINDS:
+        checks = interface_prefilter(cif_path, prediction_type, min_interface_contacts)
+    else:
+        checks = {}
+    elapsed = time.perf_counter() - start
+
+    failed = [name for name, check in checks.items() if not check["passed"]]
+    skipped = SKIPPED_METRICS.get(prediction_type, []) if failed else []
+    saved = estimated_seconds(skipped) if skipped else 0.0
+
+    return {
+        "passed": not failed,
+        "failed_checks": failed,
+        "checks": checks,
+        "prefilter_seconds": round(elapsed, 4),
+        "skipped_metrics": skipped,
+        "estimated_seconds_saved": None if saved is None else round(max(0.0, saved - elapsed), 4),
+    }
@@ -2,137 +2,135 @@
 Protein–DNA / Protein–RNA analysis metrics
 """
 
-from Bio.PDB import MMCIFParser
-import numpy as np
-import math
+from app.utils.metrics import analysis_phase, timed_metric
 
 
-# --- Common residue definitions ---
+def _require_interface(tokenized: dict, message: str):
+    kinds = set(tokenized["atom_kind"])
+    if "protein" not in kinds or "nucleic" not in kinds:
+        raise ValueError(message)
 
-PROTEIN_RESIDUES = {
-    "ALA","ARG","ASN","ASP","CYS","GLU","GLN","GLY","HIS",
-    "ILE","LEU","LYS","MET","PHE","PRO","SER","THR","TRP",
-    "TYR","VAL"
-}
-
-DNA_RNA_RESIDUES = {
-    "DA","DT","DG","DC",   # DNA
-    "A","U","G","C"       # RNA
-}
-
-EXCLUDED = {"HOH", "WAT", "NA", "K", "MG", "ZN", "CA"}
-
-
-def load_structure(cif_path: str):
-    """
-    Load CIF structure safely.
-    """
-    parser = MMCIFParser(QUIET=True)
-    return parser.get_structure("model", cif_path)
 
+@timed_metric("electrostatic_contact_density")
 def compute_electrostatic_contact_density(
     cif_path: str,
     cutoff: float = 4.5
 ) -> dict:
     """
-    Compute electrostatic contact density between protein and DNA/RNA.
+    Compute electrostatic contact density between protein and DNA/RNA:
+    Arg/Lys/His atoms within cutoff of phosphate atoms, per interface
+    residue.
     """
-    structure = load_structure(cif_path)
+    import numpy as np
+    from app.analysis.nucleic import PHOSPHATE_ATOMS, contacts_within
+    from app.analysis.pocket import load_tokenized_structure
 
-    positive_residues = {"ARG", "LYS", "HIS"}
-    phosphate_atoms = {"P", "OP1", "OP2", "O1P", "O2P"}
-
-    protein_atoms = []
-    nucleic_atoms = []
-
-    # --- Separate atoms ---
-    for atom in structure.get_atoms():
-        res = atom.get_parent()
-        resname = res.get_resname().strip()
+    with analysis_phase("electrostatic_contact_density", "parse"):
+        tokenized = load_tokenized_structure(cif_path)
 
-        if resname in positive_residues:
-            protein_atoms.append(atom)
+    positive_residues = {"ARG", "LYS", "HIS"}
 
-        elif resname in DNA_RNA_RESIDUES:
-            if atom.get_name().strip() in phosphate_atoms:
-                nucleic_atoms.append(atom)
+    resnames = np.array([r["resname"] for r in tokenized["residues"]])
+    positive = np.isin(resnames[tokenized["atom_residue"]], list(positive_residues))
+    phosphate = (tokenized["atom_kind"] == "nucleic") & np.isin(tokenized["atom_name"], list(PHOSPHATE_ATOMS))
 
-    if not protein_atoms or not nucleic_atoms:
+    if not positive.any() or not phosphate.any():
         raise ValueError("Insufficient protein or nucleic acid atoms")
 
-    contact_pairs = set()
-    interface_residues = set()
+    with analysis_phase("electrostatic_contact_density", "neighbor_search"):
+        contacts = contacts_within(tokenized, cutoff)
 
-    # --- Distance check ---
-    for p in protein_atoms:
-        for n in nucleic_atoms:
-            dist = np.linalg.norm(p.coord - n.coord)
-            if dist <= cutoff:
-                contact_pairs.add((p.serial_number, n.serial_number))
-                interface_residues.add(p.get_parent().get_id()[1])
+    charged = positive[contacts["protein_atoms"]] & phosphate[contacts["nucleic_atoms"]]
+    contact_pairs = int(charged.sum())
+    interface_residues = len(np.unique(tokenized["atom_residue"][contacts["protein_atoms"][charged]]))
 
-    density = len(contact_pairs) / max(1, len(interface_residues))
+    density = contact_pairs / max(1, interface_residues)
 
     return {
-        "charged_contacts": len(contact_pairs),
-        "interface_residues": len(interface_residues),
+        "charged_contacts": contact_pairs,
+        "interface_residues": interface_residues,
         "electrostatic_contact_density": round(density, 3),
         "distance_cutoff_angstrom": cutoff
     }
 
+@timed_metric("groove_consistency")
 def compute_groove_consistency(
     cif_path: str,
     cutoff: float = 5.0
 ) -> dict:
     """
-    Measure groove consistency by evaluating spatial variance
-    of protein contacts along the nucleic acid backbone.
+    Classify protein contacts as major groove, minor groove or backbone
+    and measure how consistently the protein reads one groove.
+
+    The score is the share of base contacts made in the dominant groove.
+    Insertion depth is how far contacting protein atoms reach inside the
+    phosphate cylinder around the helical axis. With fewer than
+    MIN_AXIS_ATOMS phosphates there is no axis to fit, so the axis
+    fields (helical_axis, insertion depth, axial span) are None.
     """
-    structure = load_structure(cif_path)
-
-    protein_atoms = []
-    nucleic_atoms = []
-
-    # --- Collect atoms ---
-    for atom in structure.get_atoms():
-        res = atom.get_parent()
-        resname = res.get_resname().strip()
-
-        if resname in PROTEIN_RESIDUES:
-            protein_atoms.append(atom)
-        elif resname in DNA_RNA_RESIDUES:
-            nucleic_atoms.append(atom)
-
-    if not protein_atoms or not nucleic_atoms:
-        raise ValueError("Protein or nucleic acid atoms missing")
-
-    contact_vectors = []
-
-    # --- Identify contact vectors ---
-    for p in protein_atoms:
-        for n in nucleic_atoms:
-            dist = np.linalg.norm(p.coord - n.coord)
-            if dist <= cutoff:
-                vec = p.coord - n.coord
-                contact_vectors.append(vec)
-
-    if len(contact_vectors) < 2:
+    import numpy as np
+    from app.analysis.nucleic import (
+        CONTACT_CLASSES,
+        MIN_AXIS_ATOMS,
+        axis_coordinates,
+        contacts_within,
+        helical_axis,
+        per_base_contacts,
+    )
+    from app.analysis.pocket import load_tokenized_structure
+
+    with analysis_phase("groove_consistency", "parse"):
+        tokenized = load_tokenized_structure(cif_path)
+
+    _require_interface(tokenized, "Protein or nucleic acid atoms missing")
+
+    with analysis_phase("groove_consistency", "neighbor_search"):
+        contacts = contacts_within(tokenized, cutoff)
+
+    if len(contacts["distances"]) < 2:
         raise ValueError("Insufficient groove contacts detected")
 
-    contact_vectors = np.array(contact_vectors)
-
-    # Project along principal axis
-    mean_vector = np.mean(contact_vectors, axis=0)
-    deviations = np.linalg.norm(contact_vectors - mean_vector, axis=1)
-
-    std_dev = float(np.std(deviations))
-
-    groove_consistency_score = 1 / (1 + std_dev)
+    phosphates = (tokenized["atom_kind"] == "nucleic") & (tokenized["atom_name"] == "P")
+    axis = None
+    if phosphates.sum() >= MIN_AXIS_ATOMS:
+        with analysis_phase("groove_consistency", "axis"):
+            axis = helical_axis(tokenized)
+            along, radius = axis_coordinates(
+                axis["origin"], axis["direction"], tokenized["coords"][contacts["protein_atoms"]]
+            )
+
+    classes = contacts["contact_class"]
+    counts = {name: int((classes == name).sum()) for name in CONTACT_CLASSES}
+
+    groove_contacts = counts["major_groove"] + counts["minor_groove"]
+    if groove_contacts:
+        dominant = max(("major_groove", "minor_groove"), key=counts.get)
+        groove_consistency_score = counts[dominant] / groove_contacts
+    else:
+        dominant = None
+        groove_consistency_score = 0.0
+
+    insertion_depth = None
+    if axis is not None:
+        depth = axis["backbone_radius"] - radius
+        insertion_depth = {
+            name: round(float(depth[classes == name].mean()), 3)
+            for name in CONTACT_CLASSES
+            if counts[name]
+        }
 
     return {
-        "contact_pairs": len(contact_vectors),
-        "projection_std_dev": round(std_dev, 3),
+        "contact_pairs": len(contacts["distances"]),
+        **{f"{name}_contacts": counts[name] for name in CONTACT_CLASSES},
+        "dominant_groove": dominant,
         "groove_consistency_score": round(groove_consistency_score, 3),
+        "mean_insertion_depth_angstrom": insertion_depth,
+        "axial_span_angstrom": round(float(along.max() - along.min()), 3) if axis else None,
+        "helical_axis": {
+            "origin": [round(float(x), 3) for x in axis["origin"]],
+            "direction": [round(float(x), 4) for x in axis["direction"]],
+            "backbone_radius_angstrom": round(axis["backbone_radius"], 3),
+        } if axis else None,
+        "per_base": per_base_contacts(tokenized, contacts),
         "distance_cutoff_angstrom": cutoff
     }
-
@@ -1,89 +1,57 @@
+from app.utils.metrics import analysis_phase, timed_metric
+
+
+# Smallest residue counted as a true ligand rather than a cap or fragment
+MIN_LIGAND_ATOMS = 8
+
+
 def has_ligand(cif_path: str) -> bool:
     """
     Detect whether a CIF contains a true small-molecule ligand.
     Avoids false positives from modified residues or caps.
     """
-    import freesasa
-    from collections import defaultdict
-
-    structure = freesasa.Structure(cif_path)
-
-    protein_residues = {
-        "ALA","ARG","ASN","ASP","CYS","GLU","GLN","GLY","HIS",
-        "ILE","LEU","LYS","MET","PHE","PRO","SER","THR","TRP",
-        "TYR","VAL"
-    }
-
-    excluded = {"HOH", "WAT", "NA", "CL", "K", "MG", "ZN", "CA"}
-
-    residue_atom_counts = defaultdict(int)
-
-    for i in range(structure.nAtoms()):
-        resname = structure.residueName(i).strip()
-        residue_atom_counts[resname] += 1
+    from app.analysis.summary import load_structure_summary
 
-    for resname, atom_count in residue_atom_counts.items():
-        if resname in protein_residues or resname in excluded:
-            continue
+    ligands = load_structure_summary(cif_path)["ligands"]
+    return any(ligand["heavy_atoms"] >= MIN_LIGAND_ATOMS for ligand in ligands)
 
-        if atom_count >= 8:
-            return True
 
-    return False
+@timed_metric("ligand_burial_percent")
 def compute_ligand_burial_percent(cif_path: str) -> dict:
     """
     Compute ligand burial percentage using SASA difference.
-    """
-    import freesasa
-    from collections import defaultdict
-
-    structure = freesasa.Structure(cif_path)
-
-    protein_residues = {
-        "ALA","ARG","ASN","ASP","CYS","GLU","GLN","GLY","HIS",
-        "ILE","LEU","LYS","MET","PHE","PRO","SER","THR","TRP",
-        "TYR","VAL"
-    }
-
-    excluded = {"HOH", "WAT", "NA", "CL", "K", "MG", "ZN", "CA"}
 
-    residue_atom_map = defaultdict(list)
+    Covers only the first ligand with at least MIN_LIGAND_ATOMS heavy
+    atoms; compute_ligand_metrics reports burial for every ligand.
+    The complex SASA is shared with the other SASA-based metrics; the free
+    ligand is computed from its coordinate array.
+    """
+    from app.analysis.pocket import ligand_instances, load_tokenized_structure
+    from app.analysis.sasa import atom_sasa, complex_sasa
 
-    for i in range(structure.nAtoms()):
-        resname = structure.residueName(i).strip()
-        residue_atom_map[resname].append(i)
+    with analysis_phase("ligand_burial_percent", "parse"):
+        tokenized = load_tokenized_structure(cif_path)
 
-    ligand_resnames = [
-        r for r, atoms in residue_atom_map.items()
-        if r not in protein_residues
-        and r not in excluded
-        and len(atoms) >= 8
+    ligands = [
+        inst for inst in ligand_instances(tokenized)
+        if len(inst["atoms"]) >= MIN_LIGAND_ATOMS
     ]
 
-    if not ligand_resnames:
+    if not ligands:
         raise ValueError("No ligand detected in CIF")
 
-    ligand_atoms = residue_atom_map[ligand_resnames[0]]
-
-    # --- bound SASA ---
-    result_bound = freesasa.calc(structure)
-    sasa_bound = sum(result_bound.atomArea(i) for i in ligand_atoms)
+    ligand_atoms = ligands[0]["atoms"]
 
-    # --- free ligand SASA ---
-    ligand_structure = freesasa.Structure()
+    with analysis_phase("ligand_burial_percent", "sasa"):
+        # --- bound SASA ---
+        bound = complex_sasa(tokenized)
+        sasa_bound = float(bound["areas"][ligand_atoms].sum())
 
-    for i in ligand_atoms:
-        x, y, z = structure.coord(i)
-        ligand_structure.addAtom(
-            structure.atomName(i),
-            structure.residueName(i),
-            structure.chainLabel(i),
-            structure.residueNumber(i),
-            x, y, z
+        # --- free ligand SASA ---
+        sasa_free = float(
+            atom_sasa(tokenized["coords"][ligand_atoms], bound["radii"][ligand_atoms]).sum()
         )
 
-    sasa_free = freesasa.calc(ligand_structure).totalArea()
-
     burial_percent = ((sasa_free - sasa_bound) / sasa_free) * 100
 
     return {
@@ -91,6 +59,7 @@ def compute_ligand_burial_percent(cif_path: str) -> dict:
         "sasa_bound_ligand": round(sasa_bound, 2),
         "ligand_burial_percent": round(burial_percent, 2)
     }
+@timed_metric("pocket_consistency")
 def compute_pocket_consistency(
     cif_path: str,
     pae_path: str,
@@ -98,196 +67,238 @@ def compute_pocket_consistency(
 ) -> dict:
     """
     Pocket consistency based on:
-    - geometric compactness (BioPython)
-    - confidence from PAE
+    - geometric compactness of protein atoms within cutoff of any ligand atom
+    - confidence from the pocket/ligand cross PAE, read by Boltz token index
     """
-    from Bio.PDB import MMCIFParser
     import numpy as np
-    import math
-
-    parser = MMCIFParser(QUIET=True)
-    structure = parser.get_structure("model", cif_path)
-    pae = np.load(pae_path)["pae"]
+    from app.analysis.pocket import find_pocket, load_pae, load_tokenized_structure
 
-    protein_residues = {
-        "ALA","ARG","ASN","ASP","CYS","GLU","GLN","GLY","HIS",
-        "ILE","LEU","LYS","MET","PHE","PRO","SER","THR","TRP",
-        "TYR","VAL"
-    }
-
-    excluded = {"HOH", "WAT", "NA", "K", "MG", "ZN", "CA"}
-
-    protein_atoms = []
-    ligand_atoms = []
+    with analysis_phase("pocket_consistency", "parse"):
+        tokenized = load_tokenized_structure(cif_path)
+        pae = load_pae(pae_path, tokenized["n_tokens"])
 
-    for atom in structure.get_atoms():
-        resname = atom.get_parent().get_resname().strip()
-        if resname in protein_residues:
-            protein_atoms.append(atom)
-        elif resname not in excluded:
-            ligand_atoms.append(atom)
-
-    if not ligand_atoms:
+    ligand_atoms = np.flatnonzero(tokenized["atom_kind"] == "ligand")
+    if len(ligand_atoms) == 0:
         raise ValueError("No ligand found")
 
-    # --- Ligand centroid ---
-    coords = [atom.coord for atom in ligand_atoms]
-    ligand_center = np.mean(coords, axis=0)
-
-    pocket_distances = []
-    pocket_residue_ids = set()
+    with analysis_phase("pocket_consistency", "neighbor_search"):
+        pocket = find_pocket(tokenized, ligand_atoms, cutoff)
 
-    for atom in protein_atoms:
-        dist = np.linalg.norm(atom.coord - ligand_center)
-        if dist <= cutoff:
-            pocket_distances.append(dist)
-            pocket_residue_ids.add(atom.get_parent().get_id()[1])
-
-    if not pocket_distances:
+    if len(pocket["atoms"]) == 0:
         raise ValueError("No pocket residues detected")
 
-    mean_dist = float(np.mean(pocket_distances))
-    std_dev = float(np.std(pocket_distances))
+    return summarize_pocket(tokenized, pocket["distances"], pocket["residues"], ligand_atoms, pae)
 
-    geometric_score = 1 / (1 + std_dev)
 
-    pae_values = []
-    for r in pocket_residue_ids:
-        idx = r - 1
-        if 0 <= idx < pae.shape[0]:
-            pae_values.append(pae[idx, idx])
+def summarize_pocket(tokenized, distances, pocket_residues, ligand_atoms, pae=None) -> dict:
+    """
+    Geometric and (with PAE) confidence scores for one pocket.
+    """
+    import numpy as np
+    from app.analysis.pocket import pae_blocks
 
-    mean_pae = float(np.mean(pae_values))
-    confidence_score = 1 / (1 + mean_pae)
+    mean_dist = float(np.mean(distances))
+    std_dev = float(np.std(distances))
 
-    pocket_consistency = geometric_score * confidence_score
+    geometric_score = 1 / (1 + std_dev)
 
-    return {
-        "pocket_residue_count": len(pocket_residue_ids),
+    summary = {
+        "pocket_residue_count": len(pocket_residues),
         "mean_distance": round(mean_dist, 2),
         "distance_std_dev": round(std_dev, 2),
-        "mean_pocket_pae": round(mean_pae, 2),
         "geometric_score": round(geometric_score, 3),
-        "confidence_score": round(confidence_score, 3),
-        "pocket_consistency_score": round(pocket_consistency, 3)
-    }
-def compute_steric_clashes(
-    cif_path: str,
-    scale: float = 0.75
-) -> dict:
-    """
-    Quantitative steric clash detection between protein and ligand.
-    """
-    from Bio.PDB import MMCIFParser
-    import math
-
-    # Van der Waals radii (Å)
-    VDW = {
-        "H": 1.20,
-        "C": 1.70,
-        "N": 1.55,
-        "O": 1.52,
-        "F": 1.47,
-        "P": 1.80,
-        "S": 1.80,
-        "CL": 1.75,
-        "BR": 1.85,
-        "I": 1.98,
-    }
-
-    protein_residues = {
-        "ALA","ARG","ASN","ASP","CYS","GLU","GLN","GLY","HIS",
-        "ILE","LEU","LYS","MET","PHE","PRO","SER","THR","TRP",
-        "TYR","VAL"
     }
+    if pae is None:
+        return summary
 
-    excluded = {"HOH", "WAT", "NA", "K", "MG", "ZN", "CA"}
-
-    parser = MMCIFParser(QUIET=True)
-    structure = parser.get_structure("model", cif_path)
-
-    protein_atoms = []
-    ligand_atoms = []
+    residue_tokens = np.array([r["token"] for r in tokenized["residues"]])
+    blocks = pae_blocks(
+        pae,
+        residue_tokens[pocket_residues],
+        tokenized["atom_token"][ligand_atoms],
+    )
+    interface_pae = (blocks["pocket_to_ligand"] + blocks["ligand_to_pocket"]) / 2
 
-    for atom in structure.get_atoms():
-        resname = atom.get_parent().get_resname().strip()
+    confidence_score = 1 / (1 + interface_pae)
 
-        if resname in protein_residues:
-            protein_atoms.append(atom)
-        elif resname not in excluded:
-            ligand_atoms.append(atom)
-
-    if not ligand_atoms:
-        raise ValueError("No ligand found")
-
-    clash_count = 0
-    worst_overlap = 0.0
+    pocket_consistency = geometric_score * confidence_score
 
-    for p in protein_atoms:
-        pe = p.element.strip().upper()
-        if pe not in VDW:
-            continue
+    summary.update(
+        {
+            "mean_pocket_pae": round(blocks["pocket_internal"], 2),
+            "mean_interface_pae": round(interface_pae, 2),
+            "pae_blocks": {k: round(v, 2) for k, v in blocks.items()},
+            "confidence_score": round(confidence_score, 3),
+            "pocket_consistency_score": round(pocket_consistency, 3),
+        }
+    )
+    return summary
 
-        for l in ligand_atoms:
-            le = l.element.strip().upper()
-            if le not in VDW:
-                continue
 
-            dx = p.coord[0] - l.coord[0]
-            dy = p.coord[1] - l.coord[1]
-            dz = p.coord[2] - l.coord[2]
-            dist = math.sqrt(dx*dx + dy*dy + dz*dz)
+def clash_cutoffs(tokenized, ligand_idx, protein_idx, scale: float = 0.75):
+    """
+    scale * (sum of VDW radii) of each ligand/protein atom pair; NaN, so
+    never a clash, for elements without a radius.
+    """
+    import numpy as np
+    from app.analysis.pocket import VDW_RADII
 
-            cutoff = scale * (VDW[pe] + VDW[le])
+    vdw = np.array([VDW_RADII.get(e, np.nan) for e in tokenized["atom_element"]])
+    return scale * (vdw[ligand_idx] + vdw[protein_idx])
 
-            if dist < cutoff:
-                clash_count += 1
-                overlap = cutoff - dist
-                worst_overlap = max(worst_overlap, overlap)
 
-    clash_score = min(1.0, clash_count / 20.0)
+def steric_clash_summary(dist, cutoffs) -> dict:
+    """
+    Clash count, worst overlap and a 0-1 clash score of atom pairs at
+    distances dist with clash cutoffs cutoffs.
+    """
+    clashes = dist < cutoffs
+    clash_count = int(clashes.sum())
+    worst_overlap = float((cutoffs - dist)[clashes].max()) if clash_count else 0.0
 
     return {
         "clash_count": clash_count,
         "worst_overlap_angstrom": round(worst_overlap, 3),
-        "clash_score": round(clash_score, 3)
+        "clash_score": round(min(1.0, clash_count / 20.0), 3)
     }
-def detect_prediction_type(cif_path: str) -> str:
+
+
+@timed_metric("ligand_metrics")
+def compute_ligand_metrics(
+    cif_path: str,
+    pae_path: str = None,
+    cutoff: float = 4.5,
+    scale: float = 0.75
+) -> dict:
     """
-    Detect prediction type from CIF.
+    Burial, pocket and steric clashes for every ligand instance, keyed by
+    chain. One parse, one complex SASA run and one protein contact query
+    serve all ligands; nucleotides and ions are not ligands.
     """
-    from Bio.PDB import MMCIFParser
+    import numpy as np
+    from app.analysis.pocket import (
+        VDW_RADII,
+        ligand_instances,
+        load_pae,
+        load_tokenized_structure,
+        protein_contacts,
+    )
+    from app.analysis.sasa import atom_sasa, complex_sasa
+
+    with analysis_phase("ligand_metrics", "parse"):
+        tokenized = load_tokenized_structure(cif_path)
+        pae = load_pae(pae_path, tokenized["n_tokens"]) if pae_path else None
+
+    instances = ligand_instances(tokenized)
+    if not instances:
+        raise ValueError("No ligand found")
 
-    protein_residues = {
-        "ALA","ARG","ASN","ASP","CYS","GLU","GLN","GLY","HIS",
-        "ILE","LEU","LYS","MET","PHE","PRO","SER","THR","TRP",
-        "TYR","VAL"
-    }
+    coords = tokenized["coords"]
+
+    with analysis_phase("ligand_metrics", "sasa"):
+        bound = complex_sasa(tokenized)
+        radii = bound["radii"]
+        free_sasa = [
+            float(atom_sasa(coords[inst["atoms"]], radii[inst["atoms"]]).sum())
+            for inst in instances
+        ]
+
+    ligand_of_atom = np.full(len(coords), -1)
+    for k, inst in enumerate(instances):
+        ligand_of_atom[inst["atoms"]] = k
+
+    # One query covers both the pocket cutoff and the widest clash cutoff
+    radius = max(cutoff, 2 * scale * max(VDW_RADII.values()))
+    with analysis_phase("ligand_metrics", "neighbor_search"):
+        ligand_idx, protein_idx, dist = protein_contacts(
+            tokenized, np.flatnonzero(ligand_of_atom >= 0), radius
+        )
 
-    dna_rna = {"DA","DT","DG","DC","A","U","G","C"}
-    excluded = {"HOH", "WAT", "NA", "K", "MG", "ZN", "CA"}
+    clash_cutoff = clash_cutoffs(tokenized, ligand_idx, protein_idx, scale)
+    pair_ligand = ligand_of_atom[ligand_idx]
+
+    ligands = {}
+    for k, inst in enumerate(instances):
+        mine = pair_ligand == k
+
+        sasa_bound = float(bound["areas"][inst["atoms"]].sum())
+        sasa_free = free_sasa[k]
+        burial_percent = (sasa_free - sasa_bound) / sasa_free * 100 if sasa_free > 0 else 0.0
+
+        # Nearest ligand atom for each pocket atom
+        in_pocket = mine & (dist <= cutoff)
+        order = np.lexsort((dist[in_pocket], protein_idx[in_pocket]))
+        pocket_atoms, first = np.unique(protein_idx[in_pocket][order], return_index=True)
+        if len(pocket_atoms):
+            pocket = summarize_pocket(
+                tokenized,
+                dist[in_pocket][order][first],
+                np.unique(tokenized["atom_residue"][pocket_atoms]),
+                inst["atoms"],
+                pae,
+            )
+        else:
+            pocket = {"pocket_residue_count": 0}
+
+        ligands[inst["key"]] = {
+            "chain": inst["chain"],
+            "resname": inst["resname"],
+            "residue_number": inst["residue_number"],
+            "heavy_atoms": len(inst["atoms"]),
+            "burial": {
+                "sasa_free_ligand": round(sasa_free, 2),
+                "sasa_bound_ligand": round(sasa_bound, 2),
+                "ligand_burial_percent": round(burial_percent, 2)
+            },
+            "pocket": pocket,
+            "steric_clashes": steric_clash_summary(dist[mine], clash_cutoff[mine]),
+        }
 
-    parser = MMCIFParser(QUIET=True)
-    structure = parser.get_structure("model", cif_path)
+    return {
+        "ligand_count": len(ligands),
+        "ligands": ligands,
+    }
+@timed_metric("steric_clashes")
+def compute_steric_clashes(
+    cif_path: str,
+    scale: float = 0.75
+) -> dict:
+    """
+    Steric clashes between the protein and all ligands together, counted
+    as compute_ligand_metrics counts them per ligand.
+    """
+    import numpy as np
+    from app.analysis.pocket import (
+        VDW_RADII,
+        ligand_instances,
+        load_tokenized_structure,
+        protein_contacts,
+    )
+
+    with analysis_phase("steric_clashes", "parse"):
+        tokenized = load_tokenized_structure(cif_path)
+
+    instances = ligand_instances(tokenized)
+    if not instances:
+        raise ValueError("No ligand found")
 
-    chains = set()
-    has_ligand = False
-    has_nucleic = False
+    with analysis_phase("steric_clashes", "neighbor_search"):
+        ligand_idx, protein_idx, dist = protein_contacts(
+            tokenized,
+            np.concatenate([inst["atoms"] for inst in instances]),
+            2 * scale * max(VDW_RADII.values()),
+        )
 
-    for residue in structure.get_residues():
-        resname = residue.get_resname().strip()
-        chains.add(residue.get_parent().id)
+    return steric_clash_summary(dist, clash_cutoffs(tokenized, ligand_idx, protein_idx, scale))
 
-        if resname in dna_rna:
-            has_nucleic = True
-        elif resname not in protein_residues and resname not in excluded:
-            has_ligand = True
 
-    if has_ligand:
-        return "protein_ligand"
-    if has_nucleic:
-        return "protein_dna_rna"
-    if len(chains) > 1:
-        return "protein_protein"
+@timed_metric("detect_prediction_type")
+def detect_prediction_type(cif_path: str) -> str:
+    """
+    Detect prediction type from the structure summary written at job
+    completion (computed from the CIF if there is none).
+    """
+    from app.analysis.summary import load_structure_summary
 
-    return "protein_only"
+    with analysis_phase("detect_prediction_type", "summary"):
+        return load_structure_summary(cif_path)["prediction_type"]
@@ -1,50 +1,40 @@
+from app.utils.metrics import analysis_phase, timed_metric
+
+
+@timed_metric("buried_surface_area")
 def compute_buried_surface_area(cif_path: str) -> dict:
     """
     Compute buried surface area (BSA) for protein–protein complexes.
     BSA = SASA(chain A) + SASA(chain B) − SASA(complex)
-    """
-    import freesasa
-    import tempfile
-    import os
-    from Bio.PDB import MMCIFParser, PDBIO, Select
 
-    class ChainSelect(Select):
-        def __init__(self, chain_id):
-            self.chain_id = chain_id
-
-        def accept_chain(self, chain):
-            return chain.id == self.chain_id
+    The complex SASA is shared with the other SASA-based metrics; each
+    chain is computed from its coordinate array.
+    """
+    import numpy as np
+    from app.analysis.pocket import load_tokenized_structure
+    from app.analysis.sasa import atom_sasa, complex_sasa
 
-    parser = MMCIFParser(QUIET=True)
-    structure = parser.get_structure("model", cif_path)
+    with analysis_phase("buried_surface_area", "parse"):
+        tokenized = load_tokenized_structure(cif_path)
 
-    chains = list(structure.get_chains())
-    if len(chains) < 2:
+    atom_chain = np.array([r["chain"] for r in tokenized["residues"]])[tokenized["atom_residue"]]
+    chain_ids = list(dict.fromkeys(atom_chain))
+    if len(chain_ids) < 2:
         raise ValueError("Protein–protein complex requires at least 2 chains")
 
-    chainA_id = chains[0].id
-    chainB_id = chains[1].id
-
-    io = PDBIO()
-
-    with tempfile.TemporaryDirectory() as tmp:
-        complex_pdb = os.path.join(tmp, "complex.pdb")
-        chainA_pdb = os.path.join(tmp, "chainA.pdb")
-        chainB_pdb = os.path.join(tmp, "chainB.pdb")
+    chainA_id = chain_ids[0]
+    chainB_id = chain_ids[1]
 
-        # Write complex
-        io.set_structure(structure)
-        io.save(complex_pdb)
+    with analysis_phase("buried_surface_area", "sasa"):
+        bound = complex_sasa(tokenized)
+        sasa_complex = float(bound["areas"].sum())
 
-        # Write chain A
-        io.save(chainA_pdb, ChainSelect(chainA_id))
+        def chain_sasa(chain_id):
+            atoms = atom_chain == chain_id
+            return float(atom_sasa(tokenized["coords"][atoms], bound["radii"][atoms]).sum())
 
-        # Write chain B
-        io.save(chainB_pdb, ChainSelect(chainB_id))
-
-        sasa_complex = freesasa.calc(freesasa.Structure(complex_pdb)).totalArea()
-        sasa_A = freesasa.calc(freesasa.Structure(chainA_pdb)).totalArea()
-        sasa_B = freesasa.calc(freesasa.Structure(chainB_pdb)).totalArea()
+        sasa_A = chain_sasa(chainA_id)
+        sasa_B = chain_sasa(chainB_id)
 
     buried_surface_area = (sasa_A + sasa_B) - sasa_complex
 
@@ -57,55 +47,33 @@ def compute_buried_surface_area(cif_path: str) -> dict:
         "buried_surface_area": round(buried_surface_area, 2),
         "units": "Å²"
     }
+@timed_metric("contact_residue_overlap")
 def compute_contact_residue_overlap(
     cif_path: str,
     cutoff: float = 5.0
 ) -> dict:
     """
-    Compute contact residue overlap between two protein chains.
+    Compute contact residue overlap between the first two chains, from
+    the residue contact map (protein residues only).
     """
-    from Bio.PDB import MMCIFParser
     import numpy as np
+    from app.analysis.contacts import build_contact_map, select_contacts
+    from app.analysis.pocket import load_tokenized_structure
 
-    parser = MMCIFParser(QUIET=True)
-    structure = parser.get_structure("model", cif_path)
+    with analysis_phase("contact_residue_overlap", "parse"):
+        tokenized = load_tokenized_structure(cif_path)
 
-    chains = list(structure.get_chains())
+    chains = list(dict.fromkeys(r["chain"] for r in tokenized["residues"]))
     if len(chains) < 2:
         raise ValueError("Protein–protein interface requires at least 2 chains")
 
-    chainA, chainB = chains[0], chains[1]
-
-    contacts_A = set()
-    contacts_B = set()
-    shared_contacts = set()
-
-    for resA in chainA:
-        if not resA.has_id("CA"):
-            continue
-
-        for resB in chainB:
-            if not resB.has_id("CA"):
-                continue
-
-            # Atom-level distance check
-            for atomA in resA.get_atoms():
-                for atomB in resB.get_atoms():
-                    dist = np.linalg.norm(atomA.coord - atomB.coord)
-
-                    if dist <= cutoff:
-                        ida = (chainA.id, resA.get_id()[1])
-                        idb = (chainB.id, resB.get_id()[1])
-
-                        contacts_A.add(ida)
-                        contacts_B.add(idb)
-                        shared_contacts.add((ida, idb))
-                        break
+    with analysis_phase("contact_residue_overlap", "neighbor_search"):
+        contact_map = build_contact_map(tokenized, cutoff)
+        block = select_contacts(contact_map, chains[0], chains[1], kinds={"protein"})
 
     return {
-        "chain_A_contact_residues": len(contacts_A),
-        "chain_B_contact_residues": len(contacts_B),
-        "shared_interface_contacts": len(shared_contacts),
+        "chain_A_contact_residues": len(np.unique(block["row"])),
+        "chain_B_contact_residues": len(np.unique(block["col"])),
+        "shared_interface_contacts": len(block["min_distance"]),
         "contact_cutoff_angstrom": cutoff
     }
-
@@ -0,0 +1,123 @@
+"""
+Solvent accessible surface area from coordinate arrays.
+
+freesasa.Structure reads its input as PDB and, by default, skips HETATM
+records, so ligands in Boltz mmCIF output are easy to lose. Working from
+the parsed coordinates (see pocket.load_tokenized_structure) keeps atom
+indices aligned with every other metric.
+"""
+
+import os
+from typing import Dict, Optional
+
+from app.analysis.pocket import VDW_RADII
+from app.utils.cache import LRUCache
+
+# Used for elements with neither a classifier nor a VdW radius
+DEFAULT_RADIUS = 1.80
+
+SASA_ALGORITHMS = {
+    "lee-richards": "LeeRichards",
+    "shrake-rupley": "ShrakeRupley",
+}
+
+# Accuracy/speed trade-off for bulk screens. Resolution is slices per atom
+# for Lee-Richards (freesasa default 20) or test points per atom for
+# Shrake-Rupley (default 100); lower is faster and coarser.
+SASA_ALGORITHM = os.environ.get("BOLTZ_SASA_ALGORITHM", "lee-richards")
+SASA_RESOLUTION = int(os.environ.get("BOLTZ_SASA_RESOLUTION", 0)) or None
+
+# Complex SASA by (structure, algorithm, resolution)
+SASA_CACHE_SIZE = 32
+
+sasa_cache = LRUCache(SASA_CACHE_SIZE)
+
+
+def sasa_parameters(algorithm: Optional[str] = None, resolution: Optional[int] = None):
+    import freesasa
+
+    algorithm = algorithm or SASA_ALGORITHM
+    if algorithm not in SASA_ALGORITHMS:
+        raise ValueError(f"Unknown SASA algorithm: {algorithm}")
+
+    parameters = freesasa.Parameters()
+    parameters.setAlgorithm(getattr(freesasa, SASA_ALGORITHMS[algorithm]))
+
+    resolution = resolution or SASA_RESOLUTION
+    if resolution:
+        if algorithm == "lee-richards":
+            parameters.setNSlices(resolution)
+        else:
+            parameters.setNPoints(resolution)
+    return parameters
+
+
+def atom_radii(tokenized: Dict):
+    """
+    ProtOr radii (freesasa's default classifier) for standard residues,
+    VdW radii by element for everything else.
+    """
+    import freesasa
+    import numpy as np
+
+    classifier = freesasa.Classifier()
+    known: Dict = {}
+    radii = np.empty(len(tokenized["coords"]))
+
+    resnames = [tokenized["residues"][r]["resname"] for r in tokenized["atom_residue"]]
+    for i, (resname, name, element) in enumerate(
+        zip(resnames, tokenized["atom_name"], tokenized["atom_element"])
+    ):
+        key = (resname, name)
+        radius = known.get(key)
+        if radius is None:
+            radius = classifier.radius(resname, name)
+            if radius <= 0:
+                radius = VDW_RADII.get(element, DEFAULT_RADIUS)
+            known[key] = radius
+        radii[i] = radius
+
+    return radii
+
+
+def atom_sasa(coords, radii, algorithm: Optional[str] = None, resolution: Optional[int] = None):
+    """
+    Per-atom SASA (Å²) for one set of atoms.
+    """
+    import freesasa
+    import numpy as np
+
+    if len(coords) == 0:
+        return np.empty(0)
+
+    result = freesasa.calcCoord(
+        np.ascontiguousarray(coords, dtype=float).ravel(),
+        np.ascontiguousarray(radii, dtype=float),
+        sasa_parameters(algorithm, resolution),
+    )
+    return np.array([result.atomArea(i) for i in range(len(coords))])
+
+
+def complex_sasa(
+    tokenized: Dict,
+    algorithm: Optional[str] = None,
+    resolution: Optional[int] = None,
+) -> Dict:
+    """
+    Radii and per-atom SASA of the whole complex, computed once per
+    structure and shared by every SASA-based metric.
+    """
+    algorithm = algorithm or SASA_ALGORITHM
+    resolution = resolution or SASA_RESOLUTION
+    key = (tokenized.get("key"), algorithm, resolution)
+
+    entry = sasa_cache.get(key) if key[0] is not None else None
+    if entry is None:
+        radii = atom_radii(tokenized)
+        entry = {
+            "radii": radii,
+            "areas": atom_sasa(tokenized["coords"], radii, algorithm, resolution),
+        }
+        if key[0] is not None:
+            sasa_cache.put(key, entry)
+    return entry
@@ -0,0 +1,191 @@
+"""
+Structure summaries: what a prediction contains, computed once.
+
+The summary records the entity map, per-chain residue/atom/token counts
+and bounding boxes, ligand instances, the chain pairs that touch and the
+prediction type. It is written as JSON next to the structure when a job
+completes, so type detection and request routing read a few kilobytes
+instead of parsing the CIF. The CIF's size and mtime are recorded and
+checked, so an edited or replaced structure is summarized afresh.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.utils.cache import LRUCache
+
+# Bumped when the summary layout changes; older files are recomputed
+SUMMARY_VERSION = 1
+
+SUMMARY_CACHE_SIZE = 256
+
+summary_cache = LRUCache(SUMMARY_CACHE_SIZE)
+
+
+def summary_path(cif_path) -> Path:
+    """
+    input_model_0.cif -> summary_input_model_0.json, like Boltz's
+    per-model confidence and PAE files.
+    """
+    cif_path = Path(cif_path)
+    return cif_path.with_name(f"summary_{cif_path.stem}.json")
+
+
+def _source(cif_path) -> Dict:
+    stat = os.stat(cif_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def residue_kind_counts(residues) -> Dict[str, int]:
+    """
+    Residues per kind: protein, dna, rna, ligand or ion.
+    """
+    counts: Dict[str, int] = {}
+    for residue in residues:
+        kind = residue["kind"]
+        if kind == "nucleic":
+            kind = "dna" if residue["resname"].startswith("D") else "rna"
+        elif kind == "excluded":
+            kind = "ion"
+        counts[kind] = counts.get(kind, 0) + 1
+    return counts
+
+
+def chain_kind(counts: Dict[str, int]) -> str:
+    """
+    The chain's kind, ignoring ions bound to a polymer; "mixed" when it
+    holds several (e.g. a peptide with a modified residue).
+    """
+    kinds = set(counts) - {"ion"} or {"ion"}
+    return kinds.pop() if len(kinds) == 1 else "mixed"
+
+
+def classify_prediction(chains: Dict) -> str:
+    """
+    Prediction type from the residue kinds: any ligand residue makes it
+    protein_ligand, then any nucleotide protein_dna_rna, then more than
+    one chain protein_protein.
+    """
+    kinds = {kind for chain in chains.values() for kind in chain["residue_kinds"]}
+    if "ligand" in kinds:
+        return "protein_ligand"
+    if kinds & {"dna", "rna"}:
+        return "protein_dna_rna"
+    if len(chains) > 1:
+        return "protein_protein"
+    return "protein_only"
+
+
+def summarize_structure(tokenized: Dict, contact_map: Optional[Dict] = None) -> Dict:
+    """
+    Summary of a tokenized structure. Interface chain pairs come from the
+    residue contact map, which is built here if not given.
+    """
+    import numpy as np
+    from app.analysis.contacts import build_contact_map, chain_entities, contact_pairs
+    from app.analysis.pocket import ligand_instances
+
+    if contact_map is None:
+        contact_map = build_contact_map(tokenized)
+
+    residues = tokenized["residues"]
+    entities = chain_entities(tokenized)
+    residue_chain = np.array([r["chain"] for r in residues])
+    atom_chain = residue_chain[tokenized["atom_residue"]] if len(residues) else np.empty(0, dtype=str)
+
+    chains = {}
+    for chain, entity in entities.items():
+        chain_residues = [r for r in residues if r["chain"] == chain]
+        atoms = np.flatnonzero(atom_chain == chain)
+        coords = tokenized["coords"][atoms]
+        counts = residue_kind_counts(chain_residues)
+        chains[chain] = {
+            "entity": entity,
+            "kind": chain_kind(counts),
+            "residues": len(chain_residues),
+            "residue_kinds": counts,
+            "atoms": len(atoms),
+            "tokens": len(np.unique(tokenized["atom_token"][atoms])),
+            "bounding_box": {
+                "min": [round(float(v), 3) for v in coords.min(axis=0)],
+                "max": [round(float(v), 3) for v in coords.max(axis=0)],
+            },
+        }
+
+    entity_map = {}
+    for chain, entity in entities.items():
+        entry = entity_map.setdefault(str(entity), {"kind": chains[chain]["kind"], "chains": []})
+        entry["chains"].append(chain)
+
+    return {
+        "version": SUMMARY_VERSION,
+        "prediction_type": classify_prediction(chains),
+        "n_residues": len(residues),
+        "n_atoms": len(tokenized["coords"]),
+        "n_tokens": tokenized["n_tokens"],
+        "entities": entity_map,
+        "chains": chains,
+        "ligands": [
+            {
+                "key": inst["key"],
+                "chain": inst["chain"],
+                "resname": inst["resname"],
+                "residue_number": inst["residue_number"],
+                "heavy_atoms": len(inst["atoms"]),
+            }
+            for inst in ligand_instances(tokenized)
+        ],
+        "interface_pairs": contact_pairs(contact_map),
+        "contact_cutoff_angstrom": float(contact_map["cutoff"]),
+    }
+
+
+def write_structure_summary(cif_path, contact_map: Optional[Dict] = None) -> Dict:
+    """
+    Summarize a structure and store the summary next to it.
+    """
+    from app.analysis.pocket import load_tokenized_structure
+
+    summary = {
+        **summarize_structure(load_tokenized_structure(str(cif_path)), contact_map),
+        "source": _source(cif_path),
+    }
+
+    path = summary_path(cif_path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(summary, f, indent=2)
+    tmp_path.replace(path)
+
+    return summary_cache.put((os.path.abspath(cif_path), summary["source"]["mtime_ns"]), summary)
+
+
+def load_structure_summary(cif_path) -> Dict:
+    """
+    The stored summary of a structure, from memory or its JSON file.
+
+    Structures without a current summary (jobs that finished before
+    summaries were written, or hand-placed CIFs) are summarized from the
+    parsed structure and kept in memory only.
+    """
+    source = _source(cif_path)
+    key = (os.path.abspath(cif_path), source["mtime_ns"])
+    summary = summary_cache.get(key)
+    if summary is not None and summary["source"] == source:
+        return summary
+
+    path = summary_path(cif_path)
+    try:
+        with open(path) as f:
+            summary = json.load(f)
+    except (OSError, ValueError):
+        summary = None
+
+    if summary is None or summary.get("version") != SUMMARY_VERSION or summary.get("source") != source:
+        from app.analysis.pocket import load_tokenized_structure
+
+        summary = {**summarize_structure(load_tokenized_structure(str(cif_path))), "source": source}
+
+    return summary_cache.put(key, summary)
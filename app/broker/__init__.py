@@ -0,0 +1,46 @@
+"""
+Job brokers that split the API tier from the execution tier.
+
+With BOLTZ_BROKER_URL unset, jobs run in-process behind the scheduler.
+Otherwise API replicas only enqueue and `python -m app.worker` processes
+(on any node sharing BASE_JOBS_DIR) run them:
+
+    BOLTZ_BROKER_URL=sqlite:////var/lib/boltz/broker.db
+    BOLTZ_BROKER_URL=redis://redis-host:6379/0
+"""
+
+import os
+from typing import Optional
+
+from app.broker.base import JobBroker
+
+
+def broker_from_url(url: str) -> JobBroker:
+    from app.utils.scheduler import JobScheduler
+
+    # Share the scheduler's fair-share configuration. The tenant cap only
+    # applies when set: the scheduler's default is its own concurrency.
+    config = JobScheduler.from_env()
+    tenant_limit = os.environ.get("BOLTZ_TENANT_MAX_CONCURRENCY")
+    kwargs = {
+        "tenant_weights": config.tenant_weights,
+        "aging_seconds": config.aging_seconds,
+        "tenant_max_concurrency": int(tenant_limit) if tenant_limit else None,
+    }
+
+    if url.startswith("sqlite:///"):
+        from app.broker.local import LocalBroker
+
+        return LocalBroker(url[len("sqlite:///"):], **kwargs)
+
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        from app.broker.redis_broker import RedisBroker
+
+        return RedisBroker(url, **kwargs)
+
+    raise ValueError(f"Unsupported broker URL: {url}")
+
+
+def broker_from_env() -> Optional[JobBroker]:
+    url = os.environ.get("BOLTZ_BROKER_URL")
+    return broker_from_url(url) if url else None
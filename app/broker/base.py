@@ -0,0 +1,133 @@
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+from app.utils.scheduler import DEFAULT_JOB_DURATION_SECONDS, PRIORITY_CLASSES
+
+# Broker-side job states. Terminal states mirror meta.json statuses.
+QUEUED = "QUEUED"
+RUNNING = "RUNNING"
+FINISHED_STATES = {"COMPLETED", "FAILED", "CANCELLED", "TIMED_OUT"}
+
+# heartbeat() outcomes
+RENEWED = "RENEWED"
+CANCEL_REQUESTED = "CANCELLED"
+LEASE_LOST = "LOST"
+
+
+class JobBroker(ABC):
+    """
+    Shared job queue between stateless API replicas and worker processes.
+
+    API replicas enqueue(); workers claim() a job under a lease, renew it
+    with heartbeat() and finish with complete(). Leases that expire (the
+    worker died or lost its node) are put back by requeue_expired().
+
+    Ordering mirrors the in-process scheduler with virtual clocks taken at
+    enqueue time: each (tenant, priority) pair advances its own clock by
+    one nominal job duration / weight per job, and bulk jobs are offset by
+    one aging period, so a bulk job that has waited that long ranks with
+    fresh interactive work.
+
+    claim() skips the jobs of a tenant that already has
+    tenant_max_concurrency jobs running on any worker, as the scheduler
+    does in-process; None leaves tenants uncapped.
+    """
+
+    def __init__(
+        self,
+        tenant_weights: Optional[Dict[str, float]] = None,
+        aging_seconds: float = 600.0,
+        slot_seconds: float = DEFAULT_JOB_DURATION_SECONDS,
+        tenant_max_concurrency: Optional[int] = None,
+    ):
+        self.tenant_weights = tenant_weights or {}
+        self.aging_seconds = aging_seconds
+        self.slot_seconds = slot_seconds
+        self.tenant_max_concurrency = tenant_max_concurrency
+
+    def _next_sort_key(self, tenant_clock: float, tenant: str, priority: str):
+        """
+        Returns (sort_key, new tenant clock) for a job enqueued now.
+        """
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority class: {priority}")
+
+        tag = max(time.time(), tenant_clock)
+        weight = self.tenant_weights.get(tenant, 1.0)
+        sort_key = tag + PRIORITY_CLASSES[priority] * self.aging_seconds
+        return sort_key, tag + self.slot_seconds / weight
+
+    @abstractmethod
+    def enqueue(self, job_id: str, payload: Dict, tenant: str, priority: str):
+        ...
+
+    def enqueue_many(self, jobs: List[Tuple[str, Dict]], tenant: str, priority: str):
+        """
+        enqueue() for many (job_id, payload) pairs of one tenant and
+        priority; brokers override it to batch the writes.
+        """
+        for job_id, payload in jobs:
+            self.enqueue(job_id, payload, tenant, priority)
+
+    @abstractmethod
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[Dict]:
+        """
+        Lease the next job to worker_id. Returns the job record or None.
+        """
+
+    @abstractmethod
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> str:
+        """
+        Extend a lease. Returns RENEWED, CANCEL_REQUESTED if the job was
+        cancelled through the API, or LEASE_LOST if the job is no longer
+        this worker's (it expired and was requeued or finished elsewhere).
+        """
+
+    @abstractmethod
+    def complete(self, job_id: str, worker_id: str, state: str):
+        ...
+
+    @abstractmethod
+    def requeue_expired(self, max_attempts: int = 3) -> Dict[str, List[str]]:
+        """
+        Requeue jobs whose lease expired, or fail them after max_attempts.
+        Jobs whose cancel was pending are cancelled instead. Returns
+        {"requeued": [...], "failed": [...], "cancelled": [...]}.
+        """
+
+    @abstractmethod
+    def cancel(self, job_id: str) -> Optional[str]:
+        """
+        "CANCELLED" if the job was still queued, "CANCELLING" if a worker
+        was asked to stop it, None if unknown or already finished.
+        """
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def queue_info(self, job_id: str) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def stats(self) -> Dict:
+        """
+        Same shape as JobScheduler.stats(); max_concurrency is the number
+        of workers holding or recently holding a lease.
+        """
+
+
+def estimate_start_seconds(position: int, workers: int, running: int, avg_duration: float) -> float:
+    """
+    Rough wait for the job at 1-based queue position: free workers take
+    the head of the queue, the rest wait for running jobs (assumed half
+    done) and then whole job durations.
+    """
+    workers = max(1, workers)
+    free = max(0, workers - running)
+    if position <= free:
+        return 0.0
+    waves = (position - free - 1) // workers
+    return round(avg_duration / 2 + waves * avg_duration, 1)
@@ -0,0 +1,311 @@
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.broker.base import (
+    CANCEL_REQUESTED,
+    FINISHED_STATES,
+    LEASE_LOST,
+    QUEUED,
+    RENEWED,
+    RUNNING,
+    JobBroker,
+    estimate_start_seconds,
+)
+from app.utils.scheduler import DEFAULT_JOB_DURATION_SECONDS, PRIORITY_CLASSES
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    tenant TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    sort_key REAL NOT NULL,
+    state TEXT NOT NULL,
+    worker_id TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_state ON jobs (state, sort_key);
+CREATE INDEX IF NOT EXISTS jobs_by_lease ON jobs (state, lease_expires);
+CREATE INDEX IF NOT EXISTS jobs_by_priority ON jobs (state, priority);
+CREATE TABLE IF NOT EXISTS tenant_clocks (
+    tenant TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    clock REAL NOT NULL,
+    PRIMARY KEY (tenant, priority)
+);
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id TEXT PRIMARY KEY,
+    last_seen REAL NOT NULL
+);
+"""
+
+# Workers not seen for this long no longer count towards capacity.
+WORKER_TTL_SECONDS = 120.0
+
+
+class LocalBroker(JobBroker):
+    """
+    SQLite-backed broker for API and workers sharing one machine (or one
+    local filesystem). Every claim runs in a BEGIN IMMEDIATE transaction,
+    so concurrent workers never lease the same job.
+    """
+
+    def __init__(self, db_path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.db_path = str(db_path)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+        return db
+
+    @contextmanager
+    def _transaction(self):
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    # ---------------------------
+    # Producer side
+    # ---------------------------
+    def enqueue(self, job_id: str, payload: Dict, tenant: str, priority: str):
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT clock FROM tenant_clocks WHERE tenant = ? AND priority = ?",
+                (tenant, priority),
+            ).fetchone()
+            sort_key, clock = self._next_sort_key(row["clock"] if row else 0.0, tenant, priority)
+
+            db.execute(
+                "INSERT OR REPLACE INTO tenant_clocks (tenant, priority, clock) VALUES (?, ?, ?)",
+                (tenant, priority, clock),
+            )
+            db.execute(
+                "INSERT INTO jobs (job_id, payload, tenant, priority, sort_key, state, enqueued_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, json.dumps(payload), tenant, priority, sort_key, QUEUED, time.time()),
+            )
+
+    def enqueue_many(self, jobs: List[Tuple[str, Dict]], tenant: str, priority: str):
+        """
+        One transaction for the whole batch, advancing the tenant clock
+        job by job exactly as single enqueues would.
+        """
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT clock FROM tenant_clocks WHERE tenant = ? AND priority = ?",
+                (tenant, priority),
+            ).fetchone()
+            clock = row["clock"] if row else 0.0
+
+            rows = []
+            now = time.time()
+            for job_id, payload in jobs:
+                sort_key, clock = self._next_sort_key(clock, tenant, priority)
+                rows.append((job_id, json.dumps(payload), tenant, priority, sort_key, QUEUED, now))
+
+            db.execute(
+                "INSERT OR REPLACE INTO tenant_clocks (tenant, priority, clock) VALUES (?, ?, ?)",
+                (tenant, priority, clock),
+            )
+            db.executemany(
+                "INSERT INTO jobs (job_id, payload, tenant, priority, sort_key, state, enqueued_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        with self._transaction() as db:
+            row = db.execute("SELECT state FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None or row["state"] in FINISHED_STATES:
+                return None
+
+            if row["state"] == QUEUED:
+                db.execute(
+                    "UPDATE jobs SET state = 'CANCELLED', finished_at = ? WHERE job_id = ?",
+                    (time.time(), job_id),
+                )
+                return "CANCELLED"
+
+            db.execute("UPDATE jobs SET cancel_requested = 1 WHERE job_id = ?", (job_id,))
+            return "CANCELLING"
+
+    # ---------------------------
+    # Worker side
+    # ---------------------------
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[Dict]:
+        now = time.time()
+        with self._transaction() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO workers (worker_id, last_seen) VALUES (?, ?)",
+                (worker_id, now),
+            )
+            row = db.execute(
+                "SELECT * FROM jobs WHERE state = ? AND tenant NOT IN ("
+                "  SELECT tenant FROM jobs WHERE state = ? AND ? IS NOT NULL"
+                "  GROUP BY tenant HAVING COUNT(*) >= ?"
+                ") ORDER BY sort_key LIMIT 1",
+                (QUEUED, RUNNING, self.tenant_max_concurrency, self.tenant_max_concurrency),
+            ).fetchone()
+            if row is None:
+                return None
+
+            db.execute(
+                "UPDATE jobs SET state = ?, worker_id = ?, lease_expires = ?,"
+                " attempts = attempts + 1, started_at = ? WHERE job_id = ?",
+                (RUNNING, worker_id, now + lease_seconds, now, row["job_id"]),
+            )
+
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["attempts"] += 1
+        return job
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> str:
+        now = time.time()
+        with self._transaction() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO workers (worker_id, last_seen) VALUES (?, ?)",
+                (worker_id, now),
+            )
+            row = db.execute(
+                "SELECT worker_id, state, cancel_requested FROM jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+            if row is None or row["worker_id"] != worker_id or row["state"] != RUNNING:
+                return LEASE_LOST
+            if row["cancel_requested"]:
+                return CANCEL_REQUESTED
+
+            db.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE job_id = ?",
+                (now + lease_seconds, job_id),
+            )
+        return RENEWED
+
+    def complete(self, job_id: str, worker_id: str, state: str):
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE jobs SET state = ?, finished_at = ?, lease_expires = NULL"
+                " WHERE job_id = ? AND worker_id = ? AND state = ?",
+                (state, time.time(), job_id, worker_id, RUNNING),
+            )
+
+    def requeue_expired(self, max_attempts: int = 3) -> Dict[str, List[str]]:
+        now = time.time()
+        result = {"requeued": [], "failed": [], "cancelled": []}
+        with self._transaction() as db:
+            rows = db.execute(
+                "SELECT job_id, attempts, cancel_requested FROM jobs"
+                " WHERE state = ? AND lease_expires < ?",
+                (RUNNING, now),
+            ).fetchall()
+
+            for row in rows:
+                if row["cancel_requested"]:
+                    db.execute(
+                        "UPDATE jobs SET state = 'CANCELLED', finished_at = ? WHERE job_id = ?",
+                        (now, row["job_id"]),
+                    )
+                    result["cancelled"].append(row["job_id"])
+                elif row["attempts"] >= max_attempts:
+                    db.execute(
+                        "UPDATE jobs SET state = 'FAILED', finished_at = ? WHERE job_id = ?",
+                        (now, row["job_id"]),
+                    )
+                    result["failed"].append(row["job_id"])
+                else:
+                    db.execute(
+                        "UPDATE jobs SET state = ?, worker_id = NULL, lease_expires = NULL"
+                        " WHERE job_id = ?",
+                        (QUEUED, row["job_id"]),
+                    )
+                    result["requeued"].append(row["job_id"])
+        return result
+
+    # ---------------------------
+    # Introspection
+    # ---------------------------
+    def get(self, job_id: str) -> Optional[Dict]:
+        row = self._connect().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def stats(self) -> Dict:
+        db = self._connect()
+        counts = dict(
+            db.execute(
+                "SELECT state, COUNT(*) FROM jobs WHERE state IN (?, ?) GROUP BY state",
+                (QUEUED, RUNNING),
+            ).fetchall()
+        )
+        by_priority = dict(
+            db.execute(
+                "SELECT priority, COUNT(*) FROM jobs WHERE state = ? GROUP BY priority", (QUEUED,)
+            ).fetchall()
+        )
+        workers = db.execute(
+            "SELECT COUNT(*) FROM workers WHERE last_seen > ?",
+            (time.time() - WORKER_TTL_SECONDS,),
+        ).fetchone()[0]
+        avg = db.execute(
+            "SELECT AVG(finished_at - started_at) FROM ("
+            " SELECT finished_at, started_at FROM jobs WHERE state = 'COMPLETED'"
+            " ORDER BY finished_at DESC LIMIT 50)"
+        ).fetchone()[0]
+
+        return {
+            "queued": counts.get(QUEUED, 0),
+            "queued_by_priority": {
+                priority: by_priority.get(priority, 0) for priority in PRIORITY_CLASSES
+            },
+            "running": counts.get(RUNNING, 0),
+            "max_concurrency": max(1, workers),
+            "avg_job_duration_seconds": round(avg or DEFAULT_JOB_DURATION_SECONDS, 1),
+        }
+
+    def queue_info(self, job_id: str) -> Optional[Dict]:
+        db = self._connect()
+        row = db.execute(
+            "SELECT sort_key FROM jobs WHERE job_id = ? AND state = ?", (job_id, QUEUED)
+        ).fetchone()
+        if row is None:
+            return None
+
+        position = db.execute(
+            "SELECT COUNT(*) FROM jobs WHERE state = ? AND sort_key <= ?",
+            (QUEUED, row["sort_key"]),
+        ).fetchone()[0]
+        stats = self.stats()
+
+        return {
+            "position": position,
+            "estimated_start_seconds": estimate_start_seconds(
+                position,
+                stats["max_concurrency"],
+                stats["running"],
+                stats["avg_job_duration_seconds"],
+            ),
+        }
@@ -0,0 +1,273 @@
+import json
+import time
+from typing import Dict, List, Optional
+
+from app.broker.base import (
+    CANCEL_REQUESTED,
+    LEASE_LOST,
+    QUEUED,
+    RENEWED,
+    RUNNING,
+    JobBroker,
+    estimate_start_seconds,
+)
+from app.utils.scheduler import DEFAULT_JOB_DURATION_SECONDS, PRIORITY_CLASSES
+
+# Atomically pop the best job and lease it, so a worker crashing between
+# the two steps can never lose a job. With a tenant cap (ARGV[6]), the
+# leases give each tenant's running jobs and the queue is walked in order
+# past the jobs of tenants at the cap.
+CLAIM_SCRIPT = """
+local job_id
+local cap = tonumber(ARGV[6])
+if cap then
+  local running = {}
+  for _, id in ipairs(redis.call('ZRANGE', KEYS[2], 0, -1)) do
+    local tenant = redis.call('HGET', ARGV[3] .. id, 'tenant')
+    if tenant then running[tenant] = (running[tenant] or 0) + 1 end
+  end
+  local offset = 0
+  while not job_id do
+    local page = redis.call('ZRANGE', KEYS[1], offset, offset + 99)
+    if #page == 0 then return false end
+    for _, id in ipairs(page) do
+      if (running[redis.call('HGET', ARGV[3] .. id, 'tenant')] or 0) < cap then
+        job_id = id
+        break
+      end
+    end
+    offset = offset + 100
+  end
+  redis.call('ZREM', KEYS[1], job_id)
+else
+  local popped = redis.call('ZPOPMIN', KEYS[1])
+  if #popped == 0 then return false end
+  job_id = popped[1]
+end
+local key = ARGV[3] .. job_id
+redis.call('ZREM', ARGV[5] .. redis.call('HGET', key, 'priority'), job_id)
+redis.call('HSET', key, 'state', 'RUNNING', 'worker_id', ARGV[1],
+           'lease_expires', ARGV[2], 'started_at', ARGV[4])
+redis.call('HINCRBY', key, 'attempts', 1)
+redis.call('ZADD', KEYS[2], ARGV[2], job_id)
+return job_id
+"""
+
+# Renew only if this worker still owns the job (else 0) and nobody
+# cancelled it (else 2).
+HEARTBEAT_SCRIPT = """
+local key = ARGV[3] .. ARGV[1]
+if redis.call('HGET', key, 'worker_id') ~= ARGV[2]
+   or redis.call('HGET', key, 'state') ~= 'RUNNING' then
+  return 0
+end
+if redis.call('HGET', key, 'cancel_requested') == '1' then
+  return 2
+end
+redis.call('HSET', key, 'lease_expires', ARGV[4])
+redis.call('ZADD', KEYS[1], ARGV[4], ARGV[1])
+return 1
+"""
+
+HEARTBEAT_OUTCOMES = {0: LEASE_LOST, 1: RENEWED, 2: CANCEL_REQUESTED}
+
+WORKER_TTL_SECONDS = 120
+
+
+class RedisBroker(JobBroker):
+    """
+    Broker on any Redis-protocol server, for API replicas and workers
+    spread over several nodes.
+
+    Keys: <prefix>queue (zset by sort key), <prefix>queued:<priority>
+    (the queued jobs of one priority class, for admission), <prefix>leases
+    (zset by lease expiry), <prefix>job:<id> (hash), <prefix>clocks (hash of tenant
+    clocks), <prefix>worker:<id> (expiring liveness key) and
+    <prefix>durations (recent job durations).
+    """
+
+    def __init__(self, url: str, prefix: str = "boltz:", **kwargs):
+        super().__init__(**kwargs)
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                "RedisBroker requires the 'redis' package (pip install redis)"
+            ) from e
+
+        self.redis = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self.queue_key = prefix + "queue"
+        self.class_prefix = prefix + "queued:"
+        self.leases_key = prefix + "leases"
+        self.clocks_key = prefix + "clocks"
+        self.durations_key = prefix + "durations"
+        self._claim = self.redis.register_script(CLAIM_SCRIPT)
+        self._heartbeat = self.redis.register_script(HEARTBEAT_SCRIPT)
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.prefix}job:{job_id}"
+
+    def _seen(self, worker_id: str):
+        self.redis.set(f"{self.prefix}worker:{worker_id}", 1, ex=WORKER_TTL_SECONDS)
+
+    # ---------------------------
+    # Producer side
+    # ---------------------------
+    def enqueue(self, job_id: str, payload: Dict, tenant: str, priority: str):
+        clock_field = f"{tenant}|{priority}"
+        # Clock updates race only between concurrent submissions of the
+        # same tenant, which at worst lets two of its jobs share a slot.
+        clock = float(self.redis.hget(self.clocks_key, clock_field) or 0.0)
+        sort_key, clock = self._next_sort_key(clock, tenant, priority)
+
+        pipe = self.redis.pipeline()
+        pipe.hset(self.clocks_key, clock_field, clock)
+        pipe.hset(
+            self._job_key(job_id),
+            mapping={
+                "payload": json.dumps(payload),
+                "tenant": tenant,
+                "priority": priority,
+                "sort_key": sort_key,
+                "state": QUEUED,
+                "attempts": 0,
+                "cancel_requested": 0,
+                "enqueued_at": time.time(),
+            },
+        )
+        pipe.zadd(self.queue_key, {job_id: sort_key})
+        pipe.zadd(self.class_prefix + priority, {job_id: sort_key})
+        pipe.execute()
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        key = self._job_key(job_id)
+        if self.redis.zrem(self.queue_key, job_id):
+            self.redis.zrem(self.class_prefix + self.redis.hget(key, "priority"), job_id)
+            self.redis.hset(key, mapping={"state": "CANCELLED", "finished_at": time.time()})
+            return "CANCELLED"
+
+        if self.redis.hget(key, "state") == RUNNING:
+            self.redis.hset(key, "cancel_requested", 1)
+            return "CANCELLING"
+
+        return None
+
+    # ---------------------------
+    # Worker side
+    # ---------------------------
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[Dict]:
+        self._seen(worker_id)
+        now = time.time()
+        job_id = self._claim(
+            keys=[self.queue_key, self.leases_key],
+            args=[
+                worker_id,
+                now + lease_seconds,
+                self.prefix + "job:",
+                now,
+                self.class_prefix,
+                "" if self.tenant_max_concurrency is None else self.tenant_max_concurrency,
+            ],
+        )
+        if not job_id:
+            return None
+
+        job = self.get(job_id)
+        job["payload"] = json.loads(job["payload"])
+        return job
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> str:
+        self._seen(worker_id)
+        outcome = self._heartbeat(
+            keys=[self.leases_key],
+            args=[job_id, worker_id, self.prefix + "job:", time.time() + lease_seconds],
+        )
+        return HEARTBEAT_OUTCOMES[int(outcome)]
+
+    def complete(self, job_id: str, worker_id: str, state: str):
+        key = self._job_key(job_id)
+        job = self.redis.hgetall(key)
+        if job.get("worker_id") != worker_id or job.get("state") != RUNNING:
+            return
+
+        now = time.time()
+        pipe = self.redis.pipeline()
+        pipe.hset(key, mapping={"state": state, "finished_at": now})
+        pipe.zrem(self.leases_key, job_id)
+        if state == "COMPLETED":
+            pipe.lpush(self.durations_key, now - float(job["started_at"]))
+            pipe.ltrim(self.durations_key, 0, 49)
+        pipe.execute()
+
+    def requeue_expired(self, max_attempts: int = 3) -> Dict[str, List[str]]:
+        now = time.time()
+        result = {"requeued": [], "failed": [], "cancelled": []}
+
+        for job_id in self.redis.zrangebyscore(self.leases_key, "-inf", now):
+            # Whoever removes the lease entry owns the requeue decision
+            if not self.redis.zrem(self.leases_key, job_id):
+                continue
+
+            key = self._job_key(job_id)
+            job = self.redis.hgetall(key)
+            if job.get("cancel_requested") == "1":
+                self.redis.hset(key, mapping={"state": "CANCELLED", "finished_at": now})
+                result["cancelled"].append(job_id)
+            elif int(job.get("attempts", 0)) >= max_attempts:
+                self.redis.hset(key, mapping={"state": "FAILED", "finished_at": now})
+                result["failed"].append(job_id)
+            else:
+                pipe = self.redis.pipeline()
+                pipe.hset(key, mapping={"state": QUEUED, "worker_id": ""})
+                pipe.zadd(self.queue_key, {job_id: float(job["sort_key"])})
+                pipe.zadd(self.class_prefix + job["priority"], {job_id: float(job["sort_key"])})
+                pipe.execute()
+                result["requeued"].append(job_id)
+
+        return result
+
+    # ---------------------------
+    # Introspection
+    # ---------------------------
+    def get(self, job_id: str) -> Optional[Dict]:
+        job = self.redis.hgetall(self._job_key(job_id))
+        if not job:
+            return None
+        job["job_id"] = job_id
+        job["attempts"] = int(job.get("attempts", 0))
+        return job
+
+    def stats(self) -> Dict:
+        durations = [float(d) for d in self.redis.lrange(self.durations_key, 0, -1)]
+        workers = sum(1 for _ in self.redis.scan_iter(f"{self.prefix}worker:*"))
+
+        return {
+            "queued": self.redis.zcard(self.queue_key),
+            "queued_by_priority": {
+                priority: self.redis.zcard(self.class_prefix + priority) for priority in PRIORITY_CLASSES
+            },
+            "running": self.redis.zcard(self.leases_key),
+            "max_concurrency": max(1, workers),
+            "avg_job_duration_seconds": round(
+                sum(durations) / len(durations) if durations else DEFAULT_JOB_DURATION_SECONDS,
+                1,
+            ),
+        }
+
+    def queue_info(self, job_id: str) -> Optional[Dict]:
+        rank = self.redis.zrank(self.queue_key, job_id)
+        if rank is None:
+            return None
+
+        stats = self.stats()
+        position = rank + 1
+        return {
+            "position": position,
+            "estimated_start_seconds": estimate_start_seconds(
+                position,
+                stats["max_concurrency"],
+                stats["running"],
+                stats["avg_job_duration_seconds"],
+            ),
+        }
@@ -1,17 +1,43 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 
 from app.routers import predict,results
-from app.routers import analysis
+from app.routers import analysis, jobs, metrics, rankings, validation
+from app.utils.warmup import start_warmup, warmup_status
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Scientific libraries load lazily; optionally warm them in the background
+    start_warmup()
+    yield
+
 
 app = FastAPI(
     title="Boltz FastAPI + CLI",
     description="FastAPI service that orchestrates Boltz CLI inference",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.include_router(predict.router)
 app.include_router(analysis.router)
 app.include_router(results.router)
+app.include_router(jobs.router)
+app.include_router(validation.router)
+app.include_router(metrics.router)
+app.include_router(rankings.router)
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+
+@app.get("/ready")
+def readiness_check():
+    status = warmup_status()
+    return JSONResponse(
+        {"status": "ready" if status["ready"] else "warming_up", **status},
+        status_code=200 if status["ready"] else 503,
+    )
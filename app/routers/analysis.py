@@ -1,22 +1,11 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Query
 from pathlib import Path
+from typing import Dict, Optional
 
-from app.analysis.protein_ligand import (
-    detect_prediction_type,
-    compute_ligand_burial_percent,
-    compute_pocket_consistency,
-    compute_steric_clashes,
-)
-
-from app.analysis.protein_protein import (
-    compute_buried_surface_area,
-    compute_contact_residue_overlap,
-)
-
-from app.analysis.protein_dna_rna import (
-    compute_electrostatic_contact_density,
-    compute_groove_consistency,
-)
+from app.analysis.pipeline import CIF_FILENAME, PAE_FILENAME, PREDICTION_SUBDIR, analyze_prediction
+from app.utils.executors import analysis_executor, run_in_executor
+from app.utils.metrics import record_phases
+from app.utils.profiling import SamplingProfiler, is_admin
 
 router = APIRouter(
     prefix="/analysis",
@@ -25,17 +14,11 @@ router = APIRouter(
 
 BASE_JOBS_DIR = Path("/tmp/boltz_jobs")
 
+PROFILE_FILENAME = "analysis_profile.folded"
+
 
 def get_cif_path(job_id: str) -> Path:
-    cif_path = (
-        BASE_JOBS_DIR
-        / job_id
-        / "outputs"
-        / "boltz_results_input"
-        / "predictions"
-        / "input"
-        / "input_model_0.cif"
-    )
+    cif_path = BASE_JOBS_DIR / job_id / PREDICTION_SUBDIR / CIF_FILENAME
 
     if not cif_path.exists():
         raise FileNotFoundError(f"CIF file not found for job_id: {job_id}")
@@ -44,15 +27,7 @@ def get_cif_path(job_id: str) -> Path:
 
 
 def get_pae_path(job_id: str) -> Path:
-    pae_path = (
-        BASE_JOBS_DIR
-        / job_id
-        / "outputs"
-        / "boltz_results_input"
-        / "predictions"
-        / "input"
-        / "pae_input_model_0.npz"
-    )
+    pae_path = BASE_JOBS_DIR / job_id / PREDICTION_SUBDIR / PAE_FILENAME
 
     if not pae_path.exists():
         raise FileNotFoundError("PAE file not found")
@@ -60,100 +35,94 @@ def get_pae_path(job_id: str) -> Path:
     return pae_path
 
 
+def run_analysis(job_id: str, staged: bool = False, thresholds: Optional[Dict] = None) -> dict:
+    """
+    Detect the prediction type and compute its metrics (staged: behind
+    the cheap prefilters).
+    """
+    cif_path = get_cif_path(job_id)
+    try:
+        pae_path = str(get_pae_path(job_id))
+    except FileNotFoundError:
+        pae_path = None
+
+    return {"job_id": job_id, **analyze_prediction(str(cif_path), pae_path, staged, thresholds)}
+
+
+def profile_analysis(job_id: str, **options) -> dict:
+    """
+    run_analysis under the sampling profiler, with a per-metric
+    parse / neighbor_search / sasa breakdown. The folded stacks are also
+    kept in the job directory.
+    """
+    with record_phases() as phases, SamplingProfiler() as profiler:
+        response = run_analysis(job_id, **options)
+
+    folded = profiler.folded()
+    (BASE_JOBS_DIR / job_id / PROFILE_FILENAME).write_text(folded)
+
+    response["profile"] = {
+        "samples": profiler.samples,
+        "interval_seconds": profiler.interval,
+        "phases_seconds": {
+            metric: {phase: round(seconds, 4) for phase, seconds in breakdown.items()}
+            for metric, breakdown in phases.items()
+        },
+        "folded_stacks": folded,
+    }
+    return response
+
+
 @router.post("/{job_id}")
-def analyze_job(job_id: str):
+async def analyze_job(
+    job_id: str,
+    profile: bool = False,
+    staged: bool = False,
+    box_margin: Optional[float] = Query(default=None, ge=0),
+    max_ligand_distance: Optional[float] = Query(default=None, ge=0),
+    max_clashes: Optional[int] = Query(default=None, ge=0),
+    min_interface_contacts: Optional[int] = Query(default=None, ge=0),
+    x_admin_token: Optional[str] = Header(default=None),
+):
     """
     Unified analysis endpoint.
+
+    With ?profile=true (requires X-Admin-Token) the response also carries
+    a flamegraph-compatible profile of the run.
+
+    With ?staged=true a bounding-box/centroid check and a clash count
+    run first; a pose failing them (thresholds from the query, else the
+    BOLTZ_PREFILTER_* defaults) is returned without the SASA-based
+    metrics. The "staged" block reports the checks, the metrics skipped
+    and the estimated time saved.
+
+    The analysis itself runs on the analysis executor.
     """
-    try:
-        cif_path = get_cif_path(job_id)
-        prediction_type = detect_prediction_type(str(cif_path))
-
-        # -------------------------
-        # Protein–Ligand
-        # -------------------------
-        if prediction_type == "protein_ligand":
-            burial = compute_ligand_burial_percent(str(cif_path))
-            pocket = compute_pocket_consistency(
-                str(cif_path),
-                str(get_pae_path(job_id))
+    if profile and not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Profiling requires a valid admin token")
+
+    # Thresholds only apply to staged runs
+    options = {}
+    if staged:
+        options["staged"] = True
+        options["thresholds"] = {
+            name: value
+            for name, value in (
+                ("box_margin", box_margin),
+                ("max_ligand_distance", max_ligand_distance),
+                ("max_clashes", max_clashes),
+                ("min_interface_contacts", min_interface_contacts),
             )
-            clashes = compute_steric_clashes(str(cif_path))
-
-            return {
-                "job_id": job_id,
-                "prediction_type": "protein_ligand",
-                "protein_ligand_metrics": {
-                    "ligand_burial_percentage": {
-                        "value": burial["ligand_burial_percent"],
-                        "units": "percent",
-                        "details": {
-                            "sasa_free_ligand": burial["sasa_free_ligand"],
-                            "sasa_bound_ligand": burial["sasa_bound_ligand"]
-                        }
-                    },
-                    "pocket_consistency": pocket,
-                    "steric_clashes": clashes
-                }
-            }
-
-        # -------------------------
-        # Protein–Protein
-        # -------------------------
-        elif prediction_type == "protein_protein":
-            bsa = compute_buried_surface_area(str(cif_path))
-            contacts = compute_contact_residue_overlap(str(cif_path))
-
-            return {
-                "job_id": job_id,
-                "prediction_type": "protein_protein",
-                "protein_protein_metrics": {
-                    "buried_surface_area": {
-                        "value": bsa["buried_surface_area"],
-                        "units": "Å²",
-                        "details": {
-                            "chain_A": bsa["chain_A"],
-                            "chain_B": bsa["chain_B"],
-                            "sasa_chain_A": bsa["sasa_chain_A"],
-                            "sasa_chain_B": bsa["sasa_chain_B"],
-                            "sasa_complex": bsa["sasa_complex"]
-                        }
-                    },
-                    "contact_residue_overlap": {
-                        "chain_A_contact_residues": contacts["chain_A_contact_residues"],
-                        "chain_B_contact_residues": contacts["chain_B_contact_residues"],
-                        "shared_interface_contacts": contacts["shared_interface_contacts"],
-                        "contact_cutoff_angstrom": contacts["contact_cutoff_angstrom"]
-                    }
-                }
-            }
-
-        # -------------------------
-        # Protein–DNA / RNA
-        # -------------------------
-        elif prediction_type == "protein_dna_rna":
-            electro = compute_electrostatic_contact_density(str(cif_path))
-            groove = compute_groove_consistency(str(cif_path))
-
-            return {
-                "job_id": job_id,
-                "prediction_type": "protein_dna_rna",
-                "protein_dna_rna_metrics": {
-                    "electrostatic_contact_density": electro,
-                    "groove_consistency": groove
-                }
-            }
-
-        # -------------------------
-        # Protein-only
-        # -------------------------
-        else:
-            return {
-                "job_id": job_id,
-                "prediction_type": prediction_type,
-                "message": "No analysis metrics implemented for this prediction type."
-            }
+            if value is not None
+        }
 
+    try:
+        return await run_in_executor(
+            analysis_executor,
+            profile_analysis if profile else run_analysis,
+            job_id,
+            **options,
+        )
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -0,0 +1,354 @@
+import asyncio
+import json
+import uuid
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.schemas.predict import (
+    BatchPredictRequest,
+    PredictComplexRequest,
+    ScreenRequest,
+    ligand_validation_error,
+)
+from app.utils.admission import AdmissionRejected
+from app.utils.batches import batch_job_ids, create_batch, read_results
+from app.utils.jobs import (
+    TERMINAL_STATUSES,
+    admit,
+    admit_batch,
+    cancel_job,
+    enqueue_prediction_job,
+    enqueue_screen,
+    get_log_path,
+    queue_info,
+)
+from app.utils.progress import ProgressTracker, split_lines
+from app.utils.workspace import create_workspace, read_job_meta
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+# Bytes read from the log per poll; together with the per-line cap in
+# split_lines this bounds memory per connection regardless of log size.
+EVENT_CHUNK_BYTES = 64 * 1024
+EVENT_POLL_SECONDS = 0.5
+RESULTS_POLL_SECONDS = 1.0
+
+
+def get_job_meta_or_404(job_id: str) -> dict:
+    try:
+        return read_job_meta(job_id)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+def rejected(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(
+        status_code=e.status_code,
+        detail=e.detail,
+        headers={"Retry-After": str(e.retry_after)} if e.retry_after else None,
+    )
+
+
+# -------------------------------
+# SUBMIT (NON-BLOCKING)
+# -------------------------------
+@router.post("", status_code=202)
+def submit_job(
+    request: PredictComplexRequest,
+    x_tenant_id: str = Header(default="default"),
+):
+    """
+    Queue a Boltz job and return its id immediately.
+    Follow it with GET /jobs/{job_id}/events.
+    """
+    invalid = request.validate_ligands()
+    if invalid:
+        raise ligand_validation_error(invalid)
+
+    try:
+        tokens = admit(request.sequences, request.priority)
+    except AdmissionRejected as e:
+        raise rejected(e)
+
+    job_id = uuid.uuid4().hex
+    workspace = create_workspace(job_id)
+
+    enqueue_prediction_job(
+        job_id, workspace, request, tenant=x_tenant_id, estimated_tokens=tokens
+    )
+
+    return {
+        "job_id": job_id,
+        "status": "QUEUED",
+        "queue": queue_info(job_id),
+    }
+
+
+@router.post("/batch", status_code=202)
+def submit_batch(
+    request: BatchPredictRequest,
+    x_tenant_id: str = Header(default="default"),
+):
+    """
+    Queue a batch of jobs (e.g. a ligand screen) under one id. Each job's
+    result is available from GET /jobs/{batch_id}/results as soon as it
+    finishes.
+    """
+    invalid = request.validate_ligands()
+    if invalid:
+        raise ligand_validation_error(invalid)
+
+    try:
+        tokens = admit_batch(
+            [job.estimated_tokens for job in request.jobs],
+            [job.priority for job in request.jobs],
+        )
+    except AdmissionRejected as e:
+        raise rejected(e)
+
+    batch_id = uuid.uuid4().hex
+    job_ids = [uuid.uuid4().hex for _ in request.jobs]
+    create_batch(batch_id, job_ids, tenant=x_tenant_id)
+
+    for job_id, job, job_tokens in zip(job_ids, request.jobs, tokens):
+        enqueue_prediction_job(
+            job_id,
+            create_workspace(job_id),
+            job,
+            tenant=x_tenant_id,
+            estimated_tokens=job_tokens,
+            batch_id=batch_id,
+        )
+
+    return {
+        "batch_id": batch_id,
+        "status": "RUNNING",
+        "total": len(job_ids),
+        "job_ids": job_ids,
+    }
+
+
+@router.post("/screen", status_code=202)
+def submit_screen(
+    request: ScreenRequest,
+    x_tenant_id: str = Header(default="default"),
+):
+    """
+    Queue a ligand screen: one job per SMILES against the shared entities,
+    as a batch. Built for large screens; see enqueue_screen.
+
+    The SMILES are parsed here, on the route's worker thread, rather than
+    during body parsing on the event loop; invalid ones are reported per
+    ligand as a 422.
+    """
+    invalid = request.validate_ligands()
+    if invalid:
+        raise ligand_validation_error(invalid)
+
+    try:
+        tokens = admit_batch(request.estimated_tokens, [request.priority] * len(request.ligands))
+    except AdmissionRejected as e:
+        raise rejected(e)
+
+    batch_id = uuid.uuid4().hex
+    job_ids = [uuid.uuid4().hex for _ in request.ligands]
+    create_batch(batch_id, job_ids, tenant=x_tenant_id)
+    enqueue_screen(batch_id, job_ids, request, tenant=x_tenant_id, estimated_tokens=tokens)
+
+    return {
+        "batch_id": batch_id,
+        "status": "RUNNING",
+        "total": len(job_ids),
+        "job_ids": job_ids,
+    }
+
+
+# -------------------------------
+# STATUS
+# -------------------------------
+@router.get("/{job_id}")
+async def get_job_status(job_id: str):
+    """
+    Current status and last reported progress of a job, plus queue
+    position and estimated start time while it is waiting.
+    """
+    meta = await asyncio.to_thread(get_job_meta_or_404, job_id)
+
+    if meta.get("status") == "QUEUED":
+        meta["queue"] = await asyncio.to_thread(queue_info, job_id)
+
+    return meta
+
+
+# -------------------------------
+# CANCEL
+# -------------------------------
+@router.delete("/{job_id}")
+def delete_job(job_id: str):
+    """
+    Cancel a pending or running job, or every unfinished job of a batch.
+
+    The Boltz process group is terminated and partial outputs are removed.
+    """
+    meta = get_job_meta_or_404(job_id)
+
+    if meta.get("status") in TERMINAL_STATUSES:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Job already finished with status {meta['status']}",
+        )
+
+    if meta.get("kind") == "batch":
+        # The batch finishes once every job has reported its result
+        for child_id in batch_job_ids(job_id):
+            if read_job_meta(child_id).get("status") not in TERMINAL_STATUSES:
+                cancel_job(child_id)
+        return {"job_id": job_id, "status": "CANCELLING"}
+
+    status = cancel_job(job_id)
+    if status is None:
+        raise HTTPException(
+            status_code=409,
+            detail="Job is finishing and can no longer be cancelled",
+        )
+
+    return {"job_id": job_id, "status": status}
+
+
+# -------------------------------
+# LIVE EVENTS (SSE)
+# -------------------------------
+def _sse(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    message = f"event: {event}\n"
+    if event_id is not None:
+        message += f"id: {event_id}\n"
+    return message + f"data: {json.dumps(data)}\n\n"
+
+
+def _read_log(log_path, offset: int) -> bytes:
+    if not log_path.exists():
+        return b""
+    with open(log_path, "rb") as f:
+        f.seek(offset)
+        return f.read(EVENT_CHUNK_BYTES)
+
+
+async def follow_job_events(job_id: str, offset: int = 0):
+    """
+    Tail boltz.log from a byte offset, emitting log/progress events until
+    the job reaches a terminal status.
+
+    Event ids are log offsets, so a client reconnecting with Last-Event-ID
+    resumes exactly after the last line it received. Waiting between polls
+    happens on the event loop; only the reads borrow a thread.
+    """
+    log_path = get_log_path(job_id)
+    tracker = ProgressTracker()
+    pending = b""
+
+    meta = await asyncio.to_thread(read_job_meta, job_id)
+    yield _sse("status", {"status": meta.get("status"), "progress": meta.get("progress")})
+
+    while True:
+        # Read status before the log: a terminal status then guarantees the
+        # log read below already contains all output.
+        meta = await asyncio.to_thread(read_job_meta, job_id)
+
+        chunk = await asyncio.to_thread(_read_log, log_path, offset + len(pending))
+
+        if chunk:
+            lines, rest = split_lines(pending + chunk)
+            for line, end in lines:
+                text = line.decode("utf-8", errors="replace").strip()
+                if not text:
+                    continue
+                yield _sse("log", {"line": text}, offset + end)
+                progress = tracker.feed(text)
+                if progress is not None:
+                    yield _sse("progress", progress, offset + end)
+
+            offset += len(pending) + len(chunk) - len(rest)
+            pending = rest
+            continue
+
+        if meta.get("status") in TERMINAL_STATUSES:
+            text = pending.decode("utf-8", errors="replace").strip()
+            if text:
+                yield _sse("log", {"line": text}, offset + len(pending))
+            yield _sse("status", {"status": meta.get("status"), "error": meta.get("error")})
+            return
+
+        await asyncio.sleep(EVENT_POLL_SECONDS)
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(job_id: str, last_event_id: Optional[int] = Header(default=None)):
+    """
+    Server-Sent Events stream of a job's log lines and progress.
+    """
+    await asyncio.to_thread(get_job_meta_or_404, job_id)
+
+    return StreamingResponse(
+        follow_job_events(job_id, offset=last_event_id or 0),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+# -------------------------------
+# RESULTS (NDJSON)
+# -------------------------------
+async def follow_job_results(job_id: str, cursor: int = 0):
+    """
+    One NDJSON line per finished job, in completion order, until the job
+    (or every job of the batch) has finished.
+
+    Each line carries the cursor after it; a consumer reconnecting with
+    ?cursor= resumes after the last line it received.
+    """
+    while True:
+        # Status before results, as in follow_job_events: once terminal,
+        # every line has been written.
+        meta = await asyncio.to_thread(read_job_meta, job_id)
+        lines, cursor = await asyncio.to_thread(read_results, job_id, cursor)
+
+        for line in lines:
+            yield json.dumps(line) + "\n"
+        if lines:
+            continue
+
+        if meta.get("status") in TERMINAL_STATUSES:
+            return
+        await asyncio.sleep(RESULTS_POLL_SECONDS)
+
+
+@router.get("/{job_id}/results")
+async def get_job_results(
+    job_id: str,
+    stream: Optional[Literal["ndjson"]] = None,
+    cursor: int = Query(0, ge=0),
+):
+    """
+    Results of a job or batch: output files, scores and status per job.
+
+    With ?stream=ndjson, lines are sent as jobs finish. Otherwise the
+    results available now are returned with the cursor to poll from.
+    """
+    meta = await asyncio.to_thread(get_job_meta_or_404, job_id)
+
+    if stream == "ndjson":
+        return StreamingResponse(
+            follow_job_results(job_id, cursor),
+            media_type="application/x-ndjson",
+            headers={"Cache-Control": "no-cache"},
+        )
+
+    results, next_cursor = await asyncio.to_thread(read_results, job_id, cursor)
+    return {
+        "job_id": job_id,
+        "status": meta.get("status"),
+        "results": results,
+        "cursor": next_cursor,
+    }
@@ -0,0 +1,85 @@
+import os
+import resource
+import time
+from pathlib import Path
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.analysis.nucleic import contact_cache
+from app.analysis.pocket import structure_cache
+from app.analysis.sasa import sasa_cache
+from app.utils import workspace
+from app.utils.jobs import queue_stats
+from app.utils.manifest import manifest_cache
+from app.utils.metrics import register_gauge, render_metrics
+from app.utils.validation import smiles_cache
+
+router = APIRouter(tags=["metrics"])
+
+# Walking the jobs tree is not free; scrapes within this window reuse it.
+DISK_USAGE_TTL_SECONDS = 60.0
+
+_disk_usage = {"at": None, "bytes": 0}
+
+
+def directory_size_bytes(root: Path) -> int:
+    total = 0
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                pass  # removed mid-walk
+    return total
+
+
+def jobs_dir_bytes() -> int:
+    now = time.monotonic()
+    if _disk_usage["at"] is None or now - _disk_usage["at"] > DISK_USAGE_TTL_SECONDS:
+        _disk_usage["bytes"] = directory_size_bytes(workspace.BASE_JOBS_DIR)
+        _disk_usage["at"] = now
+    return _disk_usage["bytes"]
+
+
+def cache_hit_ratios():
+    ratios = {}
+    caches = (
+        ("manifest", manifest_cache),
+        ("smiles", smiles_cache),
+        ("structure", structure_cache),
+        ("sasa", sasa_cache),
+        ("nucleic_contacts", contact_cache),
+    )
+    for name, cache in caches:
+        lookups = cache.hits + cache.misses
+        if lookups:
+            ratios[(("cache", name),)] = cache.hits / lookups
+    return ratios
+
+
+def subprocess_peak_rss_bytes() -> int:
+    """
+    Largest RSS of any Boltz process this server has waited on (ru_maxrss
+    is in KiB on Linux).
+    """
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+
+
+register_gauge("boltz_queue_depth", "Jobs waiting to start.", lambda: queue_stats()["queued"])
+register_gauge("boltz_jobs_in_flight", "Jobs currently running.", lambda: queue_stats()["running"])
+register_gauge("boltz_cache_hit_ratio", "Hit ratio of in-memory caches.", cache_hit_ratios)
+register_gauge("boltz_jobs_dir_bytes", "Disk space used by job workspaces.", jobs_dir_bytes)
+register_gauge(
+    "boltz_subprocess_peak_rss_bytes",
+    "Peak resident memory of Boltz subprocesses.",
+    subprocess_peak_rss_bytes,
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(
+        render_metrics(),
+        media_type="text/plain; version=0.0.4",
+    )
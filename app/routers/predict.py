@@ -1,14 +1,16 @@
+import asyncio
 import uuid
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException
 
 from app.schemas.predict import (
     PredictComplexRequest,
     PredictComplexResponse,
+    ligand_validation_error,
 )
 from app.utils.workspace import create_workspace
-from app.utils.yaml_input import write_boltz_input_yaml
-from app.utils.cli import run_boltz_cli
-from app.utils.results import collect_prediction_outputs
+from app.utils.jobs import admit, enqueue_prediction_job
+from app.utils.cli import BoltzJobCancelled, BoltzJobTimeout
+from app.utils.admission import AdmissionRejected
 
 router = APIRouter()
 
@@ -17,7 +19,10 @@ router = APIRouter()
     "/predict",
     summary="Run Boltz prediction end-to-end (sync)",
 )
-def predict_complex(request: PredictComplexRequest):
+async def predict_complex(
+    request: PredictComplexRequest,
+    x_tenant_id: str = Header(default="default"),
+):
     """
     Prepare + run a Boltz job in one call.
 
@@ -28,35 +33,44 @@ def predict_complex(request: PredictComplexRequest):
     - protein–DNA/RNA
 
     This endpoint:
+    0) rejects oversized inputs / sheds load when saturated
     1) creates job
-    2) writes input.yaml
-    3) runs boltz predict (blocking)
+    2) queues it (in-process scheduler or job broker)
+    3) writes input.yaml + runs boltz predict
     4) returns results
+
+    The request holds no thread while the job runs, only an awaited
+    future, so waiting callers do not starve other routes.
     """
+    # SMILES are parsed off the event loop
+    invalid = await asyncio.to_thread(request.validate_ligands)
+    if invalid:
+        raise ligand_validation_error(invalid)
+
+    def submit():
+        # 0️⃣ Admission control (before any work starts)
+        tokens = admit(request.sequences, request.priority)
 
-    try:
         # 1️⃣ Generate job_id
         job_id = uuid.uuid4().hex
 
         # 2️⃣ Create workspace
         workspace = create_workspace(job_id)
 
-        # 3️⃣ Write INLINE YAML using unified sequences
-        yaml_path = workspace["inputs"] / "input.yaml"
-
-        write_boltz_input_yaml(
-            yaml_path=yaml_path,
-            sequences=request.sequences,
+        # 3️⃣ Queue; the scheduler writes INLINE YAML, runs Boltz CLI
+        #    (logs streamed to boltz.log) and collects outputs
+        job = enqueue_prediction_job(
+            job_id=job_id,
+            job_workspace=workspace,
+            request=request,
+            tenant=x_tenant_id,
+            estimated_tokens=tokens,
         )
+        return job_id, job
 
-        # 4️⃣ Run Boltz CLI inference (BLOCKING)
-        run_boltz_cli(
-            input_yaml=yaml_path,
-            output_dir=workspace["outputs"],
-        )
-
-        # 5️⃣ Collect outputs
-        outputs = collect_prediction_outputs(job_id)
+    try:
+        job_id, job = await asyncio.to_thread(submit)
+        outputs = await job.wait_async()
 
         return {
             "job_id": job_id,
@@ -64,8 +78,18 @@ def predict_complex(request: PredictComplexRequest):
             "results": outputs,
         }
 
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+            headers={"Retry-After": str(e.retry_after)} if e.retry_after else None,
+        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except BoltzJobTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except BoltzJobCancelled as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -0,0 +1,39 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.utils.scores import SCORES, parse_filter, score_index
+
+router = APIRouter(prefix="/rankings", tags=["rankings"])
+
+MAX_RANKING_LIMIT = 1000
+
+
+@router.get("")
+def get_rankings(
+    score: str = "iptm",
+    limit: int = Query(default=10, ge=1, le=MAX_RANKING_LIMIT),
+    ascending: Optional[bool] = None,
+    tenant: Optional[str] = None,
+    where: List[str] = Query(default=[]),
+):
+    """
+    Top jobs by a confidence or affinity score, from the score index.
+
+    Filters are repeatable, e.g. ?where=ptm>=0.7&where=affinity_probability_binary>0.5.
+    Higher is better except for affinity_pred_value unless ascending is given.
+    """
+    if score not in SCORES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown score {score!r}; use one of {', '.join(SCORES)}",
+        )
+
+    try:
+        filters = [parse_filter(expression) for expression in where]
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    jobs = score_index().top(score, limit=limit, ascending=ascending, filters=filters, tenant=tenant)
+
+    return {"score": score, "count": len(jobs), "jobs": jobs}
@@ -1,7 +1,12 @@
+import asyncio
 from pathlib import Path
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import HTMLResponse, FileResponse
 
+from app.analysis.pipeline import CIF_FILENAME, CONTACTS_FILENAME, write_contact_artifact
+from app.utils.executors import analysis_executor, run_in_executor
+from app.utils.manifest import MANIFEST_FILENAME, load_manifest, write_manifest
+
 BASE_JOBS_DIR = Path("/tmp/boltz_jobs")
 
 router = APIRouter(prefix="/results", tags=["results"])
@@ -18,25 +23,17 @@ def get_prediction_dir(job_id: str) -> Path:
     )
 
 
-# -------------------------------
-# HTML RESULTS PAGE (HUMANS)
-# -------------------------------
-@router.get("/{job_id}", response_class=HTMLResponse)
-def view_results_html(job_id: str):
-    """
-    Human-friendly HTML results page with clickable downloads.
-    """
+def get_job_manifest(job_id: str) -> dict:
     pred_dir = get_prediction_dir(job_id)
 
     if not pred_dir.exists():
         raise HTTPException(status_code=404, detail="Results not found")
 
-    files = [
-        f.name for f in pred_dir.iterdir()
-        if f.suffix in (".cif", ".json", ".npz")
-    ]
+    return load_manifest(BASE_JOBS_DIR / job_id, pred_dir)
+
 
-    html = f"""
+def render_results_html(job_id: str, files: list) -> str:
+    return f"""
     <html>
         <head>
             <title>Boltz Results – {job_id}</title>
@@ -63,21 +60,131 @@ def view_results_html(job_id: str):
     </html>
     """
 
+
+# -------------------------------
+# HTML RESULTS PAGE (HUMANS)
+# -------------------------------
+@router.get("/{job_id}", response_class=HTMLResponse)
+async def view_results_html(job_id: str):
+    """
+    Human-friendly HTML results page with clickable downloads.
+    """
+    manifest = await asyncio.to_thread(get_job_manifest, job_id)
+
+    # Rendered once per cached manifest
+    html = manifest.get("html")
+    if html is None:
+        html = render_results_html(job_id, [f["name"] for f in manifest["files"]])
+        manifest["html"] = html
+
     return HTMLResponse(content=html)
 
 
+# -------------------------------
+# JSON FILE LISTING (CLIENTS)
+# -------------------------------
+@router.get("/{job_id}/files")
+async def list_result_files(job_id: str):
+    """
+    List result files with sizes and SHA-256 checksums.
+    """
+    manifest = await asyncio.to_thread(get_job_manifest, job_id)
+
+    return {
+        "job_id": job_id,
+        "files": manifest["files"],
+    }
+
+
+# -------------------------------
+# INTERFACE CONTACT MAPS
+# -------------------------------
+def get_contact_map(job_id: str) -> dict:
+    """
+    The job's stored contact map, built on first use for jobs that
+    finished before contact maps were written at completion.
+    """
+    from app.analysis.contacts import load_contact_map
+
+    pred_dir = get_prediction_dir(job_id)
+    path = pred_dir / CONTACTS_FILENAME
+
+    if not path.exists():
+        if not (pred_dir / CIF_FILENAME).exists():
+            raise HTTPException(status_code=404, detail="Results not found")
+        write_contact_artifact(pred_dir)
+
+        job_dir = BASE_JOBS_DIR / job_id
+        if (job_dir / MANIFEST_FILENAME).exists():
+            write_manifest(job_dir, pred_dir)
+
+    return load_contact_map(path)
+
+
+@router.get("/{job_id}/contacts")
+async def list_contact_pairs(job_id: str):
+    """
+    Chain pairs in contact, with entity ids and residue contact counts.
+    The full map is downloadable through /results/{job_id}/file/{file}.
+    """
+    from app.analysis.contacts import contact_pairs
+
+    contact_map = await run_in_executor(analysis_executor, get_contact_map, job_id)
+
+    return {
+        "job_id": job_id,
+        "cutoff_angstrom": float(contact_map["cutoff"]),
+        "file": CONTACTS_FILENAME,
+        "pairs": contact_pairs(contact_map),
+    }
+
+
+@router.get("/{job_id}/contacts/{a}/{b}")
+async def get_contact_block(job_id: str, a: str, b: str, by: str = "chain"):
+    """
+    Residue–residue contacts between two chains (or, with by=entity, two
+    entities) as a sparse COO matrix: rows index `rows`, columns index
+    `cols`, with the closest heavy-atom distance of each pair.
+    """
+    from app.analysis.contacts import residue_labels, select_contacts
+
+    contact_map = await run_in_executor(analysis_executor, get_contact_map, job_id)
+
+    try:
+        block = select_contacts(contact_map, a, b, by=by)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    return {
+        "job_id": job_id,
+        "by": by,
+        "a": a,
+        "b": b,
+        "cutoff_angstrom": float(contact_map["cutoff"]),
+        "shape": [len(block["row_residues"]), len(block["col_residues"])],
+        "rows": residue_labels(contact_map, block["row_residues"]),
+        "cols": residue_labels(contact_map, block["col_residues"]),
+        "row": block["row"].tolist(),
+        "col": block["col"].tolist(),
+        "min_distance": [round(float(d), 3) for d in block["min_distance"]],
+    }
+
+
 # -------------------------------
 # FILE SERVING (BROWSER DOWNLOAD)
 # -------------------------------
 @router.get("/{job_id}/file/{filename}")
-def download_result_file(job_id: str, filename: str):
+async def download_result_file(job_id: str, filename: str):
     """
-    Serve result files for browser download.
+    Serve result files for browser download (streamed by FileResponse
+    without blocking the event loop).
     """
     pred_dir = get_prediction_dir(job_id)
     file_path = pred_dir / filename
 
-    if not file_path.exists():
+    if not await asyncio.to_thread(file_path.exists):
         raise HTTPException(status_code=404, detail="File not found")
 
     return FileResponse(
@@ -0,0 +1,30 @@
+from fastapi import APIRouter
+
+from app.schemas.validation import SmilesBatchRequest
+from app.utils.executors import analysis_executor, run_in_executor
+from app.utils.validation import validate_smiles_batch
+
+router = APIRouter(prefix="/validate", tags=["validation"])
+
+
+@router.post("/smiles")
+async def validate_smiles_bulk(request: SmilesBatchRequest):
+    """
+    Validate and canonicalize a batch of ligand SMILES.
+
+    Returns, per input (in order), the canonical SMILES plus heavy-atom and
+    rotatable-bond counts for size-based routing, or the reason it failed.
+    Identical canonical forms make deduplication trivial for clients.
+    """
+    results = await run_in_executor(analysis_executor, validate_smiles_batch, request.smiles)
+    valid = sum(1 for r in results if r["valid"])
+
+    return {
+        "count": len(results),
+        "valid": valid,
+        "invalid": len(results) - valid,
+        "unique_canonical": len(
+            {r["canonical_smiles"] for r in results if r["valid"]}
+        ),
+        "results": results,
+    }
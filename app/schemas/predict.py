@@ -1,5 +1,13 @@
-from typing import List, Literal, Optional
-from pydantic import BaseModel, Field
+from typing import Dict, List, Literal, Optional, Sequence, Tuple
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
+
+from app.utils.validation import (
+    describe_smiles,
+    validate_nucleic_sequence,
+    validate_protein_sequence,
+    validate_smiles_batch,
+)
 
 
 class SequenceEntity(BaseModel):
@@ -8,9 +16,182 @@ class SequenceEntity(BaseModel):
     sequence: Optional[str] = None
     smiles: Optional[str] = None
 
+    # Ligands: None until the SMILES has been parsed
+    _tokens: Optional[int] = PrivateAttr(default=None)
+
+    @model_validator(mode="after")
+    def check_entity(self):
+        """
+        Type-specific checks, run at request parsing (before any workspace
+        exists). These run on the event loop, so SMILES are only checked
+        for presence here; routes parse them with validate_ligands().
+        """
+        if self.type == "ligand":
+            if self.sequence is not None:
+                raise ValueError(f"Ligand {self.id}: use 'smiles', not 'sequence'")
+            if self.smiles is None or not self.smiles.strip():
+                raise ValueError(f"Ligand {self.id}: 'smiles' is required")
+
+            self.smiles = self.smiles.strip()
+            return self
+
+        if self.smiles is not None:
+            raise ValueError(f"{self.type} {self.id}: use 'sequence', not 'smiles'")
+        if self.sequence is None:
+            raise ValueError(f"{self.type} {self.id}: 'sequence' is required")
+
+        if self.type == "protein":
+            self.sequence = validate_protein_sequence(self.sequence)
+        else:
+            self.sequence = validate_nucleic_sequence(self.sequence, self.type)
+
+        self._tokens = len(self.sequence)
+        return self
+
+    @property
+    def token_count(self) -> int:
+        """
+        Boltz tokens: one per residue/nucleotide, one per ligand heavy atom.
+        """
+        if self._tokens is None:
+            self._tokens = describe_smiles(self.smiles).get("heavy_atoms", 0)
+        return self._tokens
+
+
+def validate_ligand_entities(entities: Sequence[Tuple[tuple, SequenceEntity]]) -> List[Dict]:
+    """
+    Parse the SMILES of the ligand entities among (loc, entity) pairs in
+    one batch, keeping each one's token count. Returns the invalid ones
+    as {"loc", "smiles", "error"}.
+    """
+    ligands = [(loc, entity) for loc, entity in entities if entity.type == "ligand"]
+    parsed = validate_smiles_batch([entity.smiles for _, entity in ligands])
+
+    invalid = []
+    for (loc, entity), result in zip(ligands, parsed):
+        entity._tokens = result.get("heavy_atoms", 0)
+        if not result["valid"]:
+            invalid.append({"loc": loc, "smiles": entity.smiles, "error": result["error"]})
+    return invalid
+
+
+def ligand_validation_error(invalid: List[Dict]) -> RequestValidationError:
+    """
+    The 422 for validate_ligands() results, one error per ligand.
+    """
+    return RequestValidationError(
+        [
+            {
+                "type": "value_error",
+                "loc": ("body", *ligand["loc"]),
+                "msg": f"Invalid SMILES: {ligand['error']}",
+                "input": ligand["smiles"],
+            }
+            for ligand in invalid
+        ]
+    )
+
 
 class PredictComplexRequest(BaseModel):
-    sequences: List[SequenceEntity]
+    sequences: List[SequenceEntity] = Field(..., min_length=1)
+    # Wall-clock limit for this job; capped by BOLTZ_JOB_TIMEOUT_SECONDS
+    timeout_seconds: Optional[float] = Field(None, gt=0)
+    # "interactive" jobs are served ahead of "bulk" ones (subject to aging)
+    priority: Literal["interactive", "bulk"] = "interactive"
+
+    @model_validator(mode="after")
+    def check_unique_ids(self):
+        ids = [entity.id for entity in self.sequences]
+        duplicates = sorted({i for i in ids if ids.count(i) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate chain ids: {', '.join(duplicates)}")
+        return self
+
+    def validate_ligands(self) -> List[Dict]:
+        """
+        Parse the ligand SMILES (see validate_ligand_entities).
+        """
+        return validate_ligand_entities(
+            [(("sequences", i), entity) for i, entity in enumerate(self.sequences)]
+        )
+
+    @property
+    def estimated_tokens(self) -> int:
+        return sum(entity.token_count for entity in self.sequences)
+
+
+class BatchPredictRequest(BaseModel):
+    # Each job keeps its own priority and timeout
+    jobs: List[PredictComplexRequest] = Field(..., min_length=1)
+
+    def validate_ligands(self) -> List[Dict]:
+        """
+        Parse the ligand SMILES of every job in one batch.
+        """
+        return validate_ligand_entities(
+            [
+                (("jobs", j, "sequences", i), entity)
+                for j, job in enumerate(self.jobs)
+                for i, entity in enumerate(job.sequences)
+            ]
+        )
+
+
+class ScreenRequest(BaseModel):
+    # Entities every job shares (receptor, cofactors)
+    sequences: List[SequenceEntity] = Field(..., min_length=1)
+    # One job per SMILES, each added to the shared entities as ligand_id
+    ligands: List[str] = Field(..., min_length=1)
+    ligand_id: str = "L"
+    timeout_seconds: Optional[float] = Field(None, gt=0)
+    priority: Literal["interactive", "bulk"] = "bulk"
+
+    _ligand_tokens: List[int] = PrivateAttr(default_factory=list)
+
+    @model_validator(mode="after")
+    def check_screen(self):
+        """
+        Shared entities as in PredictComplexRequest. Only cheap checks run
+        here, during body parsing on the event loop; the SMILES themselves
+        are parsed by validate_ligands() in the route.
+        """
+        ids = [entity.id for entity in self.sequences] + [self.ligand_id]
+        duplicates = sorted({i for i in ids if ids.count(i) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate chain ids: {', '.join(duplicates)}")
+
+        self.ligands = [smiles.strip() for smiles in self.ligands]
+        empty = [str(i) for i, smiles in enumerate(self.ligands) if not smiles]
+        if empty:
+            raise ValueError(f"Empty SMILES at ligands {', '.join(empty[:10])}")
+        return self
+
+    def validate_ligands(self) -> List[Dict]:
+        """
+        Parse the shared ligand entities and every screened SMILES through
+        the batch validator (cached, parallel for large screens), keeping
+        each job's token count. Returns the invalid ones as
+        {"loc", "smiles", "error"}.
+        """
+        invalid = validate_ligand_entities(
+            [(("sequences", i), entity) for i, entity in enumerate(self.sequences)]
+        )
+
+        parsed = validate_smiles_batch(self.ligands)
+        self._ligand_tokens = [p.get("heavy_atoms", 0) for p in parsed]
+        return invalid + [
+            {"loc": ("ligands", i), "smiles": p["smiles"], "error": p["error"]}
+            for i, p in enumerate(parsed)
+            if not p["valid"]
+        ]
+
+    @property
+    def estimated_tokens(self) -> List[int]:
+        """
+        Token count of each job, in ligand order (after validate_ligands).
+        """
+        shared = sum(entity.token_count for entity in self.sequences)
+        return [shared + tokens for tokens in self._ligand_tokens]
 
 
 class PredictComplexResponse(BaseModel):
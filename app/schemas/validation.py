@@ -0,0 +1,6 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+
+class SmilesBatchRequest(BaseModel):
+    smiles: List[str] = Field(..., min_length=1, max_length=200_000)
@@ -0,0 +1,142 @@
+import math
+import os
+from typing import Dict, List, Optional
+
+# Host memory one Boltz job is expected to need.
+JOB_MEMORY_BYTES = int(float(os.environ.get("BOLTZ_JOB_MEMORY_GB", 8)) * 2**30)
+
+# Reject submissions (503) while an idle host has less than
+# JOB_MEMORY_BYTES free. Off by default: like the scheduler, an idle
+# host then always accepts and starts one job.
+MEMORY_ADMISSION_ENABLED = os.environ.get("BOLTZ_MEMORY_ADMISSION", "0").lower() in ("1", "true", "yes")
+
+# Jobs allowed to wait in the queue before /predict starts answering 429.
+MAX_QUEUE_DEPTH = int(os.environ.get("BOLTZ_MAX_QUEUE_DEPTH", 64))
+
+# Bulk jobs (screens, bulk batches) wait against their own, larger limit,
+# so a large screen never shuts out interactive submissions.
+MAX_BULK_QUEUE_DEPTH = int(os.environ.get("BOLTZ_MAX_BULK_QUEUE_DEPTH", 10000))
+
+# Largest input accepted, in Boltz tokens (one per residue/nucleotide,
+# one per ligand heavy atom).
+MAX_INPUT_TOKENS = int(os.environ.get("BOLTZ_MAX_INPUT_TOKENS", 2048))
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, status_code: int, detail: str, retry_after: Optional[int] = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+def memory_job_slots() -> int:
+    """
+    How many more jobs fit in the memory currently available on the host.
+    """
+    import psutil
+
+    return int(psutil.virtual_memory().available // JOB_MEMORY_BYTES)
+
+
+def estimate_tokens(sequences: List) -> int:
+    """
+    Boltz token count, as computed when the request was validated.
+    """
+    return sum(entity.token_count for entity in sequences)
+
+
+def retry_after_seconds(stats: Dict) -> int:
+    """
+    Time for one job slot to turn over, from observed job durations.
+    """
+    per_slot = stats["avg_job_duration_seconds"] / max(1, stats["max_concurrency"])
+    return max(1, math.ceil(per_slot))
+
+
+def queue_depth_limit(priority: str) -> int:
+    return MAX_BULK_QUEUE_DEPTH if priority == "bulk" else MAX_QUEUE_DEPTH
+
+
+def check_admission(
+    sequences: List,
+    stats: Dict,
+    check_memory: bool = True,
+    priority: str = "interactive",
+) -> int:
+    """
+    Decide whether a new job may be queued, before any work is done.
+
+    Raises AdmissionRejected (413 oversized, 429 queue full, 503 memory
+    exhausted, only with BOLTZ_MEMORY_ADMISSION) and otherwise returns the
+    token estimate.
+    """
+    tokens = check_token_limit(estimate_tokens(sequences))
+    check_capacity(stats, check_memory, {priority: 1})
+    return tokens
+
+
+def check_batch_admission(
+    token_counts: List[int],
+    stats: Dict,
+    check_memory: bool = True,
+    priorities: Optional[List[str]] = None,
+) -> List[int]:
+    """
+    check_admission for a batch, admitted as a whole: every job must fit
+    the token limit, and all of the batch's jobs must fit the room left in
+    their priority class's queue (interactive unless given).
+    """
+    for index, tokens in enumerate(token_counts):
+        try:
+            check_token_limit(tokens)
+        except AdmissionRejected as e:
+            raise AdmissionRejected(e.status_code, f"Job {index}: {e.detail}")
+
+    incoming: Dict[str, int] = {}
+    for priority in priorities or ["interactive"] * len(token_counts):
+        incoming[priority] = incoming.get(priority, 0) + 1
+
+    check_capacity(stats, check_memory, incoming)
+    return token_counts
+
+
+def check_token_limit(tokens: int) -> int:
+    if tokens > MAX_INPUT_TOKENS:
+        raise AdmissionRejected(
+            413,
+            f"Input too large: ~{tokens} tokens (limit {MAX_INPUT_TOKENS})",
+        )
+    return tokens
+
+
+def check_capacity(stats: Dict, check_memory: bool = True, incoming: Optional[Dict[str, int]] = None):
+    """
+    incoming: jobs about to be queued, per priority class. Each class is
+    held to its own depth limit, counting only the jobs waiting in it.
+    """
+    for priority, count in (incoming or {"interactive": 1}).items():
+        queued = stats["queued_by_priority"].get(priority, 0)
+        limit = queue_depth_limit(priority)
+        if queued + count <= limit:
+            continue
+
+        if count == 1:
+            detail = f"Job queue is full ({queued} waiting)"
+        else:
+            detail = f"Batch of {count} {priority} jobs exceeds the queue's room ({queued} of {limit} waiting)"
+        raise AdmissionRejected(429, detail, retry_after_seconds(stats))
+
+    # With jobs running, memory comes back as they finish; with none
+    # running, something else is holding it and queueing will not help.
+    if (
+        MEMORY_ADMISSION_ENABLED
+        and check_memory
+        and stats["running"] == 0
+        and memory_job_slots() < 1
+    ):
+        raise AdmissionRejected(
+            503,
+            "Insufficient memory available to start a job",
+            retry_after_seconds(stats),
+        )
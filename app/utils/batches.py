@@ -0,0 +1,160 @@
+"""
+Batches and per-job result logs.
+
+Every finished job appends one JSON line (status, output files, scores)
+to its own results log and, if it belongs to a batch, to the batch's. Lines
+are appended in completion order and never rewritten, so a byte offset
+into the log is a stable cursor for clients streaming results while the
+rest of the batch is still running.
+
+Appends take an exclusive lock on the log, so workers on other hosts
+sharing BASE_JOBS_DIR can record results to the same batch.
+"""
+
+import fcntl
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.utils import workspace
+from app.utils.results import collect_prediction_outputs
+from app.utils.workspace import create_workspace, read_job_meta, update_job_meta
+
+logger = logging.getLogger("boltz.batches")
+
+RESULTS_FILENAME = "results.ndjson"
+BATCH_JOBS_FILENAME = "jobs.txt"
+
+RESULT_STATUSES = {"COMPLETED", "FAILED", "CANCELLED", "TIMED_OUT"}
+
+# Bytes of the log read per request (non-streaming) or poll (streaming)
+RESULTS_CHUNK_BYTES = 1 << 20
+
+
+def get_results_path(job_id: str) -> Path:
+    return workspace.BASE_JOBS_DIR / job_id / RESULTS_FILENAME
+
+
+def create_batch(batch_id: str, job_ids: List[str], tenant: str) -> Dict:
+    """
+    Workspace and meta.json of a batch; its jobs are listed in jobs.txt.
+    """
+    create_workspace(batch_id)
+    with open(workspace.BASE_JOBS_DIR / batch_id / BATCH_JOBS_FILENAME, "w") as f:
+        f.write("".join(f"{job_id}\n" for job_id in job_ids))
+
+    return update_job_meta(
+        batch_id, kind="batch", status="RUNNING", tenant=tenant, total=len(job_ids)
+    )
+
+
+def batch_job_ids(batch_id: str) -> List[str]:
+    with open(workspace.BASE_JOBS_DIR / batch_id / BATCH_JOBS_FILENAME) as f:
+        return f.read().split()
+
+
+def result_line(job_id: str, meta: Dict) -> Dict:
+    return {
+        "job_id": job_id,
+        "status": meta.get("status"),
+        "error": meta.get("error"),
+        "scores": meta.get("scores"),
+        "resources": meta.get("resources"),
+        "results": collect_prediction_outputs(job_id) if meta.get("status") == "COMPLETED" else [],
+    }
+
+
+def _last_index(f) -> int:
+    """
+    The "index" of the last line of an open results log (0 if empty),
+    reading back from the end only as far as that line.
+    """
+    end = f.seek(0, 2)
+    window = 4096
+    while True:
+        start = max(0, end - window)
+        f.seek(start)
+        lines = f.read(end - start).rstrip(b"\n").split(b"\n")
+        if len(lines) > 1 or start == 0:
+            return json.loads(lines[-1])["index"] if lines[-1] else 0
+        window *= 2
+
+
+def append_result(owner_id: str, line: Dict, total: int) -> Optional[Dict]:
+    """
+    Append a job's result line to the owner's log, numbering it, and mark
+    a batch COMPLETED once every one of its jobs is in. A log that already
+    holds all its lines is left alone (returns None).
+    """
+    with open(get_results_path(owner_id), "a+b") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            index = _last_index(f) + 1
+            if index > total:
+                return None
+            line = {**line, "index": index, "total": total}
+            f.write(json.dumps(line).encode() + b"\n")
+            f.flush()
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+    if owner_id != line["job_id"] and line["index"] >= total:
+        update_job_meta(owner_id, status="COMPLETED")
+    return line
+
+
+def record_job_result(job_id: str) -> Optional[Dict]:
+    """
+    Log a finished job's result. Failures are logged, never raised: the
+    job itself has already finished.
+    """
+    try:
+        meta = read_job_meta(job_id)
+        if meta.get("status") not in RESULT_STATUSES:
+            return None
+
+        line = result_line(job_id, meta)
+        recorded = append_result(job_id, line, total=1)
+        if recorded is None:
+            # Already recorded (e.g. a worker finishing as its lease is
+            # reaped): counting it again could complete the batch early
+            return None
+
+        batch_id = meta.get("batch")
+        if batch_id is not None:
+            recorded = append_result(batch_id, line, read_job_meta(batch_id)["total"])
+        return recorded
+    except Exception:
+        logger.exception("Could not record the result of %s", job_id)
+        return None
+
+
+def read_results(job_id: str, cursor: int = 0, max_bytes: int = RESULTS_CHUNK_BYTES) -> Tuple[List[Dict], int]:
+    """
+    Complete result lines from a byte cursor, at most about max_bytes of
+    them (but always at least one), each with the cursor after it.
+    Returns the lines and the cursor to continue from.
+
+    A job that finished before result logs existed gets its line written
+    here on first read.
+    """
+    path = get_results_path(job_id)
+    if not path.exists():
+        meta = read_job_meta(job_id)
+        if meta.get("kind") == "batch" or meta.get("status") not in RESULT_STATUSES:
+            return [], cursor
+        append_result(job_id, result_line(job_id, meta), total=1)
+
+    lines = []
+    start = cursor
+    with open(path, "rb") as f:
+        f.seek(cursor)
+        while cursor - start < max_bytes:
+            raw = f.readline()
+            if not raw.endswith(b"\n"):
+                # Partial (or no) line: still being appended
+                break
+            cursor += len(raw)
+            lines.append({**json.loads(raw), "cursor": cursor})
+    return lines, cursor
@@ -1,16 +1,144 @@
+import os
+import shlex
+import signal
 import subprocess
+import threading
+from collections import deque
 from pathlib import Path
+from typing import Callable, Dict, Optional
 
+from app.utils.progress import ProgressTracker, split_lines
+from app.utils.metrics import PIPELINE_STAGE_SECONDS, timed
+from app.utils.resources import ResourceMonitor
 
-def run_boltz_cli(input_yaml: Path, output_dir: Path):
+# Command used to launch Boltz; point it at tests/fake_boltz.py to run
+# the service without a GPU.
+BOLTZ_BIN = os.environ.get("BOLTZ_BIN", "boltz")
+
+# Global wall-clock ceiling for any job; per-job timeouts can only lower it.
+DEFAULT_JOB_TIMEOUT_SECONDS = float(os.environ.get("BOLTZ_JOB_TIMEOUT_SECONDS", 3600))
+
+# Time between SIGTERM and SIGKILL when stopping a job.
+TERMINATE_GRACE_SECONDS = 10.0
+
+# Only the tail of the output is kept in memory, for error messages.
+ERROR_TAIL_LINES = 50
+READ_CHUNK_BYTES = 64 * 1024
+
+_running: Dict[str, subprocess.Popen] = {}
+# Jobs registered to run that have not launched Boltz yet
+_pending = set()
+_cancel_requested = set()
+# Jobs whose worker lost its lease: stopped, with nothing recorded
+_abandoned = set()
+_lock = threading.Lock()
+
+
+class BoltzJobCancelled(RuntimeError):
+    pass
+
+
+class BoltzJobTimeout(RuntimeError):
+    pass
+
+
+class BoltzJobAbandoned(RuntimeError):
+    """
+    Stopped because another worker now owns the job; the outcome is not
+    this run's to record.
+    """
+
+
+def _terminate_group(process: subprocess.Popen, grace: float = TERMINATE_GRACE_SECONDS):
+    """
+    SIGTERM the whole process group, escalating to SIGKILL after grace.
+    """
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+
+    try:
+        process.wait(timeout=grace)
+    except subprocess.TimeoutExpired:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        process.wait()
+
+
+def register_boltz_job(job_id: str):
+    """
+    Announce a job that will call run_boltz_cli, so cancel_boltz_job can
+    stop it before it starts. release_boltz_job forgets it again.
+    """
+    with _lock:
+        _pending.add(job_id)
+
+
+def release_boltz_job(job_id: str):
+    with _lock:
+        _pending.discard(job_id)
+        _cancel_requested.discard(job_id)
+        _abandoned.discard(job_id)
+
+
+def _stop_boltz_job(job_id: str, requests: set) -> bool:
+    with _lock:
+        process = _running.get(job_id)
+        if process is None and job_id not in _pending:
+            return False
+        requests.add(job_id)
+
+    if process is not None:
+        _terminate_group(process)
+    return True
+
+
+def cancel_boltz_job(job_id: str) -> bool:
+    """
+    Stop a running Boltz job, or prevent a registered one from starting.
+
+    Returns False if there is nothing to stop: the job was never
+    registered here, or Boltz has already exited.
+    """
+    return _stop_boltz_job(job_id, _cancel_requested)
+
+
+def abandon_boltz_job(job_id: str) -> bool:
+    """
+    cancel_boltz_job for a job this process no longer owns: the run
+    raises BoltzJobAbandoned instead of BoltzJobCancelled.
+    """
+    return _stop_boltz_job(job_id, _abandoned)
+
+
+@timed(PIPELINE_STAGE_SECONDS, stage="boltz")
+def run_boltz_cli(
+    input_yaml: Path,
+    output_dir: Path,
+    log_path: Optional[Path] = None,
+    on_progress: Optional[Callable[[Dict], None]] = None,
+    job_id: Optional[str] = None,
+    timeout: Optional[float] = None,
+    on_usage: Optional[Callable[[Dict], None]] = None,
+):
     """
     Run Boltz CLI prediction using inline YAML.
+
+    stdout/stderr are streamed line by line to log_path (if given) and
+    parsed for stage/progress markers, reported through on_progress.
+    Boltz runs in its own process group so cancellation and timeouts
+    also stop any workers it spawned.
+
+    The process tree's resource usage (see app.utils.resources) is passed
+    to on_usage once Boltz has exited, however the run ended.
     """
 
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    cmd = [
-        "boltz",
+    cmd = shlex.split(BOLTZ_BIN) + [
         "predict",
         str(input_yaml),
         "--use_msa_server",
@@ -18,16 +146,106 @@ def run_boltz_cli(input_yaml: Path, output_dir: Path):
         str(output_dir),
     ]
 
-    process = subprocess.run(
-        cmd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-    )
+    if timeout is None or timeout > DEFAULT_JOB_TIMEOUT_SECONDS:
+        timeout = DEFAULT_JOB_TIMEOUT_SECONDS
+
+    with _lock:
+        if job_id is not None:
+            _pending.discard(job_id)
+            if job_id in _abandoned:
+                _abandoned.discard(job_id)
+                raise BoltzJobAbandoned(f"Job {job_id} was abandoned before it started")
+            if job_id in _cancel_requested:
+                _cancel_requested.discard(job_id)
+                raise BoltzJobCancelled(f"Job {job_id} was cancelled before it started")
+
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+        if job_id is not None:
+            _running[job_id] = process
+
+    monitor = ResourceMonitor(process.pid).start()
+    log_bytes = 0
+
+    timed_out = threading.Event()
+
+    def on_timeout():
+        timed_out.set()
+        _terminate_group(process)
+
+    watchdog = threading.Timer(timeout, on_timeout)
+    watchdog.daemon = True
+    watchdog.start()
+
+    tracker = ProgressTracker()
+    tail = deque(maxlen=ERROR_TAIL_LINES)
+    log_file = open(log_path, "ab") if log_path is not None else None
+
+    def handle(line: bytes):
+        text = line.decode("utf-8", errors="replace").strip()
+        if not text:
+            return
+        tail.append(text)
+        event = tracker.feed(text)
+        if event is not None and on_progress is not None:
+            on_progress(event)
+
+    try:
+        pending = b""
+        while True:
+            chunk = process.stdout.read1(READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            log_bytes += len(chunk)
+
+            if log_file is not None:
+                log_file.write(chunk)
+                log_file.flush()
+
+            lines, pending = split_lines(pending + chunk)
+            for line, _ in lines:
+                handle(line)
+
+        handle(pending)
+        # Last look at the tree before it is reaped
+        monitor.sample()
+        process.wait()
+    finally:
+        watchdog.cancel()
+        if log_file is not None:
+            log_file.close()
+        if process.poll() is None:
+            _terminate_group(process, grace=0)
+        usage = monitor.stop(output_dir, log_bytes)
+        if on_usage is not None:
+            on_usage(usage)
+        with _lock:
+            if job_id is not None:
+                _running.pop(job_id, None)
+                abandoned = job_id in _abandoned
+                cancelled = job_id in _cancel_requested
+                _abandoned.discard(job_id)
+                _cancel_requested.discard(job_id)
+            else:
+                abandoned = cancelled = False
+
+    if abandoned and process.returncode != 0:
+        raise BoltzJobAbandoned(f"Job {job_id} was abandoned")
+
+    if cancelled and process.returncode != 0:
+        raise BoltzJobCancelled(f"Job {job_id} was cancelled")
+
+    if timed_out.is_set() and process.returncode != 0:
+        raise BoltzJobTimeout(f"Boltz CLI exceeded the {timeout:g}s wall-clock limit")
 
     if process.returncode != 0:
+        output = "\n".join(tail)
         raise RuntimeError(
-            f"Boltz CLI failed:\nSTDOUT:\n{process.stdout}\nSTDERR:\n{process.stderr}"
+            f"Boltz CLI failed (exit code {process.returncode}):\nOUTPUT (last {len(tail)} lines):\n{output}"
         )
 
     return output_dir
@@ -0,0 +1,35 @@
+"""
+Executors for work that must not run on the event loop.
+
+Async routes hand blocking filesystem calls to asyncio.to_thread and CPU
+analysis to analysis_executor. The analysis pool is bounded on its own,
+so a burst of analysis requests queues here instead of occupying the
+threads that serve status and result reads.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+# Concurrent analysis runs (NumPy, SciPy and freesasa release the GIL for
+# most of their work)
+ANALYSIS_WORKERS = int(os.environ.get("BOLTZ_ANALYSIS_WORKERS", 0)) or min(8, os.cpu_count() or 1)
+
+analysis_executor = ThreadPoolExecutor(
+    max_workers=ANALYSIS_WORKERS,
+    thread_name_prefix="analysis",
+)
+
+
+async def run_in_executor(executor: Executor, func, *args, **kwargs):
+    """
+    loop.run_in_executor with the caller's context variables, as
+    asyncio.to_thread does, so record_phases() sees phases timed in the
+    pool.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await loop.run_in_executor(executor, call)
@@ -0,0 +1,396 @@
+import asyncio
+import logging
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.analysis.pipeline import CIF_FILENAME, write_structure_artifacts
+from app.broker import broker_from_env
+from app.utils import workspace
+from app.utils.admission import check_admission, check_batch_admission
+from app.utils.batches import record_job_result
+from app.utils.cli import (
+    BoltzJobAbandoned,
+    BoltzJobCancelled,
+    BoltzJobTimeout,
+    cancel_boltz_job,
+    register_boltz_job,
+    release_boltz_job,
+    run_boltz_cli,
+)
+from app.utils.resources import duration_estimator, observe_usage
+from app.utils.results import collect_prediction_outputs, get_prediction_dir
+from app.utils.scheduler import DEFAULT_TENANT, ScheduledJob, scheduler
+from app.utils.scores import index_job_scores
+from app.utils.workspace import create_workspaces, read_job_meta, update_job_meta, workspace_paths
+from app.utils.yaml_input import ScreenInputTemplate, write_boltz_input_yaml, write_rendered_input
+
+logger = logging.getLogger("boltz.jobs")
+
+LOG_FILENAME = "boltz.log"
+
+TERMINAL_STATUSES = {"COMPLETED", "FAILED", "CANCELLED", "TIMED_OUT"}
+
+# Set from BOLTZ_BROKER_URL: jobs then run on `python -m app.worker`
+# processes instead of in this process.
+broker = broker_from_env()
+
+BROKERED_POLL_SECONDS = 1.0
+
+
+def get_log_path(job_id: str) -> Path:
+    return workspace.BASE_JOBS_DIR / job_id / LOG_FILENAME
+
+
+def cleanup_partial_outputs(outputs_dir: Path):
+    """
+    Remove whatever Boltz wrote before it was stopped, keeping the
+    (empty) outputs directory so the workspace layout stays intact.
+    """
+    shutil.rmtree(outputs_dir, ignore_errors=True)
+    outputs_dir.mkdir(parents=True, exist_ok=True)
+
+
+def run_prediction_job(
+    job_id: str,
+    job_workspace: Dict[str, Path],
+    sequences: List,
+    timeout: Optional[float] = None,
+    input_yaml: Optional[str] = None,
+) -> List:
+    """
+    Write input.yaml, run Boltz with streamed logs and record the outcome
+    (in meta.json and the job's, and its batch's, results log), with the
+    run's resource usage. Completed runs also feed the duration estimator.
+
+    input_yaml is the already rendered input (screens); sequences are then
+    not used.
+    """
+    try:
+        return _run_prediction_job(job_id, job_workspace, sequences, timeout, input_yaml)
+    finally:
+        # Cancels arriving from now on find nothing to stop
+        release_boltz_job(job_id)
+
+
+def _run_prediction_job(
+    job_id: str,
+    job_workspace: Dict[str, Path],
+    sequences: List,
+    timeout: Optional[float],
+    input_yaml: Optional[str],
+) -> List:
+    yaml_path = job_workspace["inputs"] / "input.yaml"
+    # Bulk-created workspaces get their subdirectories here
+    job_workspace["outputs"].mkdir(parents=True, exist_ok=True)
+
+    if input_yaml is not None:
+        write_rendered_input(yaml_path, input_yaml)
+    else:
+        write_boltz_input_yaml(
+            yaml_path=yaml_path,
+            sequences=sequences,
+        )
+
+    update_job_meta(job_id, status="RUNNING", progress={"stage": None, "percent": None})
+
+    usage: Dict = {}
+    try:
+        run_boltz_cli(
+            input_yaml=yaml_path,
+            output_dir=job_workspace["outputs"],
+            log_path=job_workspace["job_dir"] / LOG_FILENAME,
+            on_progress=lambda event: update_job_meta(job_id, progress=event),
+            job_id=job_id,
+            timeout=timeout,
+            on_usage=usage.update,
+        )
+    except BoltzJobAbandoned:
+        # The job is being rerun elsewhere: leave its workspace alone
+        raise
+    except (BoltzJobCancelled, BoltzJobTimeout) as e:
+        cleanup_partial_outputs(job_workspace["outputs"])
+        status = "CANCELLED" if isinstance(e, BoltzJobCancelled) else "TIMED_OUT"
+        update_job_meta(job_id, status=status, error=str(e), **record_job_usage(usage, status))
+        record_job_result(job_id)
+        raise
+    except Exception as e:
+        update_job_meta(job_id, status="FAILED", error=str(e), **record_job_usage(usage, "FAILED"))
+        record_job_result(job_id)
+        raise
+
+    record_structure_artifacts(job_id)
+
+    tokens = read_job_meta(job_id).get("estimated_tokens")
+    if usage and tokens is not None:
+        duration_estimator().observe(tokens, usage["wall_seconds"])
+
+    # Mark completed before collecting so the manifest is written once
+    update_job_meta(
+        job_id,
+        status="COMPLETED",
+        scores=record_job_scores(job_id),
+        **record_job_usage(usage, "COMPLETED"),
+    )
+    record_job_result(job_id)
+    return collect_prediction_outputs(job_id)
+
+
+def record_job_usage(usage: Dict, status: str) -> Dict:
+    """
+    meta.json fields for a finished run's resource usage, which is also
+    observed in the job metrics. Empty if Boltz never started.
+    """
+    if not usage:
+        return {}
+    observe_usage(usage, status)
+    return {"resources": usage}
+
+
+def record_job_scores(job_id: str) -> Optional[Dict]:
+    """
+    Add a finished job to the ranking index. A missing or malformed
+    confidence file leaves the job unranked rather than failing it.
+    """
+    try:
+        tenant = read_job_meta(job_id).get("tenant", DEFAULT_TENANT)
+        return index_job_scores(job_id, get_prediction_dir(job_id), tenant=tenant)
+    except Exception:
+        logger.exception("Could not index scores for %s", job_id)
+        return None
+
+
+def record_structure_artifacts(job_id: str):
+    """
+    Store the interface contact map and structure summary next to the
+    prediction, so they are part of the job's manifest. Failures only
+    cost the artifacts; analysis falls back to the CIF.
+    """
+    pred_dir = get_prediction_dir(job_id)
+    if not (pred_dir / CIF_FILENAME).exists():
+        return
+    try:
+        write_structure_artifacts(pred_dir)
+    except Exception:
+        logger.exception("Could not build the structure artifacts for %s", job_id)
+
+
+class BrokeredJob:
+    """
+    Handle on a job executed by a remote worker; same wait() contract as
+    ScheduledJob, driven by the job's meta.json on the shared filesystem.
+    """
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+
+    def _finished(self) -> bool:
+        """
+        True once the job completed; raises for any other terminal status.
+        """
+        meta = read_job_meta(self.job_id)
+        status = meta.get("status")
+
+        if status == "CANCELLED":
+            raise BoltzJobCancelled(meta.get("error") or "Job was cancelled")
+        if status == "TIMED_OUT":
+            raise BoltzJobTimeout(meta.get("error") or "Job timed out")
+        if status == "FAILED":
+            raise RuntimeError(meta.get("error") or "Job failed")
+        return status == "COMPLETED"
+
+    def wait(self, timeout: Optional[float] = None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._finished():
+                return collect_prediction_outputs(self.job_id)
+
+            if deadline is not None and time.monotonic() > deadline:
+                return None
+            time.sleep(BROKERED_POLL_SECONDS)
+
+    async def wait_async(self):
+        """
+        wait() for event-loop callers; each poll borrows a thread only for
+        the meta.json read.
+        """
+        while not await asyncio.to_thread(self._finished):
+            await asyncio.sleep(BROKERED_POLL_SECONDS)
+        return await asyncio.to_thread(collect_prediction_outputs, self.job_id)
+
+
+def queue_stats() -> Dict:
+    return broker.stats() if broker is not None else scheduler.stats()
+
+
+def queue_info(job_id: str) -> Optional[Dict]:
+    return broker.queue_info(job_id) if broker is not None else scheduler.queue_info(job_id)
+
+
+def admit(sequences: List, priority: str = "interactive") -> int:
+    """
+    Admission check against whichever queue executes jobs. Host memory
+    only matters when jobs run in this process.
+    """
+    return check_admission(sequences, queue_stats(), check_memory=broker is None, priority=priority)
+
+
+def admit_batch(token_counts: List[int], priorities: Optional[List[str]] = None) -> List[int]:
+    return check_batch_admission(
+        token_counts, queue_stats(), check_memory=broker is None, priorities=priorities
+    )
+
+
+def enqueue_prediction_job(
+    job_id: str,
+    job_workspace: Dict[str, Path],
+    request,
+    tenant: str = DEFAULT_TENANT,
+    estimated_tokens: Optional[int] = None,
+    batch_id: Optional[str] = None,
+):
+    """
+    Queue a prediction (in-process scheduler or broker); wait() on the
+    returned handle to block until it finishes.
+    """
+    fields = {"batch": batch_id} if batch_id is not None else {}
+    estimated_duration = duration_estimator().estimate(estimated_tokens)
+    update_job_meta(
+        job_id,
+        status="QUEUED",
+        tenant=tenant,
+        priority=request.priority,
+        estimated_tokens=estimated_tokens,
+        estimated_duration_seconds=estimated_duration,
+        **fields,
+    )
+
+    if broker is not None:
+        broker.enqueue(job_id, request.model_dump(), tenant, request.priority)
+        return BrokeredJob(job_id)
+
+    register_boltz_job(job_id)
+    return scheduler.submit(
+        ScheduledJob(
+            job_id,
+            run=lambda: run_prediction_job(
+                job_id,
+                job_workspace,
+                request.sequences,
+                timeout=request.timeout_seconds,
+            ),
+            tenant=tenant,
+            priority=request.priority,
+            estimated_duration=estimated_duration,
+        )
+    )
+
+
+def enqueue_screen(
+    batch_id: str,
+    job_ids: List[str],
+    request,
+    tenant: str = DEFAULT_TENANT,
+    estimated_tokens: Optional[List[int]] = None,
+):
+    """
+    Queue one job per ligand of a ScreenRequest under batch_id.
+
+    The bulk counterpart of create_workspace + enqueue_prediction_job:
+    workspaces and meta.json files are created in one pass, already
+    QUEUED; the jobs enter the scheduler (or broker) in one call; and each
+    job's input.yaml is rendered from a template of the shared entities
+    when it starts.
+    """
+    estimated_tokens = estimated_tokens or [None] * len(job_ids)
+    estimator = duration_estimator()
+    estimated_durations = [estimator.estimate(tokens) for tokens in estimated_tokens]
+    create_workspaces(
+        (
+            job_id,
+            {
+                "status": "QUEUED",
+                "tenant": tenant,
+                "priority": request.priority,
+                "estimated_tokens": tokens,
+                "estimated_duration_seconds": duration,
+                "batch": batch_id,
+            },
+        )
+        for job_id, tokens, duration in zip(job_ids, estimated_tokens, estimated_durations)
+    )
+
+    if broker is not None:
+        shared = [entity.model_dump() for entity in request.sequences]
+        options = {"timeout_seconds": request.timeout_seconds, "priority": request.priority}
+        broker.enqueue_many(
+            [
+                (
+                    job_id,
+                    {
+                        **options,
+                        "sequences": shared + [
+                            {"type": "ligand", "id": request.ligand_id, "sequence": None, "smiles": smiles}
+                        ],
+                    },
+                )
+                for job_id, smiles in zip(job_ids, request.ligands)
+            ],
+            tenant,
+            request.priority,
+        )
+        return
+
+    template = ScreenInputTemplate(request.sequences, request.ligand_id)
+
+    def runner(job_id: str, smiles: str):
+        return lambda: run_prediction_job(
+            job_id,
+            workspace_paths(job_id),
+            None,
+            timeout=request.timeout_seconds,
+            input_yaml=template.render(smiles),
+        )
+
+    for job_id in job_ids:
+        register_boltz_job(job_id)
+    scheduler.submit_many(
+        [
+            ScheduledJob(
+                job_id,
+                run=runner(job_id, smiles),
+                tenant=tenant,
+                priority=request.priority,
+                estimated_duration=duration,
+            )
+            for job_id, smiles, duration in zip(job_ids, request.ligands, estimated_durations)
+        ]
+    )
+
+
+def cancel_job(job_id: str) -> Optional[str]:
+    """
+    Cancel a queued or running job. Returns "CANCELLED", "CANCELLING"
+    when a remote worker has been asked to stop it, or None when it can no
+    longer be cancelled: Boltz has already exited (the run then finishes
+    and reports its own status), or the broker has the job finished or
+    does not know it.
+    """
+    if broker is not None:
+        outcome = broker.cancel(job_id)
+        if outcome == "CANCELLED":
+            update_job_meta(job_id, status="CANCELLED", error="Cancelled while queued")
+            record_job_result(job_id)
+        return outcome
+
+    if scheduler.cancel(job_id):
+        release_boltz_job(job_id)
+        update_job_meta(job_id, status="CANCELLED", error="Cancelled while queued")
+        record_job_result(job_id)
+        return "CANCELLED"
+
+    # Running, or dequeued and about to start: the run records the outcome
+    if cancel_boltz_job(job_id):
+        return "CANCELLED"
+    return None
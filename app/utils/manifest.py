@@ -0,0 +1,100 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List
+
+from app.utils.cache import LRUCache
+
+MANIFEST_FILENAME = "manifest.json"
+RESULT_SUFFIXES = (".cif", ".json", ".npz")
+MANIFEST_CACHE_SIZE = 256
+FILE_HASH_CACHE_SIZE = 4096
+
+
+def _sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Digests by (path, size, mtime): a file is only rehashed once it changes,
+# so listing a job that is still running does not reread its outputs.
+file_hash_cache = LRUCache(FILE_HASH_CACHE_SIZE)
+
+
+def _file_sha256(path: Path, stat) -> str:
+    key = (str(path), stat.st_size, stat.st_mtime_ns)
+    digest = file_hash_cache.get(key)
+    if digest is None:
+        digest = file_hash_cache.put(key, _sha256(path))
+    return digest
+
+
+def build_manifest(pred_dir: Path) -> List[Dict]:
+    """
+    Scan a prediction directory once and describe every result file.
+    """
+    files = []
+    for f in sorted(pred_dir.iterdir()):
+        if f.is_file() and f.suffix in RESULT_SUFFIXES:
+            stat = f.stat()
+            files.append(
+                {
+                    "name": f.name,
+                    "type": f.suffix.replace(".", ""),
+                    "size": stat.st_size,
+                    "sha256": _file_sha256(f, stat),
+                }
+            )
+    return files
+
+
+# Manifests (and their rendered pages) of recently viewed jobs
+manifest_cache = LRUCache(MANIFEST_CACHE_SIZE)
+
+
+def _job_finished(job_dir: Path) -> bool:
+    meta_path = job_dir / "meta.json"
+    if not meta_path.exists():
+        # Jobs created before meta tracking: treat what is on disk as final.
+        return True
+    with open(meta_path) as f:
+        return json.load(f).get("status") == "COMPLETED"
+
+
+def write_manifest(job_dir: Path, pred_dir: Path) -> Dict:
+    """
+    Write the job manifest once the prediction has completed.
+    """
+    entry = {"files": build_manifest(pred_dir) if pred_dir.exists() else []}
+
+    with open(job_dir / MANIFEST_FILENAME, "w") as f:
+        json.dump(entry, f, indent=2)
+
+    return manifest_cache.put(str(job_dir), entry)
+
+
+def load_manifest(job_dir: Path, pred_dir: Path) -> Dict:
+    """
+    Return the manifest for a job, from memory, disk or a directory scan.
+
+    Manifests are only persisted and cached once the job is finished, so a
+    listing taken while Boltz is still writing is never served stale; only
+    the files that changed since the last listing are hashed again.
+    """
+    key = str(job_dir)
+    entry = manifest_cache.get(key)
+    if entry is not None:
+        return entry
+
+    manifest_path = job_dir / MANIFEST_FILENAME
+    if manifest_path.exists():
+        with open(manifest_path) as f:
+            return manifest_cache.put(key, json.load(f))
+
+    if _job_finished(job_dir):
+        return write_manifest(job_dir, pred_dir)
+
+    return {"files": build_manifest(pred_dir)}
@@ -0,0 +1,267 @@
+"""
+Minimal Prometheus instrumentation (text exposition format 0.0.4).
+
+Kept dependency-free: a histogram observation is two perf_counter()
+calls, a bisect and a locked increment, so the timing decorator can sit
+on hot paths.
+"""
+
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (
+    0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+    10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0,
+)
+
+BYTE_BUCKETS = tuple(float(2**n) for n in range(20, 40, 2))  # 1 MiB .. 256 GiB
+
+_registry: List["Histogram"] = []
+_gauges: List[Tuple[str, str, Callable]] = []
+
+# Set by record_phases(): {metric: {phase: seconds}} for the current request
+_phase_breakdown: ContextVar[Optional[Dict[str, Dict[str, float]]]] = ContextVar(
+    "_phase_breakdown", default=None
+)
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+        for k, v in labels.items()
+    )
+    return "{" + inner + "}"
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def mean(self, **labels) -> Optional[float]:
+        """
+        Mean of the observations of one series, None if it has none.
+        """
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                return None
+            return series[-1] / sum(series[:-1])
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+
+        for key, series in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels({**labels, 'le': repr(bound)})} {cumulative:g}"
+                )
+            cumulative += series[len(self.buckets)]
+            lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {cumulative:g}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative:g}")
+        return lines
+
+
+def register_gauge(name: str, documentation: str, collect: Callable):
+    """
+    Register a gauge evaluated at scrape time. collect() returns a number,
+    or a {label_dict_as_tuple_of_pairs: value} mapping for labelled series.
+    """
+    _gauges.append((name, documentation, collect))
+
+
+def _render_gauge(name: str, documentation: str, collect: Callable) -> List[str]:
+    try:
+        value = collect()
+    except Exception:
+        return []
+
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+    if isinstance(value, dict):
+        for labels, v in value.items():
+            lines.append(f"{name}{_format_labels(dict(labels))} {v:g}")
+    elif value is not None:
+        lines.append(f"{name} {value:g}")
+    return lines
+
+
+def render_metrics() -> str:
+    lines = []
+    for histogram in _registry:
+        lines.extend(histogram.render())
+    for name, documentation, collect in _gauges:
+        lines.extend(_render_gauge(name, documentation, collect))
+    return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def observe_duration(histogram: Histogram, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start, **labels)
+
+
+def timed(histogram: Histogram, **labels):
+    """
+    Decorator recording each call's wall time in histogram, whether the
+    call returns or raises.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, **labels)
+
+        return wrapper
+
+    return decorator
+
+
+PIPELINE_STAGE_SECONDS = Histogram(
+    "boltz_pipeline_stage_seconds",
+    "Time spent in each prediction pipeline stage.",
+    labelnames=("stage",),
+)
+
+ANALYSIS_METRIC_SECONDS = Histogram(
+    "boltz_analysis_metric_seconds",
+    "Time spent computing each analysis metric.",
+    labelnames=("metric",),
+)
+
+ANALYSIS_PHASE_SECONDS = Histogram(
+    "boltz_analysis_phase_seconds",
+    "Time spent per phase (parse, neighbor_search, sasa) of each analysis metric.",
+    labelnames=("metric", "phase"),
+)
+
+JOB_WALL_SECONDS = Histogram(
+    "boltz_job_wall_seconds",
+    "Wall time of each Boltz run.",
+    labelnames=("status",),
+)
+
+JOB_CPU_SECONDS = Histogram(
+    "boltz_job_cpu_seconds",
+    "CPU time (user + system) of each Boltz process tree.",
+    labelnames=("status",),
+)
+
+JOB_PEAK_RSS_BYTES = Histogram(
+    "boltz_job_peak_rss_bytes",
+    "Peak resident memory of each Boltz process tree.",
+    labelnames=("status",),
+    buckets=BYTE_BUCKETS,
+)
+
+JOB_PEAK_GPU_MEMORY_BYTES = Histogram(
+    "boltz_job_peak_gpu_memory_bytes",
+    "Peak GPU memory of each Boltz process tree (runs with NVML only).",
+    labelnames=("status",),
+    buckets=BYTE_BUCKETS,
+)
+
+JOB_OUTPUT_BYTES = Histogram(
+    "boltz_job_output_bytes",
+    "Bytes each Boltz run wrote to its outputs directory.",
+    labelnames=("status",),
+    buckets=BYTE_BUCKETS,
+)
+
+
+def _record_phase(metric: str, phase: str, seconds: float):
+    breakdown = _phase_breakdown.get()
+    if breakdown is not None:
+        phases = breakdown.setdefault(metric, {})
+        phases[phase] = phases.get(phase, 0.0) + seconds
+
+
+@contextmanager
+def analysis_phase(metric: str, phase: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        ANALYSIS_PHASE_SECONDS.observe(elapsed, metric=metric, phase=phase)
+        _record_phase(metric, phase, elapsed)
+
+
+def timed_metric(metric: str):
+    """
+    @timed for analysis metrics; the call's total also goes into any
+    breakdown being recorded.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                ANALYSIS_METRIC_SECONDS.observe(elapsed, metric=metric)
+                _record_phase(metric, "total", elapsed)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def record_phases():
+    """
+    Collect a per-metric phase breakdown for analysis run in this context.
+    """
+    breakdown: Dict[str, Dict[str, float]] = {}
+    token = _phase_breakdown.set(breakdown)
+    try:
+        yield breakdown
+    finally:
+        _phase_breakdown.reset(token)
@@ -0,0 +1,78 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Boltz prints plain status lines plus tqdm/Lightning progress bars, which
+# redraw themselves with carriage returns instead of newlines.
+LINE_SEPARATOR = re.compile(rb"\r\n|\r|\n")
+
+# Lines longer than this are flushed as-is so a runaway line without a
+# newline can never grow a buffer without bound.
+MAX_LINE_BYTES = 64 * 1024
+
+# Checked in order; the first match decides the stage of a line.
+STAGE_PATTERNS = [
+    ("msa", re.compile(r"MSA server|mmseqs|Generating MSA|\bMSA\b", re.I)),
+    ("featurization", re.compile(r"Checking input data|Processing input data|featuriz", re.I)),
+    ("affinity", re.compile(r"affinity prediction", re.I)),
+    ("diffusion", re.compile(r"structure prediction|diffusion|sampling step", re.I)),
+    ("writing", re.compile(r"Writing|Number of failed examples", re.I)),
+]
+
+# tqdm style counters, e.g. "Predicting DataLoader 0:  45%|####  | 90/200 [".
+STEP_PATTERN = re.compile(r"(\d+)/(\d+)\s*\[")
+
+
+def split_lines(data: bytes) -> Tuple[List[Tuple[bytes, int]], bytes]:
+    """
+    Split a byte buffer into complete lines and the unterminated remainder.
+
+    Each line comes with the offset just past its separator, which callers
+    use as a resume position.
+    """
+    lines = []
+    start = 0
+    for match in LINE_SEPARATOR.finditer(data):
+        lines.append((data[start:match.start()], match.end()))
+        start = match.end()
+
+    if len(data) - start > MAX_LINE_BYTES:
+        lines.append((data[start:], len(data)))
+        start = len(data)
+
+    return lines, data[start:]
+
+
+class ProgressTracker:
+    """
+    Turn Boltz output lines into stage/progress events.
+
+    feed() only returns an event when the stage or the whole-percent
+    progress within it changes, so callers can persist every event.
+    """
+
+    def __init__(self):
+        self.stage: Optional[str] = None
+        self.percent: Optional[int] = None
+
+    def snapshot(self) -> Dict:
+        return {"stage": self.stage, "percent": self.percent}
+
+    def feed(self, line: str) -> Optional[Dict]:
+        stage = self.stage
+        for name, pattern in STAGE_PATTERNS:
+            if pattern.search(line):
+                stage = name
+                break
+
+        percent = self.percent if stage == self.stage else None
+        step = STEP_PATTERN.search(line)
+        if step and stage is not None:
+            done, total = int(step.group(1)), int(step.group(2))
+            if total > 0:
+                percent = min(100, done * 100 // total)
+
+        if (stage, percent) == (self.stage, self.percent):
+            return None
+
+        self.stage, self.percent = stage, percent
+        return self.snapshot()
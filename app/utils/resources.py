@@ -0,0 +1,324 @@
+"""
+Resource accounting for Boltz runs and job duration estimates.
+
+While Boltz runs, its process tree is sampled with psutil for resident
+memory and CPU time, and (when NVML is available) GPU memory. The peaks
+and totals, the wall time and the bytes written are stored in the job's
+meta.json as "resources" and observed in the boltz_job_* histograms.
+
+The tree is sampled, not traced. A child that lives shorter than one
+sample interval is missed. CPU time counts each process up to its last
+sample.
+
+Completed runs are appended to a duration log next to the jobs, keyed by
+token count. DurationEstimator reads it back to predict how long a new
+job will run, which the scheduler uses for queue position estimates.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.utils import workspace
+from app.utils.metrics import (
+    JOB_CPU_SECONDS,
+    JOB_OUTPUT_BYTES,
+    JOB_PEAK_GPU_MEMORY_BYTES,
+    JOB_PEAK_RSS_BYTES,
+    JOB_WALL_SECONDS,
+)
+
+logger = logging.getLogger("boltz.resources")
+
+RESOURCE_SAMPLE_SECONDS = float(os.environ.get("BOLTZ_RESOURCE_SAMPLE_SECONDS", 1.0))
+
+DURATION_LOG_FILENAME = "durations.ndjson"
+
+# Completed runs read back from the duration log when an estimator loads
+DURATION_HISTORY = int(os.environ.get("BOLTZ_DURATION_HISTORY", 5000))
+
+# Most recent runs kept per token bucket
+DURATION_SAMPLES_PER_BUCKET = 50
+
+
+# ---------------------------
+# GPU memory
+# ---------------------------
+_nvml_lock = threading.Lock()
+_nvml_available: Optional[bool] = None
+
+
+def _nvml():
+    """
+    The initialized pynvml module, or None without it or without a GPU.
+    """
+    global _nvml_available
+
+    with _nvml_lock:
+        if _nvml_available is None:
+            try:
+                import pynvml
+
+                pynvml.nvmlInit()
+                _nvml_available = True
+            except Exception:
+                _nvml_available = False
+
+    if not _nvml_available:
+        return None
+
+    import pynvml
+
+    return pynvml
+
+
+def gpu_memory_by_pid() -> Optional[Dict[int, int]]:
+    """
+    GPU memory used per process across all devices, None if unavailable.
+    """
+    nvml = _nvml()
+    if nvml is None:
+        return None
+
+    used: Dict[int, int] = {}
+    try:
+        for index in range(nvml.nvmlDeviceGetCount()):
+            handle = nvml.nvmlDeviceGetHandleByIndex(index)
+            for process in nvml.nvmlDeviceGetComputeRunningProcesses(handle):
+                used[process.pid] = used.get(process.pid, 0) + (process.usedGpuMemory or 0)
+    except Exception:
+        logger.debug("NVML query failed", exc_info=True)
+        return None
+    return used
+
+
+def directory_bytes(path: Path) -> int:
+    total = 0
+    try:
+        entries = list(os.scandir(path))
+    except OSError:
+        return 0
+
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                total += directory_bytes(Path(entry.path))
+            elif entry.is_file(follow_symlinks=False):
+                total += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            pass
+    return total
+
+
+# ---------------------------
+# Process tree sampling
+# ---------------------------
+class ResourceMonitor:
+    """
+    Samples a process and its descendants on a background thread until
+    stopped.
+    """
+
+    def __init__(self, pid: int, interval: float = RESOURCE_SAMPLE_SECONDS):
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss_bytes = 0
+        self.peak_gpu_memory_bytes: Optional[int] = None
+        self.samples = 0
+        self._cpu_by_pid: Dict[int, float] = {}
+        self._started = time.monotonic()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def start(self) -> "ResourceMonitor":
+        self._thread.start()
+        return self
+
+    def _loop(self):
+        self.sample()
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        import psutil
+
+        try:
+            root = psutil.Process(self.pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return
+
+        rss = 0
+        cpu: Dict[int, float] = {}
+        for process in processes:
+            try:
+                with process.oneshot():
+                    rss += process.memory_info().rss
+                    times = process.cpu_times()
+                    cpu[process.pid] = times.user + times.system
+            except psutil.Error:
+                continue
+
+        gpu = gpu_memory_by_pid()
+
+        with self._lock:
+            self.samples += 1
+            self.peak_rss_bytes = max(self.peak_rss_bytes, rss)
+            for pid, seconds in cpu.items():
+                self._cpu_by_pid[pid] = max(self._cpu_by_pid.get(pid, 0.0), seconds)
+            if gpu is not None:
+                tree_gpu = sum(gpu.get(pid, 0) for pid in cpu)
+                self.peak_gpu_memory_bytes = max(self.peak_gpu_memory_bytes or 0, tree_gpu)
+
+    def stop(self, output_dir: Optional[Path] = None, log_bytes: int = 0) -> Dict:
+        """
+        Stop sampling and return the usage record.
+        """
+        wall = time.monotonic() - self._started
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+        with self._lock:
+            return {
+                "wall_seconds": round(wall, 3),
+                "cpu_seconds": round(sum(self._cpu_by_pid.values()), 3),
+                "peak_rss_bytes": self.peak_rss_bytes,
+                "peak_gpu_memory_bytes": self.peak_gpu_memory_bytes,
+                "gpu_memory_source": "unavailable" if self.peak_gpu_memory_bytes is None else "nvml",
+                "output_bytes": directory_bytes(output_dir) if output_dir is not None else 0,
+                "log_bytes": log_bytes,
+                "samples": self.samples,
+                "sample_interval_seconds": self.interval,
+            }
+
+
+def observe_usage(usage: Dict, status: str):
+    JOB_WALL_SECONDS.observe(usage["wall_seconds"], status=status)
+    JOB_CPU_SECONDS.observe(usage["cpu_seconds"], status=status)
+    JOB_PEAK_RSS_BYTES.observe(usage["peak_rss_bytes"], status=status)
+    JOB_OUTPUT_BYTES.observe(usage["output_bytes"], status=status)
+    if usage["peak_gpu_memory_bytes"] is not None:
+        JOB_PEAK_GPU_MEMORY_BYTES.observe(usage["peak_gpu_memory_bytes"], status=status)
+
+
+# ---------------------------
+# Duration estimates
+# ---------------------------
+def token_bucket(tokens: int) -> int:
+    """
+    Power-of-two token bucket: 1, 2-3, 4-7, ...
+    """
+    return max(1, int(tokens)).bit_length()
+
+
+class DurationEstimator:
+    """
+    Predicted wall time of a job from its token count.
+
+    Runs are grouped into power-of-two token buckets. A job is estimated
+    from the nearest bucket that has runs: the median seconds per token
+    of its recent runs, times the job's tokens.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._buckets: Dict[int, deque] = {}
+        self._rates: Dict[int, float] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _add_locked(self, tokens: int, seconds: float):
+        bucket = token_bucket(tokens)
+        runs = self._buckets.setdefault(bucket, deque(maxlen=DURATION_SAMPLES_PER_BUCKET))
+        runs.append(seconds / max(1, tokens))
+        self._rates.pop(bucket, None)
+
+    def _load_locked(self):
+        if self._loaded:
+            return
+        self._loaded = True
+
+        try:
+            with open(self.path, "rb") as f:
+                end = f.seek(0, 2)
+                start = max(0, end - DURATION_HISTORY * 64)
+                f.seek(start)
+                lines = f.read().split(b"\n")
+        except FileNotFoundError:
+            return
+
+        if start > 0:
+            # First line is cut off
+            lines = lines[1:]
+        for raw in lines[-DURATION_HISTORY:]:
+            try:
+                run = json.loads(raw)
+                self._add_locked(run["tokens"], run["wall_seconds"])
+            except (ValueError, KeyError, TypeError):
+                continue
+
+    def observe(self, tokens: int, wall_seconds: float):
+        """
+        Record a completed run, in memory and in the duration log.
+        """
+        line = json.dumps({"tokens": int(tokens), "wall_seconds": round(wall_seconds, 3)})
+        with self._lock:
+            # Load the history first, or the new line would be read back
+            # and counted twice
+            self._load_locked()
+            try:
+                with open(self.path, "a") as f:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                    try:
+                        f.write(line + "\n")
+                    finally:
+                        fcntl.flock(f, fcntl.LOCK_UN)
+            except OSError:
+                logger.exception("Could not append to %s", self.path)
+            self._add_locked(tokens, wall_seconds)
+
+    def estimate(self, tokens: Optional[int]) -> Optional[float]:
+        """
+        Estimated seconds, or None for an unknown size or before any run
+        has completed.
+        """
+        if tokens is None:
+            return None
+
+        with self._lock:
+            self._load_locked()
+            if not self._buckets:
+                return None
+
+            bucket = token_bucket(tokens)
+            nearest = min(self._buckets, key=lambda b: (abs(b - bucket), b))
+            rate = self._rates.get(nearest)
+            if rate is None:
+                rate = self._rates[nearest] = statistics.median(self._buckets[nearest])
+
+        return round(rate * max(1, tokens), 1)
+
+
+_estimators: Dict[Path, DurationEstimator] = {}
+_estimators_lock = threading.Lock()
+
+
+def duration_estimator() -> DurationEstimator:
+    """
+    The estimator backed by the duration log under BASE_JOBS_DIR.
+    """
+    path = workspace.BASE_JOBS_DIR / DURATION_LOG_FILENAME
+    with _estimators_lock:
+        estimator = _estimators.get(path)
+        if estimator is None:
+            estimator = _estimators[path] = DurationEstimator(path)
+        return estimator
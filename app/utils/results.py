@@ -1,13 +1,13 @@
 from pathlib import Path
 
+from app.utils.manifest import load_manifest
+from app.utils.metrics import PIPELINE_STAGE_SECONDS, timed
+
 BASE_JOBS_DIR = Path("/tmp/boltz_jobs")
 
 
-def collect_prediction_outputs(job_id: str):
-    """
-    Collect prediction output files and return metadata.
-    """
-    pred_dir = (
+def get_prediction_dir(job_id: str) -> Path:
+    return (
         BASE_JOBS_DIR
         / job_id
         / "outputs"
@@ -16,17 +16,15 @@ def collect_prediction_outputs(job_id: str):
         / "input"
     )
 
+
+@timed(PIPELINE_STAGE_SECONDS, stage="collect_outputs")
+def collect_prediction_outputs(job_id: str):
+    """
+    Collect prediction output files and return metadata.
+    """
+    pred_dir = get_prediction_dir(job_id)
+
     if not pred_dir.exists():
         return []
 
-    files = []
-    for f in pred_dir.iterdir():
-        if f.suffix in (".cif", ".json", ".npz"):
-            files.append(
-                {
-                    "name": f.name,
-                    "type": f.suffix.replace(".", ""),
-                }
-            )
-
-    return files
+    return load_manifest(BASE_JOBS_DIR / job_id, pred_dir)["files"]
@@ -0,0 +1,318 @@
+import asyncio
+import heapq
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from app.utils.admission import memory_job_slots
+from app.utils.cli import BoltzJobCancelled
+
+# Lower rank is served first. Aging moves a waiting job up one class per
+# BOLTZ_AGING_SECONDS so bulk work is never starved by interactive traffic.
+PRIORITY_CLASSES = {"interactive": 0, "bulk": 1}
+
+DEFAULT_TENANT = "default"
+
+# Assumed job duration until real ones have been observed.
+DEFAULT_JOB_DURATION_SECONDS = 600.0
+
+
+class ScheduledJob:
+    """
+    A unit of work waiting for (or holding) one execution slot.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        run: Callable,
+        tenant: str = DEFAULT_TENANT,
+        priority: str = "interactive",
+        estimated_duration: Optional[float] = None,
+    ):
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority class: {priority}")
+
+        self.job_id = job_id
+        self.run = run
+        self.tenant = tenant
+        self.priority = priority
+        self.estimated_duration = estimated_duration
+        self.enqueued_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self._callbacks: List[Callable[[], None]] = []
+        self._callbacks_lock = threading.Lock()
+
+    def wait(self, timeout: Optional[float] = None):
+        """
+        Block until the job has run, returning its result or re-raising.
+        """
+        self.done.wait(timeout)
+        return self._outcome()
+
+    async def wait_async(self):
+        """
+        wait() for event-loop callers: no thread is held while the job
+        runs; the scheduler thread resolves a future on the caller's loop.
+        """
+        loop = asyncio.get_running_loop()
+        finished = loop.create_future()
+
+        def resolve():
+            if not finished.done():
+                finished.set_result(None)
+
+        self.add_done_callback(lambda: loop.call_soon_threadsafe(resolve))
+        await finished
+        return self._outcome()
+
+    def add_done_callback(self, callback: Callable[[], None]):
+        with self._callbacks_lock:
+            if not self.done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def finish(self):
+        with self._callbacks_lock:
+            self.done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def _outcome(self):
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class JobScheduler:
+    """
+    Priority + weighted fair-share scheduler in front of run_boltz_cli.
+
+    Ordering is (aged priority class, tenant virtual usage, arrival).
+    Each dispatch charges the tenant 1/weight, and a tenant returning from
+    idle starts at the current virtual time, so a tenant with thousands of
+    queued jobs alternates with everyone else instead of blocking them.
+
+    Within one (tenant, priority) group that order is arrival order, so
+    jobs wait in per-group FIFOs and a dispatch only compares their heads.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 1,
+        tenant_max_concurrency: Optional[int] = None,
+        tenant_weights: Optional[Dict[str, float]] = None,
+        aging_seconds: float = 600.0,
+        capacity: Optional[Callable[[], int]] = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.tenant_max_concurrency = tenant_max_concurrency or max_concurrency
+        self.tenant_weights = tenant_weights or {}
+        self.aging_seconds = aging_seconds
+        # Extra jobs the host can currently afford (e.g. by free memory)
+        self.capacity = capacity
+
+        # Every queued job by id, and the same jobs by (tenant, priority)
+        self._queue: Dict[str, ScheduledJob] = {}
+        self._groups: Dict[Tuple[str, str], Deque[ScheduledJob]] = {}
+        self._queued_by_priority: Dict[str, int] = {priority: 0 for priority in PRIORITY_CLASSES}
+        self._running: Dict[str, ScheduledJob] = {}
+        self._running_by_tenant: Dict[str, int] = {}
+        self._usage: Dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._avg_duration = DEFAULT_JOB_DURATION_SECONDS
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "JobScheduler":
+        """
+        BOLTZ_MAX_CONCURRENT_JOBS, BOLTZ_TENANT_MAX_CONCURRENCY,
+        BOLTZ_TENANT_WEIGHTS ("teamA=2,teamB=1") and BOLTZ_AGING_SECONDS.
+        Starts are further capped by free host memory (see admission).
+        """
+        weights = {}
+        for item in os.environ.get("BOLTZ_TENANT_WEIGHTS", "").split(","):
+            if "=" in item:
+                tenant, weight = item.split("=", 1)
+                weights[tenant.strip()] = float(weight)
+
+        tenant_limit = os.environ.get("BOLTZ_TENANT_MAX_CONCURRENCY")
+
+        return cls(
+            max_concurrency=int(os.environ.get("BOLTZ_MAX_CONCURRENT_JOBS", 1)),
+            tenant_max_concurrency=int(tenant_limit) if tenant_limit else None,
+            tenant_weights=weights,
+            aging_seconds=float(os.environ.get("BOLTZ_AGING_SECONDS", 600)),
+            capacity=memory_job_slots,
+        )
+
+    # ---------------------------
+    # Ordering
+    # ---------------------------
+    def _weight(self, tenant: str) -> float:
+        return self.tenant_weights.get(tenant, 1.0)
+
+    def _sort_key(self, job: ScheduledJob, now: float):
+        waited = now - job.enqueued_at
+        aged_class = max(0, PRIORITY_CLASSES[job.priority] - int(waited // self.aging_seconds))
+        return (aged_class, self._usage.get(job.tenant, 0.0), job.enqueued_at)
+
+    def _duration(self, job: ScheduledJob) -> float:
+        return job.estimated_duration or self._avg_duration
+
+    # ---------------------------
+    # Dispatch
+    # ---------------------------
+    def _dequeue_locked(self, job: ScheduledJob):
+        del self._queue[job.job_id]
+        group = self._groups[(job.tenant, job.priority)]
+        group.remove(job)
+        if not group:
+            del self._groups[(job.tenant, job.priority)]
+        self._queued_by_priority[job.priority] -= 1
+
+    def _start_ready_locked(self):
+        if not self._queue:
+            return
+
+        now = time.monotonic()
+        # One job may always start on an idle host, so nothing deadlocks
+        budget = self.max_concurrency - len(self._running)
+        if self.capacity is not None:
+            budget = min(budget, max(self.capacity(), 0 if self._running else 1))
+
+        while budget > 0:
+            candidates = [
+                group[0] for (tenant, _), group in self._groups.items()
+                if self._running_by_tenant.get(tenant, 0) < self.tenant_max_concurrency
+            ]
+            if not candidates:
+                return
+
+            job = min(candidates, key=lambda j: self._sort_key(j, now))
+            self._dequeue_locked(job)
+
+            self._virtual_time = self._usage.get(job.tenant, 0.0)
+            self._usage[job.tenant] = self._virtual_time + 1.0 / self._weight(job.tenant)
+
+            job.started_at = now
+            self._running[job.job_id] = job
+            self._running_by_tenant[job.tenant] = self._running_by_tenant.get(job.tenant, 0) + 1
+            budget -= 1
+            threading.Thread(target=self._execute, args=(job,), daemon=True).start()
+
+    def _execute(self, job: ScheduledJob):
+        try:
+            job.result = job.run()
+        except BaseException as e:
+            job.error = e
+        finally:
+            with self._lock:
+                self._running.pop(job.job_id, None)
+                self._running_by_tenant[job.tenant] -= 1
+                if not self._running_by_tenant[job.tenant]:
+                    del self._running_by_tenant[job.tenant]
+                if job.error is None:
+                    duration = time.monotonic() - job.started_at
+                    self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+                # Hand the freed slot straight to the next job
+                self._start_ready_locked()
+            job.finish()
+
+    def submit(self, job: ScheduledJob) -> ScheduledJob:
+        self.submit_many([job])
+        return job
+
+    def submit_many(self, jobs: List[ScheduledJob]):
+        """
+        Queue several jobs under one lock acquisition, with one idle-tenant
+        scan and one dispatch pass for all of them.
+        """
+        with self._lock:
+            active = {tenant for tenant, _ in self._groups} | set(self._running_by_tenant)
+            for tenant in {job.tenant for job in jobs} - active:
+                self._usage[tenant] = max(
+                    self._usage.get(tenant, 0.0), self._virtual_time
+                )
+
+            for job in jobs:
+                self._queue[job.job_id] = job
+                self._groups.setdefault((job.tenant, job.priority), deque()).append(job)
+                self._queued_by_priority[job.priority] += 1
+            self._start_ready_locked()
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Drop a job that has not started yet. Returns False if it is not queued.
+        """
+        with self._lock:
+            job = self._queue.get(job_id)
+            if job is None:
+                return False
+            self._dequeue_locked(job)
+
+        job.error = BoltzJobCancelled(f"Job {job_id} was cancelled while queued")
+        job.finish()
+        return True
+
+    # ---------------------------
+    # Introspection
+    # ---------------------------
+    def queue_info(self, job_id: str) -> Optional[Dict]:
+        """
+        1-based queue position and estimated seconds until start.
+
+        The estimate replays the queue order over the running jobs'
+        remaining time, ignoring per-tenant caps. Only the jobs ranked
+        ahead of this one are collected under the lock; they are ordered
+        after it is released.
+        """
+        with self._lock:
+            job = self._queue.get(job_id)
+            if job is None:
+                return None
+
+            now = time.monotonic()
+            # Arrival breaks ties, as in dispatch
+            keyed = [
+                ((*self._sort_key(other, now), index), other)
+                for index, other in enumerate(self._queue.values())
+            ]
+            key = next(k for k, other in keyed if other is job)
+            ahead = [(k, self._duration(other)) for k, other in keyed if k < key]
+
+            slots = [
+                max(0.0, self._duration(running) - (now - running.started_at))
+                for running in self._running.values()
+            ]
+
+        slots += [0.0] * (self.max_concurrency - len(slots))
+        heapq.heapify(slots)
+        ahead.sort()
+        for _, duration in ahead:
+            heapq.heappush(slots, heapq.heappop(slots) + duration)
+
+        return {
+            "position": len(ahead) + 1,
+            "estimated_start_seconds": round(heapq.heappop(slots), 1),
+        }
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "queued": len(self._queue),
+                "queued_by_priority": dict(self._queued_by_priority),
+                "running": len(self._running),
+                "max_concurrency": self.max_concurrency,
+                "avg_job_duration_seconds": round(self._avg_duration, 1),
+            }
+
+
+scheduler = JobScheduler.from_env()
@@ -0,0 +1,181 @@
+"""
+Headline scores of finished jobs and the index used to rank them.
+
+Boltz writes confidence_<input>_model_0.json (and affinity_<input>.json
+when affinity was requested) next to each structure. The scores clients
+compare jobs by are read once, when the job completes, and stored in a
+SQLite table with one indexed column per score; /rankings answers from
+that table without touching the job directories.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.utils import workspace
+
+SCORE_INDEX_FILENAME = "scores.db"
+
+CONFIDENCE_SCORES = ("confidence_score", "ptm", "iptm", "complex_plddt")
+AFFINITY_SCORES = ("affinity_pred_value", "affinity_probability_binary")
+SCORES = CONFIDENCE_SCORES + AFFINITY_SCORES
+
+# affinity_pred_value is log10(IC50): lower binds tighter
+ASCENDING_SCORES = {"affinity_pred_value"}
+
+FILTER_PATTERN = re.compile(r"^\s*(\w+)\s*(>=|<=|>|<|=)\s*(-?[\d.]+(?:[eE]-?\d+)?)\s*$")
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS scores ("
+    " job_id TEXT PRIMARY KEY, tenant TEXT, completed_at REAL, "
+    + ", ".join(f"{score} REAL" for score in SCORES)
+    + ");\n"
+    + "".join(
+        f"CREATE INDEX IF NOT EXISTS scores_by_{score} ON scores ({score});\n"
+        for score in SCORES
+    )
+)
+
+
+def _read_json(path: Path) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def extract_scores(pred_dir: Path) -> Dict[str, Optional[float]]:
+    """
+    Scores of the top-ranked model; None for any Boltz did not produce.
+    """
+    scores = dict.fromkeys(SCORES)
+
+    confidence = sorted(pred_dir.glob("confidence_*_model_0.json"))
+    if confidence:
+        data = _read_json(confidence[0])
+        scores.update({k: data.get(k) for k in CONFIDENCE_SCORES})
+
+    affinity = sorted(pred_dir.glob("affinity_*.json"))
+    if affinity:
+        data = _read_json(affinity[0])
+        scores.update({k: data.get(k) for k in AFFINITY_SCORES})
+
+    return scores
+
+
+def parse_filter(expression: str) -> Tuple[str, str, float]:
+    """
+    "iptm>=0.8" -> ("iptm", ">=", 0.8)
+    """
+    match = FILTER_PATTERN.match(expression)
+    if match is None:
+        raise ValueError(f"Invalid filter {expression!r}; expected e.g. iptm>=0.8")
+
+    score, op, value = match.groups()
+    if score not in SCORES:
+        raise ValueError(f"Unknown score {score!r}; use one of {', '.join(SCORES)}")
+    return score, op, float(value)
+
+
+class ScoreIndex:
+    """
+    SQLite table of per-job scores, one connection per thread.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = str(db_path)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+        return db
+
+    def put(self, job_id: str, scores: Dict, tenant: Optional[str] = None):
+        columns = ("job_id", "tenant", "completed_at") + SCORES
+        values = (job_id, tenant, time.time()) + tuple(scores.get(s) for s in SCORES)
+        self._connect().execute(
+            f"INSERT OR REPLACE INTO scores ({', '.join(columns)})"
+            f" VALUES ({', '.join('?' * len(columns))})",
+            values,
+        )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        row = self._connect().execute(
+            "SELECT * FROM scores WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def top(
+        self,
+        score: str,
+        limit: int = 10,
+        ascending: Optional[bool] = None,
+        filters: List[Tuple[str, str, float]] = (),
+        tenant: Optional[str] = None,
+    ) -> List[Dict]:
+        """
+        Best `limit` jobs by score. Column names are checked against
+        SCORES before they reach the query.
+        """
+        if score not in SCORES:
+            raise ValueError(f"Unknown score {score!r}; use one of {', '.join(SCORES)}")
+        if ascending is None:
+            ascending = score in ASCENDING_SCORES
+
+        clauses = [f"{score} IS NOT NULL"]
+        params: List = []
+        for column, op, value in filters:
+            if column not in SCORES:
+                raise ValueError(f"Unknown score {column!r}")
+            clauses.append(f"{column} {op} ?")
+            params.append(value)
+        if tenant is not None:
+            clauses.append("tenant = ?")
+            params.append(tenant)
+
+        rows = self._connect().execute(
+            f"SELECT * FROM scores WHERE {' AND '.join(clauses)}"
+            f" ORDER BY {score} {'ASC' if ascending else 'DESC'}, job_id LIMIT ?",
+            params + [limit],
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+
+_indexes: Dict[str, ScoreIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def score_index() -> ScoreIndex:
+    """
+    The index for the current jobs directory (BOLTZ_SCORE_INDEX overrides
+    its location).
+    """
+    path = os.environ.get("BOLTZ_SCORE_INDEX") or str(workspace.BASE_JOBS_DIR / SCORE_INDEX_FILENAME)
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = ScoreIndex(path)
+    return index
+
+
+def index_job_scores(job_id: str, pred_dir: Path, tenant: Optional[str] = None) -> Dict:
+    """
+    Extract a finished job's scores and add them to the index.
+    """
+    scores = extract_scores(pred_dir) if pred_dir.exists() else dict.fromkeys(SCORES)
+    score_index().put(job_id, scores, tenant=tenant)
+    return scores
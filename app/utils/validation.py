@@ -1,5 +1,29 @@
+import multiprocessing
+import os
 import re
-from rdkit import Chem
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from app.utils.cache import LRUCache
+
+# Parsed SMILES keyed by the (stripped) input string.
+SMILES_CACHE_SIZE = 200_000
+
+# Below this many uncached SMILES, process start-up costs more than it saves.
+PARALLEL_MIN_SMILES = 2_000
+SMILES_CHUNK_SIZE = 1_000
+
+# N marks an unknown nucleotide
+NUCLEIC_ALPHABETS = {
+    "dna": re.compile(r"[ACGTN]+"),
+    "rna": re.compile(r"[ACGUN]+"),
+}
+
+smiles_cache = LRUCache(SMILES_CACHE_SIZE)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
 
 
 def validate_protein_sequence(sequence: str) -> str:
@@ -17,18 +41,117 @@ def validate_protein_sequence(sequence: str) -> str:
     return seq
 
 
-def validate_smiles(smiles: str) -> str:
+def validate_nucleic_sequence(sequence: str, kind: str) -> str:
     """
-    Validate ligand SMILES string.
+    Validate DNA/RNA sequence (single-letter nucleotides, N for unknown).
     """
-    smi = smiles.strip()
+    seq = sequence.strip().upper()
+
+    if not seq:
+        raise ValueError(f"{kind.upper()} sequence is empty")
 
-    if not smi:
-        raise ValueError("SMILES string is empty")
+    if not NUCLEIC_ALPHABETS[kind].fullmatch(seq):
+        raise ValueError(f"{kind.upper()} sequence contains invalid characters")
+
+    return seq
+
+
+def parse_smiles(smi: str) -> Dict:
+    """
+    Parse one SMILES with RDKit into its canonical form and the
+    descriptors used for size-based routing. Not cached.
+    """
+    from rdkit import Chem, RDLogger
+    from rdkit.Chem import rdMolDescriptors
+
+    RDLogger.DisableLog("rdApp.*")
+    mol = Chem.MolFromSmiles(smi) if smi else None
 
-    mol = Chem.MolFromSmiles(smi)
     if mol is None:
-        raise ValueError("Invalid SMILES string")
+        return {
+            "valid": False,
+            "error": "SMILES string is empty" if not smi else "Invalid SMILES string",
+        }
+
+    return {
+        "valid": True,
+        "canonical_smiles": Chem.MolToSmiles(mol),
+        "heavy_atoms": mol.GetNumHeavyAtoms(),
+        "rotatable_bonds": rdMolDescriptors.CalcNumRotatableBonds(mol),
+    }
+
+
+def _parse_chunk(chunk: List[str]) -> List[Dict]:
+    return [parse_smiles(smi) for smi in chunk]
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: never fork a server process that is running threads
+            _pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def describe_smiles(smiles: str) -> Dict:
+    """
+    Memoized parse_smiles, keyed by the stripped input string.
+    """
+    smi = smiles.strip()
+    result = smiles_cache.get(smi)
+    if result is None:
+        result = smiles_cache.put(smi, parse_smiles(smi))
+    return result
+
+
+def validate_smiles(smiles: str) -> str:
+    """
+    Validate ligand SMILES string and return its canonical form.
+    """
+    result = describe_smiles(smiles)
+
+    if not result["valid"]:
+        raise ValueError(result["error"])
+
+    return result["canonical_smiles"]
+
+
+def validate_smiles_batch(smiles_list: List[str], parallel: Optional[bool] = None) -> List[Dict]:
+    """
+    Validate many SMILES at once, in input order.
+
+    Duplicates and previously seen strings are answered from the cache;
+    the remaining unique strings are parsed in chunks across a process
+    pool when there are enough of them to pay for it.
+    """
+    keys = [smi.strip() for smi in smiles_list]
+
+    known = {}
+    missing = []
+    for key in dict.fromkeys(keys):
+        result = smiles_cache.get(key)
+        if result is None:
+            missing.append(key)
+        else:
+            known[key] = result
+
+    if parallel is None:
+        parallel = len(missing) >= PARALLEL_MIN_SMILES
+
+    if parallel and missing:
+        chunks = [
+            missing[i:i + SMILES_CHUNK_SIZE]
+            for i in range(0, len(missing), SMILES_CHUNK_SIZE)
+        ]
+        parsed = [r for chunk in _get_pool().map(_parse_chunk, chunks) for r in chunk]
+    else:
+        parsed = _parse_chunk(missing)
 
-    return smi
+    for key, result in zip(missing, parsed):
+        known[key] = smiles_cache.put(key, result)
 
+    return [{"smiles": smi, **known[key]} for smi, key in zip(smiles_list, keys)]
@@ -0,0 +1,75 @@
+"""
+Background import of the scientific stack.
+
+Heavy modules are imported lazily on first use so the process answers
+/health within a second of starting. With BOLTZ_WARMUP=1 they are also
+pulled in on a background thread at startup, and /ready reports 503
+until that finishes, so a load balancer only routes traffic to instances
+whose first request will not pay the import cost.
+"""
+
+import importlib
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+HEAVY_MODULES = (
+    "numpy",
+    "Bio.PDB",
+    "freesasa",
+    "rdkit.Chem",
+    "rdkit.Chem.rdMolDescriptors",
+)
+
+WARMUP_ENABLED = os.environ.get("BOLTZ_WARMUP", "0").lower() in ("1", "true", "yes")
+
+_done = threading.Event()
+_state: Dict = {"started": False, "seconds": {}, "errors": {}}
+_lock = threading.Lock()
+
+
+def _warm():
+    try:
+        for name in HEAVY_MODULES:
+            start = time.perf_counter()
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                # A missing optional module must not hold readiness forever
+                _state["errors"][name] = str(e)
+            _state["seconds"][name] = round(time.perf_counter() - start, 3)
+    finally:
+        _done.set()
+
+
+def start_warmup(enabled: Optional[bool] = None) -> bool:
+    """
+    Start the background warm-up once. Returns False when disabled, in
+    which case the service counts as ready immediately.
+    """
+    if enabled is None:
+        enabled = WARMUP_ENABLED
+
+    with _lock:
+        if _state["started"]:
+            return True
+        if not enabled:
+            _done.set()
+            return False
+        _state["started"] = True
+
+    threading.Thread(target=_warm, name="warmup", daemon=True).start()
+    return True
+
+
+def is_ready() -> bool:
+    return _done.is_set()
+
+
+def warmup_status() -> Dict:
+    return {
+        "ready": is_ready(),
+        "import_seconds": dict(_state["seconds"]),
+        "import_errors": dict(_state["errors"]),
+    }
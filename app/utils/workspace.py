@@ -1,10 +1,16 @@
 import json
+import os
+import threading
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterable, Tuple
+from app.utils.metrics import PIPELINE_STAGE_SECONDS, timed
 
 BASE_JOBS_DIR = Path("/tmp/boltz_jobs")
 
+_meta_lock = threading.Lock()
 
+
+@timed(PIPELINE_STAGE_SECONDS, stage="workspace")
 def create_workspace(job_id: str) -> Dict[str, Path]:
     """
     Create filesystem workspace for a Boltz job.
@@ -30,3 +36,77 @@ def create_workspace(job_id: str) -> Dict[str, Path]:
         "outputs": outputs_dir,
     }
 
+
+@timed(PIPELINE_STAGE_SECONDS, stage="workspace")
+def create_workspaces(jobs: Iterable[Tuple[str, Dict]]):
+    """
+    create_workspace for many jobs at once, from (job_id, meta) pairs.
+
+    Only the job directory and its meta.json are made, with meta.json
+    already holding the job's submission fields (one write instead of a
+    create and a locked rewrite). inputs/ and outputs/ are created when
+    the job starts: directory creation dominates bulk submission.
+    """
+    BASE_JOBS_DIR.mkdir(parents=True, exist_ok=True)
+    base = str(BASE_JOBS_DIR)
+
+    for job_id, meta in jobs:
+        job_dir = os.path.join(base, job_id)
+        os.mkdir(job_dir)
+        with open(os.path.join(job_dir, "meta.json"), "w") as f:
+            f.write(json.dumps({"job_id": job_id, **meta}, indent=2))
+
+
+def workspace_paths(job_id: str) -> Dict[str, Path]:
+    job_dir = BASE_JOBS_DIR / job_id
+    return {
+        "job_dir": job_dir,
+        "inputs": job_dir / "inputs",
+        "outputs": job_dir / "outputs",
+    }
+
+
+def get_workspace(job_id: str) -> Dict[str, Path]:
+    """
+    Paths of an existing job workspace (e.g. on a worker node).
+    """
+    if not (BASE_JOBS_DIR / job_id).exists():
+        raise FileNotFoundError(f"Job not found: {job_id}")
+
+    return workspace_paths(job_id)
+
+
+def update_job_meta(job_id: str, **fields) -> Dict:
+    """
+    Merge fields into a job's meta.json and return the updated record.
+    """
+    meta_path = BASE_JOBS_DIR / job_id / "meta.json"
+    tmp_path = meta_path.with_suffix(".json.tmp")
+
+    with _meta_lock:
+        meta = {"job_id": job_id}
+        if meta_path.exists():
+            with open(meta_path) as f:
+                meta = json.load(f)
+
+        meta.update(fields)
+
+        # Replace atomically so concurrent readers never see a partial file
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, meta_path)
+
+    return meta
+
+
+def read_job_meta(job_id: str) -> Dict:
+    """
+    Load a job's meta.json.
+    """
+    meta_path = BASE_JOBS_DIR / job_id / "meta.json"
+
+    if not meta_path.exists():
+        raise FileNotFoundError(f"Job not found: {job_id}")
+
+    with open(meta_path) as f:
+        return json.load(f)
@@ -1,8 +1,56 @@
 import yaml
 from pathlib import Path
-from typing import List
+from typing import Dict, List
 
+from app.utils.metrics import PIPELINE_STAGE_SECONDS, timed
 
+
+def input_entry(entity) -> Dict:
+    """
+    One entry of the Boltz `sequences` list.
+    """
+    entity_type = entity.type
+    entity_id = entity.id
+
+    if entity_type == "protein":
+        return {
+            "protein": {
+                "id": entity_id,
+                "sequence": entity.sequence,
+            }
+        }
+
+    elif entity_type in ("dna", "rna"):
+        return {
+            entity_type: {
+                "id": entity_id,
+                "sequence": entity.sequence,
+            }
+        }
+
+    elif entity_type == "ligand":
+        return {
+            "ligand": {
+                "id": entity_id,
+                "smiles": entity.smiles,
+            }
+        }
+
+    else:
+        raise ValueError(f"Unsupported sequence type: {entity_type}")
+
+
+def affinity_properties(binder: str) -> List[Dict]:
+    return [
+        {
+            "affinity": {
+                "binder": binder
+            }
+        }
+    ]
+
+
+@timed(PIPELINE_STAGE_SECONDS, stage="write_yaml")
 def write_boltz_input_yaml(
     yaml_path: Path,
     sequences: List,
@@ -14,61 +62,47 @@ def write_boltz_input_yaml(
 
     yaml_data = {
         "version": 1,
-        "sequences": [],
+        "sequences": [input_entry(entity) for entity in sequences],
     }
 
-    ligand_ids = []
-
-    # --- sequences ---
-    for entity in sequences:
-        entity_type = entity.type
-        entity_id = entity.id
-
-        if entity_type == "protein":
-            yaml_data["sequences"].append(
-                {
-                    "protein": {
-                        "id": entity_id,
-                        "sequence": entity.sequence,
-                    }
-                }
-            )
-
-        elif entity_type in ("dna", "rna"):
-            yaml_data["sequences"].append(
-                {
-                    entity_type: {
-                        "id": entity_id,
-                        "sequence": entity.sequence,
-                    }
-                }
-            )
-
-        elif entity_type == "ligand":
-            ligand_ids.append(entity_id)
-            yaml_data["sequences"].append(
-                {
-                    "ligand": {
-                        "id": entity_id,
-                        "smiles": entity.smiles,
-                    }
-                }
-            )
-
-        else:
-            raise ValueError(f"Unsupported sequence type: {entity_type}")
+    ligand_ids = [entity.id for entity in sequences if entity.type == "ligand"]
 
     # --- properties (affinity) ---
     if ligand_ids:
-        yaml_data["properties"] = [
-            {
-                "affinity": {
-                    "binder": ligand_ids[0]
-                }
-            }
-        ]
+        yaml_data["properties"] = affinity_properties(ligand_ids[0])
 
     yaml_path.parent.mkdir(parents=True, exist_ok=True)
 
     with open(yaml_path, "w") as f:
         yaml.safe_dump(yaml_data, f, sort_keys=False)
+
+
+class ScreenInputTemplate:
+    """
+    Boltz input for a ligand screen: every job shares the same entities
+    and differs by one ligand. The shared part and the affinity block are
+    serialized once; a job only dumps its own ligand entry. The text is
+    identical to what write_boltz_input_yaml writes for the same entities.
+    """
+
+    def __init__(self, shared: List, ligand_id: str):
+        self.ligand_id = ligand_id
+
+        self.header = yaml.safe_dump(
+            {"version": 1, "sequences": [input_entry(entity) for entity in shared]},
+            sort_keys=False,
+        )
+
+        # Affinity is predicted for the first ligand, as in write_boltz_input_yaml
+        ligand_ids = [entity.id for entity in shared if entity.type == "ligand"] + [ligand_id]
+        self.footer = yaml.safe_dump({"properties": affinity_properties(ligand_ids[0])}, sort_keys=False)
+
+    def render(self, smiles: str) -> str:
+        entry = yaml.safe_dump([{"ligand": {"id": self.ligand_id, "smiles": smiles}}], sort_keys=False)
+        return self.header + entry + self.footer
+
+
+@timed(PIPELINE_STAGE_SECONDS, stage="write_yaml")
+def write_rendered_input(yaml_path: Path, text: str):
+    yaml_path.parent.mkdir(parents=True, exist_ok=True)
+    yaml_path.write_text(text)
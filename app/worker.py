@@ -0,0 +1,180 @@
+"""
+Execution-tier worker: claims jobs from the broker and runs Boltz.
+
+    BOLTZ_BROKER_URL=sqlite:////var/lib/boltz/broker.db python -m app.worker
+
+Run one worker per GPU, on any node that mounts the same BASE_JOBS_DIR.
+"""
+
+import argparse
+import logging
+import os
+import socket
+import threading
+from typing import Optional
+
+from app.broker import broker_from_url
+from app.broker.base import CANCEL_REQUESTED, LEASE_LOST, JobBroker
+from app.schemas.predict import PredictComplexRequest
+from app.utils.batches import record_job_result
+from app.utils.cli import (
+    BoltzJobAbandoned,
+    BoltzJobCancelled,
+    BoltzJobTimeout,
+    abandon_boltz_job,
+    cancel_boltz_job,
+    register_boltz_job,
+)
+from app.utils.jobs import cleanup_partial_outputs, run_prediction_job
+from app.utils.workspace import get_workspace, update_job_meta
+
+logger = logging.getLogger("boltz.worker")
+
+DEFAULT_LEASE_SECONDS = 60.0
+DEFAULT_POLL_SECONDS = 2.0
+MAX_ATTEMPTS = 3
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _keep_lease(broker: JobBroker, job_id: str, worker_id: str, lease_seconds: float, stop: threading.Event):
+    """
+    Heartbeat at a third of the lease; stop Boltz if the job was cancelled
+    through the API, or abandon it if the lease was lost.
+    """
+    while not stop.wait(lease_seconds / 3):
+        outcome = broker.heartbeat(job_id, worker_id, lease_seconds)
+        if outcome == CANCEL_REQUESTED:
+            logger.info("Stopping %s: cancelled", job_id)
+            cancel_boltz_job(job_id)
+            return
+        if outcome == LEASE_LOST:
+            logger.warning("Abandoning %s: lease lost", job_id)
+            abandon_boltz_job(job_id)
+            return
+
+
+def reap_expired(broker: JobBroker):
+    """
+    Put jobs from dead workers back in the queue, fail them, or finish
+    their pending cancel.
+    """
+    outcome = broker.requeue_expired(max_attempts=MAX_ATTEMPTS)
+    for job_id in outcome["requeued"]:
+        logger.warning("Requeued %s after its lease expired", job_id)
+        update_job_meta(job_id, status="QUEUED")
+    for job_id in outcome["failed"]:
+        update_job_meta(
+            job_id,
+            status="FAILED",
+            error=f"Lease expired {MAX_ATTEMPTS} times; giving up",
+        )
+        record_job_result(job_id)
+    for job_id in outcome["cancelled"]:
+        # Cancelled while running; its worker died before it could stop
+        update_job_meta(job_id, status="CANCELLED")
+        record_job_result(job_id)
+
+
+def run_one(broker: JobBroker, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+    """
+    Claim and run at most one job. Returns False if the queue was empty.
+    """
+    reap_expired(broker)
+
+    job = broker.claim(worker_id, lease_seconds)
+    if job is None:
+        return False
+
+    job_id = job["job_id"]
+    stop = threading.Event()
+    state: Optional[str] = "COMPLETED"
+    try:
+        try:
+            request = PredictComplexRequest(**job["payload"])
+            job_workspace = get_workspace(job_id)
+            if job["attempts"] > 1:
+                # A previous worker died mid-run
+                cleanup_partial_outputs(job_workspace["outputs"])
+        except Exception as e:
+            # Nothing to retry: fail the job now instead of letting its
+            # lease expire and another worker claim it again
+            update_job_meta(job_id, status="FAILED", error=f"Could not start job: {e}")
+            record_job_result(job_id)
+            raise
+
+        register_boltz_job(job_id)
+        threading.Thread(
+            target=_keep_lease,
+            args=(broker, job_id, worker_id, lease_seconds, stop),
+            daemon=True,
+        ).start()
+
+        run_prediction_job(
+            job_id,
+            job_workspace,
+            request.sequences,
+            timeout=request.timeout_seconds,
+        )
+    except BoltzJobAbandoned:
+        # Whoever holds the job now reports it
+        state = None
+    except BoltzJobCancelled:
+        state = "CANCELLED"
+    except BoltzJobTimeout:
+        state = "TIMED_OUT"
+    except Exception:
+        logger.exception("Job %s failed", job_id)
+        state = "FAILED"
+    finally:
+        stop.set()
+        if state is not None:
+            broker.complete(job_id, worker_id, state)
+
+    return True
+
+
+def run_worker(
+    broker: JobBroker,
+    worker_id: str,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    poll_seconds: float = DEFAULT_POLL_SECONDS,
+    stop: Optional[threading.Event] = None,
+):
+    stop = stop or threading.Event()
+    logger.info("Worker %s started", worker_id)
+    while not stop.is_set():
+        try:
+            claimed = run_one(broker, worker_id, lease_seconds)
+        except Exception:
+            # e.g. the broker is briefly unreachable: keep the worker alive
+            logger.exception("Worker %s iteration failed", worker_id)
+            claimed = False
+        if not claimed:
+            stop.wait(poll_seconds)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--broker-url", default=os.environ.get("BOLTZ_BROKER_URL"))
+    parser.add_argument("--worker-id", default=default_worker_id())
+    parser.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS)
+    parser.add_argument("--poll-seconds", type=float, default=DEFAULT_POLL_SECONDS)
+    args = parser.parse_args(argv)
+
+    if not args.broker_url:
+        parser.error("--broker-url or BOLTZ_BROKER_URL is required")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    run_worker(
+        broker_from_url(args.broker_url),
+        args.worker_id,
+        lease_seconds=args.lease_seconds,
+        poll_seconds=args.poll_seconds,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Request-path concurrency benchmark.
+
+Holds --waiters synchronous POST /predict calls open (against the fake
+Boltz, --slots jobs of --job-seconds at a time) and meanwhile fires --requests
+status and file-listing reads, --concurrency at a time. It reports
+latency percentiles for the reads. While a route blocks a worker thread
+for a whole job, the reads queue behind the waiters.
+
+Runs the app in-process through httpx's ASGI transport, so no server
+or GPU is needed:
+
+    python benchmarks/concurrency.py [--waiters 60] [--requests 2000]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+FAKE_BOLTZ = ROOT_DIR / "tests" / "fake_boltz.py"
+
+PAYLOAD = {
+    "sequences": [
+        {"type": "protein", "id": "A", "sequence": "MKVKVGVNGFGRIGRLVTRAAFNSGKVDIVAINDPF"}
+    ]
+}
+
+
+def configure(jobs_dir: Path, slots: int, job_seconds: float):
+    """
+    Environment for the in-process app; must run before app is imported.
+    """
+    os.environ["BOLTZ_BIN"] = f"{sys.executable} {FAKE_BOLTZ}"
+    os.environ["FAKE_BOLTZ_DELAY"] = str(job_seconds)
+    os.environ["BOLTZ_MAX_CONCURRENT_JOBS"] = str(slots)
+    os.environ["BOLTZ_MAX_QUEUE_DEPTH"] = "100000"
+    os.environ["BOLTZ_JOB_MEMORY_GB"] = "0.001"
+    os.environ.pop("BOLTZ_BROKER_URL", None)
+    sys.path.insert(0, str(ROOT_DIR))
+
+    import importlib
+
+    for name in ("app.utils.workspace", "app.utils.results", "app.routers.results", "app.routers.analysis"):
+        setattr(importlib.import_module(name), "BASE_JOBS_DIR", jobs_dir)
+
+
+def seed_job(job_id: str):
+    """
+    A finished job for the read traffic to hit.
+    """
+    from app.utils import results
+    from app.utils.workspace import create_workspace, update_job_meta
+
+    create_workspace(job_id)
+    pred_dir = results.BASE_JOBS_DIR / job_id / "outputs" / "boltz_results_input" / "predictions" / "input"
+    pred_dir.mkdir(parents=True)
+    (pred_dir / "input_model_0.cif").write_text("data_model\n")
+    update_job_meta(job_id, status="COMPLETED")
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run(args):
+    import httpx
+    from app.main import app
+
+    seed_job("seeded")
+    transport = httpx.ASGITransport(app=app)
+    latencies = {"GET /jobs/{id}": [], "GET /results/{id}/files": []}
+    errors = 0
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        start = time.perf_counter()
+        waiters = [asyncio.create_task(client.post("/predict", json=PAYLOAD)) for _ in range(args.waiters)]
+        await asyncio.sleep(args.warmup)
+
+        gate = asyncio.Semaphore(args.concurrency)
+
+        async def read(i):
+            nonlocal errors
+            name, url = (
+                ("GET /jobs/{id}", "/jobs/seeded") if i % 2 == 0
+                else ("GET /results/{id}/files", "/results/seeded/files")
+            )
+            async with gate:
+                t0 = time.perf_counter()
+                response = await client.get(url)
+                latencies[name].append(time.perf_counter() - t0)
+                errors += response.status_code != 200
+
+        reads_start = time.perf_counter()
+        await asyncio.gather(*(read(i) for i in range(args.requests)))
+        reads_seconds = time.perf_counter() - reads_start
+
+        predicted = await asyncio.gather(*waiters)
+        total_seconds = time.perf_counter() - start
+
+    print(f"{args.waiters} /predict waiters ({args.job_seconds:g}s jobs, {args.slots} slots), "
+          f"{args.requests} reads at concurrency {args.concurrency}")
+    print(f"{'endpoint':<26}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, values in latencies.items():
+        ms = [v * 1000 for v in values]
+        print(
+            f"{name:<26}{len(ms):>7}{statistics.median(ms):>10.1f}{percentile(ms, 0.95):>10.1f}"
+            f"{percentile(ms, 0.99):>10.1f}{max(ms):>10.1f}"
+        )
+    print(f"reads: {args.requests / reads_seconds:.0f} req/s over {reads_seconds:.2f}s, {errors} errors")
+    print(f"/predict: {sum(r.status_code == 200 for r in predicted)}/{args.waiters} completed, "
+          f"{total_seconds:.2f}s wall")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--waiters", type=int, default=60, help="Concurrent blocking /predict calls")
+    parser.add_argument("--job-seconds", type=float, default=1.0)
+    parser.add_argument("--slots", type=int, default=4, help="Jobs run at once (GPU slots)")
+    parser.add_argument("--requests", type=int, default=2000, help="Status/result reads to issue")
+    parser.add_argument("--concurrency", type=int, default=200, help="Reads in flight at once")
+    parser.add_argument("--warmup", type=float, default=0.5, help="Seconds between waiters and reads")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="boltz_bench_") as jobs_dir:
+        configure(Path(jobs_dir), args.slots, args.job_seconds)
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
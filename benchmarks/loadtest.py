@@ -0,0 +1,276 @@
+"""
+Load test: virtual users submitting, polling, fetching and analysing jobs.
+
+Each user loops until --duration is up. It submits a job (POST /jobs,
+with a payload drawn from a protein / complex / ligand / DNA mix) and
+polls GET /jobs/{id} until the job is finished. It then lists the result
+files, runs POST /analysis/{id}, and now and then reads /rankings.
+
+Boltz is tests/fake_boltz.py, which writes a realistic output tree after
+--job-seconds (+ --seconds-per-token, +/- --jitter).
+
+For each endpoint it reports throughput, latency percentiles and CPU
+time. Each sample of process CPU is split across the endpoints that had
+requests in flight at the time. It also reports peak RSS and the CPU
+used by the Boltz subprocesses.
+
+    python benchmarks/loadtest.py --users 20 --duration 60
+    python benchmarks/loadtest.py --url http://localhost:8000 --server-pid 1234
+
+By default the app runs in-process behind httpx's ASGI transport, so no
+server, GPU or CI setup is needed.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+from concurrency import configure, percentile
+
+TERMINAL_STATUSES = {"COMPLETED", "FAILED", "CANCELLED", "TIMED_OUT"}
+
+WORKLOAD = {
+    "protein": (
+        3,
+        [{"type": "protein", "id": "A", "sequence": "MKVKVGVNGFGRIGRLVTRAAFNSGKVDIVAINDPF" * 2}],
+    ),
+    "protein_protein": (
+        2,
+        [
+            {"type": "protein", "id": "A", "sequence": "MKVKVGVNGFGRIGRLVTRAAFNSGKVDIVAINDPF"},
+            {"type": "protein", "id": "B", "sequence": "GSHMSLEQKLISEEDLNGAAHHHHHH"},
+        ],
+    ),
+    "protein_ligand": (
+        3,
+        [
+            {"type": "protein", "id": "A", "sequence": "MKVKVGVNGFGRIGRLVTRAAFNSGKVDIVAINDPF"},
+            {"type": "ligand", "id": "L", "smiles": "CC(=O)Oc1ccccc1C(=O)O"},
+        ],
+    ),
+    "protein_dna": (
+        2,
+        [
+            {"type": "protein", "id": "A", "sequence": "MKRKRGRPRKSLEQ"},
+            {"type": "dna", "id": "B", "sequence": "ATGCGTACGTTAGC"},
+        ],
+    ),
+}
+
+
+class Recorder:
+    """
+    Latencies and status codes per endpoint, plus the number of requests
+    in flight per endpoint (for CPU attribution).
+    """
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.in_flight = defaultdict(int)
+        self.cpu_seconds = defaultdict(float)
+
+    @contextmanager
+    def request(self, endpoint: str):
+        self.in_flight[endpoint] += 1
+        start = time.perf_counter()
+        outcome = {"status": "error"}
+        try:
+            yield outcome
+        finally:
+            self.in_flight[endpoint] -= 1
+            self.latencies[endpoint].append(time.perf_counter() - start)
+            self.statuses[endpoint][outcome["status"]] += 1
+
+
+async def call(client, recorder: Recorder, endpoint: str, method: str, url: str, **kwargs):
+    with recorder.request(endpoint) as outcome:
+        response = await client.request(method, url, **kwargs)
+        outcome["status"] = response.status_code
+        return response
+
+
+async def virtual_user(client, recorder: Recorder, args, deadline: float, rng: random.Random):
+    names = list(WORKLOAD)
+    weights = [WORKLOAD[name][0] for name in names]
+
+    while time.monotonic() < deadline:
+        kind = rng.choices(names, weights)[0]
+        response = await call(
+            client, recorder, "POST /jobs", "POST", "/jobs",
+            json={"sequences": WORKLOAD[kind][1], "priority": rng.choice(["interactive", "bulk"])},
+        )
+        if response.status_code != 202:
+            await asyncio.sleep(min(float(response.headers.get("Retry-After", 1)), args.poll_interval * 4))
+            continue
+
+        job_id = response.json()["job_id"]
+        while True:
+            await asyncio.sleep(args.poll_interval)
+            status = await call(client, recorder, "GET /jobs/{id}", "GET", f"/jobs/{job_id}")
+            if status.status_code != 200 or status.json().get("status") in TERMINAL_STATUSES:
+                break
+
+        await call(client, recorder, "GET /results/{id}/files", "GET", f"/results/{job_id}/files")
+        await call(client, recorder, "POST /analysis/{id}", "POST", f"/analysis/{job_id}")
+        if rng.random() < args.rankings_share:
+            await call(client, recorder, "GET /rankings", "GET", "/rankings", params={"score": "iptm"})
+
+
+async def sample_resources(recorder: Recorder, pid: int, stop: asyncio.Event, interval: float = 0.1):
+    """
+    Process CPU split over in-flight endpoints, and peak RSS.
+    """
+    import psutil
+
+    process = psutil.Process(pid)
+    usage = {"peak_rss_bytes": 0, "cpu_seconds": 0.0}
+    last = sum(process.cpu_times()[:2])
+
+    while not stop.is_set():
+        await asyncio.sleep(interval)
+        now = sum(process.cpu_times()[:2])
+        delta, last = now - last, now
+        usage["cpu_seconds"] += delta
+        usage["peak_rss_bytes"] = max(usage["peak_rss_bytes"], process.memory_info().rss)
+
+        busy = {name: n for name, n in recorder.in_flight.items() if n > 0}
+        total = sum(busy.values())
+        for name, n in busy.items():
+            recorder.cpu_seconds[name] += delta * n / total
+        if not total:
+            recorder.cpu_seconds["(idle / jobs)"] += delta
+
+    return usage
+
+
+def report(recorder: Recorder, usage, elapsed: float, children_cpu: float, args):
+    rows = []
+    for name in sorted(recorder.latencies):
+        ms = [v * 1000 for v in recorder.latencies[name]]
+        count = len(ms)
+        ok = sum(n for status, n in recorder.statuses[name].items() if isinstance(status, int) and status < 400)
+        rows.append({
+            "endpoint": name,
+            "count": count,
+            "errors": count - ok,
+            "rps": round(count / elapsed, 2),
+            "p50_ms": round(statistics.median(ms), 1),
+            "p95_ms": round(percentile(ms, 0.95), 1),
+            "p99_ms": round(percentile(ms, 0.99), 1),
+            "cpu_ms_per_request": round(recorder.cpu_seconds[name] * 1000 / count, 2) if usage else None,
+            "statuses": {str(k): v for k, v in recorder.statuses[name].items()},
+        })
+
+    print(f"{args.users} users for {elapsed:.1f}s ({args.slots} slots, {args.job_seconds:g}s jobs)")
+    print(f"{'endpoint':<26}{'count':>7}{'err':>5}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'cpu ms/req':>12}")
+    for row in rows:
+        cpu = f"{row['cpu_ms_per_request']:.2f}" if row["cpu_ms_per_request"] is not None else "-"
+        print(
+            f"{row['endpoint']:<26}{row['count']:>7}{row['errors']:>5}{row['rps']:>8.2f}"
+            f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}{cpu:>12}"
+        )
+
+    summary = {"elapsed_seconds": round(elapsed, 2), "endpoints": rows}
+    if usage:
+        summary.update({
+            "server_cpu_seconds": round(usage["cpu_seconds"], 2),
+            "server_cpu_percent": round(100 * usage["cpu_seconds"] / elapsed, 1),
+            "server_peak_rss_mb": round(usage["peak_rss_bytes"] / 2**20, 1),
+        })
+        print(
+            f"server: {summary['server_cpu_seconds']}s CPU ({summary['server_cpu_percent']}%), "
+            f"peak RSS {summary['server_peak_rss_mb']} MB"
+        )
+    if children_cpu is not None:
+        summary["boltz_cpu_seconds"] = round(children_cpu, 2)
+        print(f"boltz subprocesses: {summary['boltz_cpu_seconds']}s CPU")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(summary, indent=2))
+
+
+async def run(args):
+    import httpx
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+        pid = args.server_pid
+    else:
+        from app.main import app
+
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=args.timeout
+        )
+        pid = os.getpid()
+
+    recorder = Recorder()
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_resources(recorder, pid, stop)) if pid else None
+    children_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    start = time.monotonic()
+    deadline = start + args.duration
+    rng = random.Random(args.seed)
+    async with client:
+        await asyncio.gather(*(
+            virtual_user(client, recorder, args, deadline, random.Random(rng.random()))
+            for _ in range(args.users)
+        ))
+    elapsed = time.monotonic() - start
+
+    stop.set()
+    usage = await sampler if sampler else None
+
+    children_cpu = None
+    if not args.url:
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        children_cpu = (children.ru_utime + children.ru_stime) - (children_before.ru_utime + children_before.ru_stime)
+
+    report(recorder, usage, elapsed, children_cpu, args)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to keep starting jobs")
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--rankings-share", type=float, default=0.2, help="Share of jobs followed by /rankings")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--json", help="Also write the summary to this file")
+
+    fake = parser.add_argument_group("in-process fake Boltz")
+    fake.add_argument("--slots", type=int, default=4, help="Jobs run at once (GPU slots)")
+    fake.add_argument("--job-seconds", type=float, default=2.0)
+    fake.add_argument("--seconds-per-token", type=float, default=0.0)
+    fake.add_argument("--jitter", type=float, default=0.3)
+
+    remote = parser.add_argument_group("external server")
+    remote.add_argument("--url", help="Drive a running server instead of the in-process app")
+    remote.add_argument("--server-pid", type=int, help="Sample CPU/RSS of this process")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        asyncio.run(run(args))
+        return
+
+    with tempfile.TemporaryDirectory(prefix="boltz_loadtest_") as jobs_dir:
+        configure(Path(jobs_dir), args.slots, args.job_seconds)
+        os.environ["FAKE_BOLTZ_DELAY_PER_TOKEN"] = str(args.seconds_per_token)
+        os.environ["FAKE_BOLTZ_JITTER"] = str(args.jitter)
+        os.environ["FAKE_BOLTZ_SEED"] = str(args.seed)
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
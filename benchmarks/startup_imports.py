@@ -0,0 +1,72 @@
+"""
+Startup import benchmark.
+
+Imports the application in a fresh interpreter under `python -X importtime`
+and reports cumulative import time per module, so regressions in cold
+start (e.g. a router pulling RDKit in at import time) show up directly.
+
+    python benchmarks/startup_imports.py [--top 25] [--module app.main]
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+# Modules that should only load on first use
+HEAVY_PREFIXES = ("rdkit", "Bio", "freesasa", "numpy")
+
+
+def measure(module: str):
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = time.perf_counter() - start
+
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumul, name = line[len("import time:"):].split("|")
+        if not cumul.strip().isdigit():
+            continue  # header row
+        cumulative[name.strip()] = int(cumul) / 1e6
+
+    return wall, cumulative
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args(argv)
+
+    wall, cumulative = measure(args.module)
+
+    print(f"{args.module}: {wall:.3f}s wall (interpreter start included)\n")
+    print(f"{'cumulative s':>12}  module")
+    for name, seconds in sorted(cumulative.items(), key=lambda kv: -kv[1])[: args.top]:
+        print(f"{seconds:12.3f}  {name}")
+
+    heavy = sorted(
+        name for name in cumulative
+        if name.split(".")[0] in HEAVY_PREFIXES
+    )
+    print()
+    if heavy:
+        print("Heavy modules loaded at startup: " + ", ".join(heavy))
+    else:
+        print("No heavy scientific modules loaded at startup.")
+    return 1 if heavy else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Job submission throughput for ligand screens.
+
+Submits --jobs protein-ligand jobs three ways and reports jobs per
+second for each:
+
+  jobs    one POST /jobs per ligand
+  batch   one POST /jobs/batch holding every job
+  screen  one POST /jobs/screen (shared receptor + SMILES list)
+
+No job runs: the scheduler's only slot is held, so only submission
+(request validation, workspaces, meta.json, queueing) is measured. It also times
+writing each job's input.yaml from scratch against rendering it from the
+screen template.
+
+    python benchmarks/submission.py [--jobs 5000]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from concurrency import configure
+
+RECEPTOR = [
+    {
+        "type": "protein",
+        "id": "A",
+        "sequence": "MKVKVGVNGFGRIGRLVTRAAFNSGKVDIVAINDPFIDLNYMVYMFQYDSTHGKFHGTVKAENGKLVINGNPITIFQERDPSKIKWGDAGAEYVVESTGVFTTMEKAGAHLQGGAKRVIISAPSADAPMFVMGVNHEKYDNSLKIISNASCTTNCLAPLAKVIHDNFGIVEGLMTTVHAITATQKTVDGPSGKLWRDGRGALQNIIPASTGAAKAVGKVIPELNGKLTGMAFRVPTANVSVVDLTCRLEKPAKYDDIKKVVKQASEGPLKGILGYTEHQVVSSDFNSDTHSSTFDAGAGIALNDHFVKLISWYDNEFGYSNRVVDLMAHMASKE",
+    }
+]
+
+
+def screen_smiles(n: int):
+    """
+    n distinct small molecules: one alkyl-amine segment per decimal digit
+    of the job number, capped with a hydroxyl.
+    """
+    return ["".join("C" * (int(d) + 1) + "N" for d in str(i)) + "O" for i in range(n)]
+
+
+def fresh_scheduler(gate):
+    """
+    An empty scheduler whose one slot is held until the gate opens, so
+    submitted jobs stay queued. The gate is never opened: the daemon
+    thread holding the slot ends with the process.
+    """
+    from app.utils import jobs
+    from app.utils.scheduler import JobScheduler, ScheduledJob
+
+    jobs.scheduler = JobScheduler(max_concurrency=1)
+    jobs.scheduler.submit(ScheduledJob("blocker", run=gate.wait))
+
+
+async def submit(args, ligands):
+    import httpx
+    from app.main import app
+
+    timings = {}
+    gate = threading.Event()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        fresh_scheduler(gate)
+        start = time.perf_counter()
+        for smiles in ligands:
+            response = await client.post(
+                "/jobs", json={"sequences": RECEPTOR + [{"type": "ligand", "id": "L", "smiles": smiles}]}
+            )
+            assert response.status_code == 202, response.text
+        timings["jobs"] = time.perf_counter() - start
+
+        fresh_scheduler(gate)
+        start = time.perf_counter()
+        response = await client.post(
+            "/jobs/batch",
+            json={"jobs": [
+                {"sequences": RECEPTOR + [{"type": "ligand", "id": "L", "smiles": smiles}]}
+                for smiles in ligands
+            ]},
+        )
+        assert response.status_code == 202, response.text
+        timings["batch"] = time.perf_counter() - start
+
+        fresh_scheduler(gate)
+        start = time.perf_counter()
+        response = await client.post("/jobs/screen", json={"sequences": RECEPTOR, "ligands": ligands})
+        assert response.status_code == 202, response.text
+        timings["screen"] = time.perf_counter() - start
+
+    return timings
+
+
+def render_inputs(ligands, out_dir: Path):
+    from app.schemas.predict import SequenceEntity
+    from app.utils.yaml_input import ScreenInputTemplate, write_boltz_input_yaml, write_rendered_input
+
+    receptor = [SequenceEntity(**entity) for entity in RECEPTOR]
+    entities = [
+        receptor + [SequenceEntity(type="ligand", id="L", smiles=smiles)] for smiles in ligands
+    ]
+    timings = {}
+
+    start = time.perf_counter()
+    for i, sequences in enumerate(entities):
+        write_boltz_input_yaml(out_dir / f"full_{i}.yaml", sequences)
+    timings["input.yaml (full dump)"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    template = ScreenInputTemplate(receptor, "L")
+    for i, smiles in enumerate(ligands):
+        write_rendered_input(out_dir / f"template_{i}.yaml", template.render(smiles))
+    timings["input.yaml (template)"] = time.perf_counter() - start
+
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=5000, help="Ligands in the screen")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="boltz_submit_") as jobs_dir:
+        configure(Path(jobs_dir), slots=1, job_seconds=0)
+        from app.utils.validation import validate_smiles_batch
+
+        ligands = screen_smiles(args.jobs)
+        # Warm the SMILES cache so every path pays the same validation cost
+        validate_smiles_batch(ligands)
+
+        timings = asyncio.run(submit(args, ligands))
+        inputs_dir = Path(jobs_dir) / "rendered"
+        inputs_dir.mkdir()
+        timings.update(render_inputs(ligands, inputs_dir))
+
+    print(f"{args.jobs} protein-ligand jobs ({len(RECEPTOR[0]['sequence'])}-residue receptor)")
+    print(f"{'path':<26}{'seconds':>10}{'jobs/s':>12}")
+    for name, seconds in timings.items():
+        print(f"{name:<26}{seconds:>10.2f}{args.jobs / seconds:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
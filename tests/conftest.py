@@ -13,3 +13,36 @@ from app.main import app
 @pytest.fixture
 def client():
     return TestClient(app)
+
+
+@pytest.fixture
+def jobs_dir(tmp_path, monkeypatch):
+    """
+    Point every module's BASE_JOBS_DIR at a temporary directory.
+    """
+    import importlib
+
+    for name in (
+        "app.utils.workspace",
+        "app.utils.results",
+        "app.routers.results",
+        "app.routers.analysis",
+    ):
+        monkeypatch.setattr(importlib.import_module(name), "BASE_JOBS_DIR", tmp_path)
+
+    return tmp_path
+
+
+@pytest.fixture
+def fake_boltz(monkeypatch):
+    """
+    Run jobs against tests/fake_boltz.py instead of the real Boltz CLI.
+    """
+    from app.utils import admission, cli
+
+    script = Path(__file__).resolve().parent / "fake_boltz.py"
+    monkeypatch.setattr(cli, "BOLTZ_BIN", f"{sys.executable} {script}")
+    monkeypatch.setattr(cli, "TERMINATE_GRACE_SECONDS", 2.0)
+    # The fake needs next to no memory, whatever the host has
+    monkeypatch.setattr(admission, "JOB_MEMORY_BYTES", 2**20)
+    return monkeypatch
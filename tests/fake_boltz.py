@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+"""
+Stand-in for the `boltz` executable, for running the API without a GPU.
+
+    BOLTZ_BIN="python tests/fake_boltz.py" uvicorn app.main:app
+
+It writes the same output tree as Boltz: an mmCIF with one residue per
+input residue (and one atom per ligand heavy atom), token-sized PAE, PDE
+and pLDDT arrays, the confidence JSON, and the affinity JSON when the
+input asks for it. So results, analysis and ranking routes can be
+exercised without a GPU.
+
+Behaviour is controlled through environment variables:
+    FAKE_BOLTZ_DELAY           base seconds spent "predicting" (default 0)
+    FAKE_BOLTZ_DELAY_PER_TOKEN extra seconds per input token (default 0)
+    FAKE_BOLTZ_JITTER          relative random spread of the delay, e.g. 0.2
+    FAKE_BOLTZ_SEED            if set, scores are drawn at random (seeded
+                               with this and the output directory) instead
+                               of fixed values
+    FAKE_BOLTZ_EXIT_CODE       exit status to finish with (default 0)
+    FAKE_BOLTZ_SPAWN_CHILD     if set, start a long-lived child process,
+                               like Boltz's data-loader workers
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+from structures import ADENINE_ATOMS, PROTEIN_ATOMS, helix_position, ligand, nucleotide, residue, write_cif
+
+THREE_LETTER = {
+    "A": "ALA", "R": "ARG", "N": "ASN", "D": "ASP", "C": "CYS", "E": "GLU", "Q": "GLN",
+    "G": "GLY", "H": "HIS", "I": "ILE", "L": "LEU", "K": "LYS", "M": "MET", "F": "PHE",
+    "P": "PRO", "S": "SER", "T": "THR", "W": "TRP", "Y": "TYR", "V": "VAL",
+}
+
+# Heavy atoms in a SMILES string (bracket atoms count once)
+SMILES_ATOM = re.compile(r"\[[^\]]+\]|Cl|Br|[BCNOPSFI]|[bcnops]")
+
+FIXED_SCORES = {"confidence_score": 0.8, "ptm": 0.8, "iptm": 0.7, "complex_plddt": 0.85}
+
+
+def read_entities(input_path: Path):
+    """
+    (kind, chain id, sequence or SMILES) for each entity of a Boltz YAML.
+    """
+    data = yaml.safe_load(input_path.read_text()) or {}
+    entities = []
+    for entry in data.get("sequences", []):
+        (kind, fields), = entry.items()
+        ids = fields["id"] if isinstance(fields["id"], list) else [fields["id"]]
+        for chain_id in ids:
+            entities.append((kind, chain_id, fields.get("sequence") or fields.get("smiles", "")))
+    affinity = any("affinity" in prop for prop in data.get("properties", []) or [])
+    return entities, affinity
+
+
+def build_chains(entities):
+    """
+    Proteins as parallel strands 6 Å apart, nucleic acids as helices
+    beside them and ligands side by side under the first chain; close
+    enough that every interface metric finds contacts. Returns the chains
+    and the token count.
+    """
+    chains = []
+    tokens = 0
+    ligands = 0
+    for index, (kind, chain_id, sequence) in enumerate(entities):
+        if kind == "protein":
+            residues = [
+                residue(THREE_LETTER.get(aa, "GLY"), (3.8 * i, 6.0 * index, 0.0), PROTEIN_ATOMS)
+                for i, aa in enumerate(sequence)
+            ]
+            tokens += len(residues)
+        elif kind in ("dna", "rna"):
+            # Helix along z, its middle nucleotide facing the previous chain
+            prefix = "D" if kind == "dna" else ""
+            middle = len(sequence) // 2
+            residues = []
+            for i, base in enumerate(sequence):
+                angle, z = helix_position(i - middle)
+                name, atoms = nucleotide(prefix + base.upper(), ADENINE_ATOMS, angle - math.pi / 2, z)
+                residues.append(
+                    (name, [(a, e, (x + 12.0, y + 6.0 * index + 8.0, z)) for a, e, (x, y, z) in atoms])
+                )
+            tokens += len(residues)
+        else:
+            n_atoms = max(1, len(SMILES_ATOM.findall(sequence)))
+            center = (5.7 + 8.0 * ligands, -4.0, 0.0)
+            residues = [ligand("LIG", center, n_atoms=n_atoms, radius=max(1.4, 0.25 * n_atoms))]
+            ligands += 1
+            tokens += n_atoms
+        chains.append((chain_id, residues))
+    return chains, tokens
+
+
+def write_outputs(pred_dir: Path, name: str, entities, affinity: bool, rng):
+    chains, tokens = build_chains(entities)
+    write_cif(pred_dir / f"{name}_model_0.cif", chains)
+
+    def score(fixed_key=None, low=0.3, high=0.95):
+        if rng is None and fixed_key in FIXED_SCORES:
+            return FIXED_SCORES[fixed_key]
+        return round((rng or random).uniform(low, high), 4)
+
+    pae = np.full((tokens, tokens), 3.0, dtype=np.float32)
+    if rng is not None:
+        noise = np.random.default_rng(rng.getrandbits(32))
+        pae += noise.uniform(0, 12, size=pae.shape).astype(np.float32)
+    np.savez_compressed(pred_dir / f"pae_{name}_model_0.npz", pae=pae)
+    np.savez_compressed(pred_dir / f"pde_{name}_model_0.npz", pde=pae / 2)
+    np.savez_compressed(pred_dir / f"plddt_{name}_model_0.npz", plddt=np.full(tokens, score("complex_plddt"), dtype=np.float32))
+
+    n_chains = len(chains)
+    confidence = {
+        "confidence_score": score("confidence_score"),
+        "ptm": score("ptm"),
+        "iptm": score("iptm"),
+        "ligand_iptm": score() if any(kind == "ligand" for kind, _, _ in entities) else 0.0,
+        "protein_iptm": score(),
+        "complex_plddt": score("complex_plddt"),
+        "complex_iplddt": score(),
+        "complex_pde": round(float(pae.mean()) / 2, 4),
+        "complex_ipde": round(float(pae.mean()) / 2, 4),
+        "chains_ptm": {str(i): score() for i in range(n_chains)},
+        "pair_chains_iptm": {str(i): {str(j): score() for j in range(n_chains)} for i in range(n_chains)},
+    }
+    with open(pred_dir / f"confidence_{name}_model_0.json", "w") as f:
+        json.dump(confidence, f, indent=4)
+
+    if affinity:
+        values = {}
+        for suffix in ("", "1", "2"):
+            values[f"affinity_pred_value{suffix}"] = round((rng or random).uniform(-3.0, 2.0), 4)
+            values[f"affinity_probability_binary{suffix}"] = round((rng or random).uniform(0.0, 1.0), 4)
+        with open(pred_dir / f"affinity_{name}.json", "w") as f:
+            json.dump(values, f, indent=4)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="boltz")
+    sub = parser.add_subparsers(dest="command", required=True)
+    predict = sub.add_parser("predict")
+    predict.add_argument("input")
+    predict.add_argument("--out_dir", required=True)
+    predict.add_argument("--use_msa_server", action="store_true")
+    args = parser.parse_args(argv)
+
+    entities, affinity = read_entities(Path(args.input))
+    n_tokens = build_chains(entities)[1]
+
+    seed = os.environ.get("FAKE_BOLTZ_SEED")
+    rng = random.Random(zlib.crc32(f"{seed}:{args.out_dir}".encode())) if seed is not None else None
+
+    delay = float(os.environ.get("FAKE_BOLTZ_DELAY", 0))
+    delay += float(os.environ.get("FAKE_BOLTZ_DELAY_PER_TOKEN", 0)) * n_tokens
+    jitter = float(os.environ.get("FAKE_BOLTZ_JITTER", 0))
+    if jitter:
+        delay *= max(0.0, 1 + (rng or random).uniform(-jitter, jitter))
+    exit_code = int(os.environ.get("FAKE_BOLTZ_EXIT_CODE", 0))
+
+    if os.environ.get("FAKE_BOLTZ_SPAWN_CHILD"):
+        subprocess.Popen([sys.executable, "-c", "import time; time.sleep(3600)"])
+
+    name = Path(args.input).stem
+    pred_dir = Path(args.out_dir) / f"boltz_results_{name}" / "predictions" / name
+
+    print("Checking input data.", flush=True)
+    print("Calling MSA server for target input with 1 sequences", flush=True)
+    print("Processing input data.", flush=True)
+    print("Running structure prediction for 1 input.", flush=True)
+
+    steps = 10
+    for step in range(1, steps + 1):
+        time.sleep(delay / steps)
+        percent = step * 100 // steps
+        sys.stdout.write(f"\rPredicting DataLoader 0: {percent:3d}%| {step}/{steps} [00:00<00:00]")
+        sys.stdout.flush()
+    sys.stdout.write("\n")
+
+    if exit_code != 0:
+        print("RuntimeError: fake boltz failure", file=sys.stderr, flush=True)
+        return exit_code
+
+    pred_dir.mkdir(parents=True, exist_ok=True)
+    write_outputs(pred_dir, name, entities, affinity, rng)
+
+    print("Number of failed examples: 0", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
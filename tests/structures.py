@@ -0,0 +1,139 @@
+"""
+Small synthetic complexes written as mmCIF, for analysis tests.
+"""
+
+import math
+
+import numpy as np
+
+PROTEIN_ATOMS = (
+    ("N", "N", (-1.2, 0.5, 0.0)),
+    ("CA", "C", (0.0, 0.0, 0.0)),
+    ("C", "C", (1.2, 0.5, 0.0)),
+    ("O", "O", (1.3, 1.7, 0.0)),
+    ("CB", "C", (0.0, -1.5, 0.3)),
+)
+
+STANDARD = {"ALA", "GLY", "LYS", "ARG", "DA", "DT", "DG", "DC", "A", "U", "G", "C"}
+
+
+def residue(resname, origin, atoms=PROTEIN_ATOMS):
+    x0, y0, z0 = origin
+    return resname, [(name, element, (x0 + x, y0 + y, z0 + z)) for name, element, (x, y, z) in atoms]
+
+
+def ligand(resname, center, n_atoms=8, radius=1.4, element="C"):
+    cx, cy, cz = center
+    atoms = []
+    for i in range(n_atoms):
+        angle = 2 * math.pi * i / n_atoms
+        atoms.append(
+            (f"C{i + 1}", element, (cx + radius * math.cos(angle), cy + radius * math.sin(angle), cz))
+        )
+    return resname, atoms
+
+
+def write_cif(path, chains):
+    """
+    chains: [(chain_id, [(resname, [(atom_name, element, (x, y, z)), ...]), ...]), ...]
+    """
+    from Bio.PDB.StructureBuilder import StructureBuilder
+    from Bio.PDB.mmcifio import MMCIFIO
+
+    builder = StructureBuilder()
+    builder.init_structure("model")
+    builder.init_model(0)
+    builder.init_seg("    ")
+
+    serial = 1
+    for chain_id, residues in chains:
+        builder.init_chain(chain_id)
+        for number, (resname, atoms) in enumerate(residues, start=1):
+            hetflag = " " if resname in STANDARD else f"H_{resname}"
+            builder.init_residue(resname, hetflag, number, " ")
+            for name, element, coord in atoms:
+                builder.init_atom(
+                    name, np.array(coord, dtype="f"), 50.0, 1.0, " ",
+                    name.ljust(4), serial, element,
+                )
+                serial += 1
+
+    io = MMCIFIO()
+    io.set_structure(builder.get_structure())
+    io.save(str(path))
+    return path
+
+
+def protein_ligand_complex():
+    """
+    Chain A (4 ALA along x), chain B (3 ALA far away) and an 8-atom ligand
+    (chain L) sitting over A2/A3. Boltz tokens: A 0-3, B 4-6, ligand 7-14.
+    """
+    return [
+        ("A", [residue("ALA", (3.8 * i, 0.0, 0.0)) for i in range(4)]),
+        ("B", [residue("ALA", (3.8 * i, 40.0, 0.0)) for i in range(3)]),
+        ("L", [ligand("LIG", (5.7, 4.0, 0.0))]),
+    ]
+
+
+def cylindrical(radius, angle, z):
+    return (radius * math.cos(angle), radius * math.sin(angle), z)
+
+
+# (name, element, radius, angle offset, height offset) around a straight
+# helix along z; enough atoms per nucleotide to classify every contact.
+ADENINE_ATOMS = (
+    ("P", "P", 8.9, 0.0, 0.0),
+    ("OP1", "O", 10.2, 0.0, 0.5),
+    ("OP2", "O", 9.5, 0.12, -1.0),
+    ("C1'", "C", 5.9, 0.35, 1.0),
+    ("N9", "N", 4.6, 0.3, 1.0),
+    ("N3", "N", 3.2, 0.45, 1.0),
+    ("N7", "N", 4.0, -0.25, 1.0),
+    ("N6", "N", 1.5, -0.6, 1.0),
+)
+THYMINE_ATOMS = (
+    ("P", "P", 8.9, 0.0, 0.0),
+    ("OP1", "O", 10.2, 0.0, -0.5),
+    ("OP2", "O", 9.5, -0.12, 1.0),
+    ("C1'", "C", 5.9, -0.35, -1.0),
+    ("O2", "O", 3.4, -0.45, -1.0),
+    ("O4", "O", 2.0, 0.5, -1.0),
+)
+
+HELIX_RISE = 3.38
+HELIX_TWIST = math.radians(36.0)
+
+
+def nucleotide(resname, atoms, angle, z):
+    return resname, [
+        (name, element, cylindrical(radius, angle + d_angle, z + d_z))
+        for name, element, radius, d_angle, d_z in atoms
+    ]
+
+
+def helix_position(index):
+    """
+    Cylindrical (angle, z) of base pair `index` of dna_duplex().
+    """
+    return HELIX_TWIST * index, HELIX_RISE * index
+
+
+def dna_duplex(n_pairs=10):
+    """
+    Idealised poly(dA)·poly(dT) along the z axis (chains B and C),
+    phosphates on a 8.9 Å cylinder.
+    """
+    strand = [nucleotide("DA", ADENINE_ATOMS, *helix_position(i)) for i in range(n_pairs)]
+    partner = [
+        nucleotide("DT", THYMINE_ATOMS, helix_position(i)[0] + math.pi, helix_position(i)[1])
+        for i in reversed(range(n_pairs))
+    ]
+    return [("B", strand), ("C", partner)]
+
+
+def probe(resname, name, element, position):
+    """
+    Single-atom residue, to place a contact exactly.
+    """
+    return resname, [(name, element, position)]
@@ -0,0 +1,121 @@
+import threading
+
+import pytest
+
+from app.schemas.predict import SequenceEntity
+from app.utils import admission
+
+PAYLOAD = {
+    "sequences": [
+        {"type": "protein", "id": "A", "sequence": "MKVKVGVNGFGRIGRLVTRAAFNSGKVDIVAINDPF"},
+        {"type": "ligand", "id": "B", "smiles": "c1ccncc1"},
+    ]
+}
+
+
+def test_estimate_tokens():
+    sequences = [SequenceEntity(**s) for s in PAYLOAD["sequences"]]
+    assert admission.estimate_tokens(sequences) == 36 + 6
+
+    ligand = SequenceEntity(type="ligand", id="L", smiles="ClC(Br)[C@@H](O)[NH3+]")
+    assert admission.estimate_tokens([ligand]) == 6
+
+
+def test_oversized_input_rejected(client, jobs_dir, monkeypatch):
+    monkeypatch.setattr(admission, "MAX_INPUT_TOKENS", 10)
+
+    response = client.post("/predict", json=PAYLOAD)
+
+    assert response.status_code == 413
+    assert list(jobs_dir.iterdir()) == []
+
+
+def test_queue_full_returns_429(client, jobs_dir, monkeypatch):
+    monkeypatch.setattr(admission, "MAX_QUEUE_DEPTH", 0)
+
+    response = client.post("/jobs", json=PAYLOAD)
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_memory_exhausted_returns_503(client, jobs_dir, monkeypatch):
+    monkeypatch.setattr(admission, "MEMORY_ADMISSION_ENABLED", True)
+    monkeypatch.setattr(admission, "memory_job_slots", lambda: 0)
+
+    response = client.post("/predict", json=PAYLOAD)
+
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+
+
+def test_idle_host_admits_a_job_by_default(client, jobs_dir, fake_boltz):
+    # Less free memory than one job is expected to need
+    fake_boltz.setattr(admission, "memory_job_slots", lambda: 0)
+
+    response = client.post("/predict", json=PAYLOAD)
+
+    assert response.status_code == 200
+
+
+@pytest.fixture
+def held_scheduler(monkeypatch):
+    """
+    A scheduler whose only slot is taken, so submitted jobs stay queued.
+    """
+    from app.utils import jobs
+    from app.utils.scheduler import JobScheduler, ScheduledJob
+
+    gate = threading.Event()
+    scheduler = JobScheduler(max_concurrency=1)
+    scheduler.submit(ScheduledJob("blocker", run=gate.wait))
+    monkeypatch.setattr(jobs, "scheduler", scheduler)
+
+    yield scheduler
+
+    for job_id in list(scheduler._queue):
+        scheduler.cancel(job_id)
+    gate.set()
+
+
+def test_bulk_batch_leaves_room_for_interactive_jobs(client, jobs_dir, held_scheduler, monkeypatch):
+    monkeypatch.setattr(admission, "MAX_QUEUE_DEPTH", 2)
+    monkeypatch.setattr(admission, "MAX_BULK_QUEUE_DEPTH", 3)
+
+    batch = {"jobs": [{**PAYLOAD, "priority": "bulk"} for _ in range(3)]}
+    assert client.post("/jobs/batch", json=batch).status_code == 202
+    assert held_scheduler.stats()["queued_by_priority"] == {"interactive": 0, "bulk": 3}
+
+    assert client.post("/jobs", json=PAYLOAD).status_code == 202
+
+    # The bulk class itself is full
+    response = client.post("/jobs", json={**PAYLOAD, "priority": "bulk"})
+    assert response.status_code == 429
+
+
+def test_batch_must_fit_remaining_depth(client, jobs_dir, held_scheduler, monkeypatch):
+    monkeypatch.setattr(admission, "MAX_QUEUE_DEPTH", 2)
+
+    response = client.post("/jobs/batch", json={"jobs": [PAYLOAD] * 3})
+
+    assert response.status_code == 429
+    assert "Batch of 3 interactive jobs" in response.json()["detail"]
+    assert held_scheduler.stats()["queued"] == 0
+
+
+def test_screen_admitted_against_its_own_class(client, jobs_dir, held_scheduler, monkeypatch):
+    monkeypatch.setattr(admission, "MAX_QUEUE_DEPTH", 1)
+    monkeypatch.setattr(admission, "MAX_BULK_QUEUE_DEPTH", 3)
+    screen = {"sequences": PAYLOAD["sequences"][:1], "ligands": ["CCO", "CCN", "CCC"]}
+
+    assert client.post("/jobs/screen", json=screen).status_code == 202
+    assert client.post("/jobs", json=PAYLOAD).status_code == 202
+
+    # No room left for another bulk screen, however small
+    response = client.post("/jobs/screen", json={**screen, "ligands": ["CCO"]})
+    assert response.status_code == 429
+    assert held_scheduler.stats()["queued_by_priority"] == {"interactive": 1, "bulk": 3}
+
+    # An interactive screen must fit the interactive queue
+    response = client.post("/jobs/screen", json={**screen, "priority": "interactive"})
+    assert response.status_code == 429
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from app.analysis import batch
+from app.analysis.pipeline import PREDICTION_SUBDIR
+from structures import protein_ligand_complex, residue, write_cif
+
+
+def make_job(jobs_dir, job_id, chains, pae_tokens=None):
+    pred_dir = jobs_dir / job_id / PREDICTION_SUBDIR
+    pred_dir.mkdir(parents=True)
+    write_cif(pred_dir / "input_model_0.cif", chains)
+    if pae_tokens:
+        np.savez(pred_dir / "pae_input_model_0.npz", pae=np.full((pae_tokens, pae_tokens), 3.0))
+
+
+def test_batch_resumes_and_writes_csv(tmp_path):
+    jobs_dir = tmp_path / "jobs"
+    make_job(jobs_dir, "ligand", protein_ligand_complex(), pae_tokens=15)
+    make_job(jobs_dir, "dimer", [
+        ("A", [residue("ALA", (3.8 * i, 0.0, 0.0)) for i in range(4)]),
+        ("B", [residue("ALA", (3.8 * i, 4.5, 0.0)) for i in range(4)]),
+    ])
+    make_job(jobs_dir, "no_pae", protein_ligand_complex())
+    (jobs_dir / "not_a_job").mkdir()
+
+    job_ids = list(batch.discover_jobs(jobs_dir))
+    assert job_ids == ["dimer", "ligand", "no_pae"]
+
+    output = tmp_path / "scores.csv"
+    summary = batch.run_batch(job_ids, jobs_dir, output, workers=2, chunk_size=1)
+    assert (summary["ok"], summary["error"], summary["rows"]) == (2, 1, 3)
+
+    table = pd.read_csv(output).set_index("job_id")
+    assert list(table.columns[:4]) == ["status", "prediction_type", "seconds", "error"]
+    assert table.loc["ligand", "prediction_type"] == "protein_ligand"
+    assert table.loc["ligand", "protein_ligand_metrics.pocket_consistency.mean_interface_pae"] == 3.0
+    assert table.loc["dimer", "protein_protein_metrics.buried_surface_area.value"] > 0
+    assert table.loc["no_pae", "status"] == "error"
+    assert "PAE file not found" in table.loc["no_pae", "error"]
+
+    # Second run: everything is already in the journal
+    summary = batch.run_batch(job_ids, jobs_dir, output, workers=2)
+    assert (summary["skipped"], summary["ok"], summary["error"]) == (3, 0, 0)
+
+    summary = batch.run_batch(job_ids, jobs_dir, output, workers=1, retry_failed=True)
+    assert (summary["skipped"], summary["error"], summary["rows"]) == (2, 1, 3)
+
+
+def test_truncated_journal_line_is_rerun(tmp_path):
+    journal = tmp_path / "scores.csv.jsonl"
+    journal.write_text('{"job_id": "a", "status": "ok"}\n{"job_id": "b", "sta')
+
+    assert set(batch.read_journal(journal)) == {"a"}
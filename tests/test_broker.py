@@ -0,0 +1,216 @@
+import json
+import threading
+import time
+
+import pytest
+
+from app.broker.base import CANCEL_REQUESTED, LEASE_LOST, RENEWED
+from app.broker.local import LocalBroker
+from app.utils import jobs
+from app.worker import reap_expired, run_one
+
+PAYLOAD = {
+    "sequences": [
+        {"type": "protein", "id": "A", "sequence": "MKVKVGVNGFGRIGRLVTRAAFNSGKVDIVAINDPF"}
+    ]
+}
+
+
+@pytest.fixture(params=["local", "redis"])
+def broker(request, tmp_path, monkeypatch):
+    """
+    Each broker implementation; Redis runs on fakeredis (with Lua).
+    """
+    if request.param == "local":
+        return LocalBroker(tmp_path / "broker.db")
+
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    import redis
+
+    from app.broker.redis_broker import RedisBroker
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        redis.Redis, "from_url",
+        classmethod(lambda cls, url, **kwargs: fakeredis.FakeRedis(server=server, **kwargs)),
+    )
+    return RedisBroker("redis://test")
+
+
+def set_job_fields(broker, job_id, **fields):
+    """
+    Overwrite a job's broker record, as another worker or a bad producer
+    would.
+    """
+    if isinstance(broker, LocalBroker):
+        with broker._transaction() as db:
+            for name, value in fields.items():
+                db.execute(f"UPDATE jobs SET {name} = ? WHERE job_id = ?", (value, job_id))
+    else:
+        broker.redis.hset(broker._job_key(job_id), mapping=fields)
+
+
+def test_broker_ordering_and_leases(broker):
+
+    broker.enqueue("a-1", {}, "a", "bulk")
+    broker.enqueue("a-2", {}, "a", "bulk")
+    broker.enqueue("b-1", {}, "b", "interactive")
+
+    assert broker.claim("w1", lease_seconds=60)["job_id"] == "b-1"
+    assert broker.queue_info("a-2")["position"] == 2
+
+    # A lease that is never renewed expires and the job is requeued
+    job = broker.claim("w2", lease_seconds=0)
+    assert job["job_id"] == "a-1"
+    time.sleep(0.01)
+    assert broker.requeue_expired()["requeued"] == ["a-1"]
+    assert broker.claim("w3", lease_seconds=60)["attempts"] == 2
+    # The first worker learns that the job is no longer its own
+    assert broker.heartbeat("a-1", "w2", 60) == LEASE_LOST
+
+    # Heartbeats report a cancel of a running job
+    assert broker.heartbeat("b-1", "w1", 60) == RENEWED
+    assert broker.cancel("b-1") == "CANCELLING"
+    assert broker.heartbeat("b-1", "w1", 60) == CANCEL_REQUESTED
+
+    assert broker.cancel("a-2") == "CANCELLED"
+    assert broker.stats()["queued"] == 0
+
+
+def test_claim_respects_the_tenant_cap(broker):
+    broker.tenant_max_concurrency = 1
+    broker.enqueue("a-1", {}, "a", "interactive")
+    broker.enqueue("a-2", {}, "a", "interactive")
+    broker.enqueue("b-1", {}, "b", "bulk")
+
+    assert broker.claim("w1", lease_seconds=60)["job_id"] == "a-1"
+    # a-2 ranks ahead, but tenant a already has a job running
+    assert broker.claim("w2", lease_seconds=60)["job_id"] == "b-1"
+    assert broker.claim("w3", lease_seconds=60) is None
+
+    broker.complete("a-1", "w1", "COMPLETED")
+    assert broker.claim("w3", lease_seconds=60)["job_id"] == "a-2"
+
+
+def test_brokered_job_end_to_end(client, jobs_dir, fake_boltz, broker):
+    fake_boltz.setattr(jobs, "broker", broker)
+
+    response = client.post("/jobs", json=PAYLOAD)
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert response.json()["queue"]["position"] == 1
+
+    # The API only enqueued; a worker does the run
+    assert client.get(f"/jobs/{job_id}").json()["status"] == "QUEUED"
+    assert run_one(broker, "worker-1")
+
+    assert client.get(f"/jobs/{job_id}").json()["status"] == "COMPLETED"
+    assert broker.get(job_id)["state"] == "COMPLETED"
+    assert client.get(f"/results/{job_id}/files").status_code == 200
+
+
+def test_cancelled_job_finishes_when_its_worker_dies(client, jobs_dir, monkeypatch, broker):
+    monkeypatch.setattr(jobs, "broker", broker)
+
+    job_id = client.post("/jobs", json=PAYLOAD).json()["job_id"]
+    # Claimed by a worker that never heartbeats
+    broker.claim("w1", lease_seconds=0)
+    assert client.delete(f"/jobs/{job_id}").json()["status"] == "CANCELLING"
+
+    time.sleep(0.01)
+    reap_expired(broker)
+
+    assert broker.get(job_id)["state"] == "CANCELLED"
+    assert client.get(f"/jobs/{job_id}").json()["status"] == "CANCELLED"
+    assert client.get(f"/jobs/{job_id}/results").json()["results"][0]["status"] == "CANCELLED"
+
+
+def test_cancel_finished_brokered_job(client, jobs_dir, monkeypatch, broker):
+    monkeypatch.setattr(jobs, "broker", broker)
+
+    job_id = client.post("/jobs", json=PAYLOAD).json()["job_id"]
+    # Finished on the broker before its worker updated meta.json
+    broker.claim("w1", lease_seconds=60)
+    broker.complete(job_id, "w1", "COMPLETED")
+
+    assert client.delete(f"/jobs/{job_id}").status_code == 409
+    assert broker.get(job_id)["state"] == "COMPLETED"
+
+
+def test_job_that_cannot_start_fails(client, jobs_dir, monkeypatch, broker):
+    monkeypatch.setattr(jobs, "broker", broker)
+
+    job_id = client.post("/jobs", json=PAYLOAD).json()["job_id"]
+    set_job_fields(broker, job_id, payload=json.dumps({}))
+
+    assert run_one(broker, "w1")
+
+    # Failed once, not left RUNNING for its lease to expire
+    assert broker.get(job_id)["state"] == "FAILED"
+    meta = client.get(f"/jobs/{job_id}").json()
+    assert meta["status"] == "FAILED" and "Could not start job" in meta["error"]
+
+
+def test_worker_survives_a_failing_iteration(monkeypatch, broker):
+    from app import worker
+
+    stop = threading.Event()
+    calls = []
+
+    def flaky_run_one(*args):
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError("broker unreachable")
+        stop.set()
+        return False
+
+    monkeypatch.setattr(worker, "run_one", flaky_run_one)
+    worker.run_worker(broker, "w1", poll_seconds=0, stop=stop)
+
+    assert len(calls) == 2
+
+
+def test_worker_abandons_a_lost_job(client, jobs_dir, fake_boltz, broker):
+    fake_boltz.setenv("FAKE_BOLTZ_DELAY", "30")
+    fake_boltz.setattr(jobs, "broker", broker)
+
+    job_id = client.post("/jobs", json=PAYLOAD).json()["job_id"]
+    worker = threading.Thread(target=run_one, args=(broker, "w1"), kwargs={"lease_seconds": 0.3})
+    worker.start()
+
+    deadline = time.monotonic() + 20
+    while client.get(f"/jobs/{job_id}").json()["status"] != "RUNNING":
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+    # Another worker took the job over
+    set_job_fields(broker, job_id, worker_id="w2")
+    worker.join(20)
+    assert not worker.is_alive()
+
+    # Stopped without recording anything over the new owner's run
+    assert client.get(f"/jobs/{job_id}").json()["status"] == "RUNNING"
+    assert client.get(f"/jobs/{job_id}/results").json()["results"] == []
+    assert broker.get(job_id)["state"] == "RUNNING"
+
+
+def test_brokered_screen(client, jobs_dir, fake_boltz, broker):
+    fake_boltz.setattr(jobs, "broker", broker)
+
+    response = client.post(
+        "/jobs/screen", json={"sequences": PAYLOAD["sequences"], "ligands": ["CCO", "c1ccccc1"]}
+    )
+    batch = response.json()
+
+    # One transaction, in submission order, with complete payloads
+    assert broker.stats()["queued"] == 2
+    assert broker.stats()["queued_by_priority"] == {"interactive": 0, "bulk": 2}
+    assert [broker.queue_info(job_id)["position"] for job_id in batch["job_ids"]] == [1, 2]
+
+    while run_one(broker, "w1"):
+        pass
+
+    page = client.get(f"/jobs/{batch['batch_id']}/results").json()
+    assert page["status"] == "COMPLETED"
+    assert sorted(line["job_id"] for line in page["results"]) == sorted(batch["job_ids"])
@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+
+from app.utils import cli, jobs
+
+PAYLOAD = {
+    "sequences": [
+        {"type": "protein", "id": "A", "sequence": "MKVKVGVNGFGRIGRLVTRAAFNSGKVDIVAINDPF"}
+    ]
+}
+
+
+def wait_for_status(client, job_id, statuses, timeout=20):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        meta = client.get(f"/jobs/{job_id}").json()
+        if meta["status"] in statuses:
+            return meta
+        time.sleep(0.1)
+    raise AssertionError(f"job {job_id} never reached {statuses}")
+
+
+def test_cancel_running_job(client, jobs_dir, fake_boltz):
+    fake_boltz.setenv("FAKE_BOLTZ_DELAY", "30")
+    fake_boltz.setenv("FAKE_BOLTZ_SPAWN_CHILD", "1")
+
+    job_id = client.post("/jobs", json=PAYLOAD).json()["job_id"]
+    wait_for_status(client, job_id, {"RUNNING"})
+
+    response = client.delete(f"/jobs/{job_id}")
+    assert response.status_code == 200
+
+    meta = wait_for_status(client, job_id, {"CANCELLED"})
+    assert meta["status"] == "CANCELLED"
+    assert list((jobs_dir / job_id / "outputs").iterdir()) == []
+
+    # Finished jobs cannot be cancelled again
+    assert client.delete(f"/jobs/{job_id}").status_code == 409
+
+
+def test_cancel_after_boltz_exited(client, jobs_dir, fake_boltz):
+    post_processing = threading.Event()
+    release = threading.Event()
+    record_structure_artifacts = jobs.record_structure_artifacts
+
+    def held_artifacts(job_id):
+        post_processing.set()
+        release.wait(10)
+        record_structure_artifacts(job_id)
+
+    fake_boltz.setattr(jobs, "record_structure_artifacts", held_artifacts)
+
+    job_id = client.post("/jobs", json=PAYLOAD).json()["job_id"]
+    assert post_processing.wait(20)
+
+    # Too late to cancel: the run reports its real outcome
+    assert client.delete(f"/jobs/{job_id}").status_code == 409
+    release.set()
+    assert wait_for_status(client, job_id, {"COMPLETED", "CANCELLED"})["status"] == "COMPLETED"
+    assert job_id not in cli._cancel_requested and job_id not in cli._pending
+
+
+def test_cancel_unknown_job_leaves_nothing_behind(tmp_path):
+    assert not cli.cancel_boltz_job("never-registered")
+    assert "never-registered" not in cli._cancel_requested
+
+    # A registered job is stopped before it launches
+    cli.register_boltz_job("pending")
+    assert cli.cancel_boltz_job("pending")
+    with pytest.raises(cli.BoltzJobCancelled):
+        cli.run_boltz_cli(tmp_path / "input.yaml", tmp_path / "outputs", job_id="pending")
+    assert "pending" not in cli._cancel_requested and "pending" not in cli._pending
+
+
+def test_job_timeout(client, jobs_dir, fake_boltz):
+    fake_boltz.setenv("FAKE_BOLTZ_DELAY", "30")
+
+    job_id = client.post(
+        "/jobs", json={**PAYLOAD, "timeout_seconds": 0.5}
+    ).json()["job_id"]
+
+    meta = wait_for_status(client, job_id, {"TIMED_OUT", "FAILED", "COMPLETED"})
+    assert meta["status"] == "TIMED_OUT"
+
+
+def test_predict_with_fake_boltz(client, jobs_dir, fake_boltz):
+    response = client.post("/predict", json=PAYLOAD)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "COMPLETED"
+    assert [f["name"] for f in data["results"]] == [
+        "confidence_input_model_0.json",
+        "contacts_input_model_0.npz",
+        "input_model_0.cif",
+        "pae_input_model_0.npz",
+        "pde_input_model_0.npz",
+        "plddt_input_model_0.npz",
+        "summary_input_model_0.json",
+    ]
@@ -0,0 +1,82 @@
+import numpy as np
+
+from app.analysis.contacts import build_contact_map, chain_entities, load_contact_map, save_contact_map, select_contacts
+from app.analysis.pipeline import PREDICTION_SUBDIR
+from app.analysis.pocket import load_tokenized_structure
+from app.analysis.protein_protein import compute_contact_residue_overlap
+from structures import ligand, residue, write_cif
+
+
+def homotrimer_with_ligand():
+    """
+    Three identical 4-ALA chains stacked 4.5 Å apart along y (A-B and B-C
+    touch, A-C do not) and a ligand under chain A.
+    """
+    return [
+        ("A", [residue("ALA", (3.8 * i, 0.0, 0.0)) for i in range(4)]),
+        ("B", [residue("ALA", (3.8 * i, 4.5, 0.0)) for i in range(4)]),
+        ("C", [residue("ALA", (3.8 * i, 9.0, 0.0)) for i in range(4)]),
+        ("L", [ligand("LIG", (5.7, -4.0, 0.0))]),
+    ]
+
+
+def test_contact_map_blocks(tmp_path):
+    cif = str(write_cif(tmp_path / "model.cif", homotrimer_with_ligand()))
+    tokenized = load_tokenized_structure(cif)
+
+    assert chain_entities(tokenized) == {"A": 1, "B": 1, "C": 1, "L": 2}
+
+    contact_map = save_contact_map(tmp_path / "contacts.npz", build_contact_map(tokenized))
+    contact_map = load_contact_map(contact_map)
+    assert np.all(contact_map["row"] < contact_map["col"])
+
+    # Every residue pair is kept, not just the first atom hit per residue
+    block = select_contacts(contact_map, "A", "B")
+    assert len(block["min_distance"]) == 10
+    assert set(zip(block["row"], block["col"])) >= {(0, 0), (1, 0), (0, 1), (3, 3)}
+    assert block["min_distance"].min() > 0
+
+    # Swapping the chains transposes the block
+    swapped = select_contacts(contact_map, "B", "A")
+    assert sorted(zip(swapped["col"], swapped["row"])) == sorted(zip(block["row"], block["col"]))
+
+    assert len(select_contacts(contact_map, "A", "C")["row"]) == 0
+    # Entity 1 with itself: the A-B and B-C interfaces
+    assert len(select_contacts(contact_map, 1, 1, by="entity")["row"]) == 20
+    assert len(select_contacts(contact_map, 1, 2, by="entity")["row"]) == 4
+
+    assert compute_contact_residue_overlap(cif) == {
+        "chain_A_contact_residues": 4,
+        "chain_B_contact_residues": 4,
+        "shared_interface_contacts": 10,
+        "contact_cutoff_angstrom": 5.0,
+    }
+
+
+def test_contact_map_endpoints(client, jobs_dir):
+    job_id = "contactsjob"
+    pred_dir = jobs_dir / job_id / PREDICTION_SUBDIR
+    pred_dir.mkdir(parents=True)
+    write_cif(pred_dir / "input_model_0.cif", homotrimer_with_ligand())
+
+    assert client.get(f"/results/{job_id}/files").status_code == 200
+
+    response = client.get(f"/results/{job_id}/contacts")
+    assert response.status_code == 200
+    pairs = {(p["chain_a"], p["chain_b"]): p for p in response.json()["pairs"]}
+    assert set(pairs) == {("A", "B"), ("A", "L"), ("B", "C")}
+    assert pairs[("A", "L")]["entity_b"] == 2
+
+    # Built once, then part of the job's files
+    files = client.get(f"/results/{job_id}/files").json()["files"]
+    assert "contacts_input_model_0.npz" in [f["name"] for f in files]
+
+    block = client.get(f"/results/{job_id}/contacts/A/L").json()
+    assert block["shape"] == [4, 1]
+    assert block["cols"] == ["L:1:LIG"]
+    assert len(block["row"]) == len(block["col"]) == len(block["min_distance"]) == 4
+
+    assert client.get(f"/results/{job_id}/contacts/A/Z").status_code == 404
+    assert client.get(f"/results/{job_id}/contacts/1/2", params={"by": "entity"}).json()["shape"] == [12, 1]
+    assert client.get(f"/results/{job_id}/contacts/A/B", params={"by": "segment"}).status_code == 422
+    assert client.get("/results/missing/contacts").status_code == 404
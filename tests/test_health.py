@@ -3,3 +3,49 @@ def test_health_check(client):
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
 
+
+
+def test_ready_after_startup():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        response = client.get("/ready")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+
+def test_warmup_imports_heavy_modules(monkeypatch):
+    from app.utils import warmup
+
+    monkeypatch.setattr(warmup, "_done", __import__("threading").Event())
+    monkeypatch.setattr(warmup, "_state", {"started": False, "seconds": {}, "errors": {}})
+    monkeypatch.setattr(warmup, "HEAVY_MODULES", ("json", "no_such_module_xyz"))
+
+    assert warmup.start_warmup(enabled=True)
+    warmup._done.wait(10)
+
+    status = warmup.warmup_status()
+    assert status["ready"]
+    assert "json" in status["import_seconds"]
+    assert "no_such_module_xyz" in status["import_errors"]
+
+
+def test_startup_does_not_import_scientific_stack():
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    code = (
+        "import sys, app.main; "
+        "print(','.join(m for m in ('rdkit', 'Bio', 'freesasa') if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).resolve().parents[1],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert out.stdout.strip() == ""
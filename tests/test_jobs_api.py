@@ -0,0 +1,164 @@
+import json
+
+from app.utils.workspace import create_workspace, update_job_meta
+
+
+def test_job_status_not_found(client, jobs_dir):
+    response = client.get("/jobs/missing")
+    assert response.status_code == 404
+
+
+def test_job_events_stream(client, jobs_dir):
+    job_id = "eventsjob"
+    workspace = create_workspace(job_id)
+    (workspace["job_dir"] / "boltz.log").write_bytes(
+        b"Checking input data.\n"
+        b"Running structure prediction for 1 input.\n"
+        b"Predicting DataLoader 0: 100%|##########| 1/1 [00:01<00:00]\r"
+    )
+    update_job_meta(job_id, status="COMPLETED")
+
+    response = client.get(f"/jobs/{job_id}/events")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = [
+        (block.split("\n")[0][len("event: "):], json.loads(block.split("data: ", 1)[1]))
+        for block in response.text.strip().split("\n\n")
+    ]
+    progress = [data for name, data in events if name == "progress"]
+    assert progress[-1] == {"stage": "diffusion", "percent": 100}
+    assert events[-1] == ("status", {"status": "COMPLETED", "error": None})
+
+    # Resume after the first line
+    response = client.get(
+        f"/jobs/{job_id}/events",
+        headers={"Last-Event-ID": str(len(b"Checking input data.\n"))},
+    )
+    assert "Checking input data." not in response.text
+
+
+def test_batch_results_stream(client, jobs_dir, fake_boltz):
+    protein = {"type": "protein", "id": "A", "sequence": "MKVKVGVNGFGRIG"}
+    jobs = [{"sequences": [protein]} for _ in range(3)]
+
+    response = client.post("/jobs/batch", json={"jobs": jobs})
+    assert response.status_code == 202
+    batch = response.json()
+    assert batch["total"] == 3
+
+    response = client.get(f"/jobs/{batch['batch_id']}/results", params={"stream": "ndjson"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["job_id"] for line in lines) == sorted(batch["job_ids"])
+    assert [line["index"] for line in lines] == [1, 2, 3]
+    assert all(line["status"] == "COMPLETED" and line["results"] for line in lines)
+    assert lines[0]["scores"]["iptm"] == 0.7
+    assert client.get(f"/jobs/{batch['batch_id']}").json()["status"] == "COMPLETED"
+
+    # Resume after the first line
+    response = client.get(
+        f"/jobs/{batch['batch_id']}/results",
+        params={"stream": "ndjson", "cursor": lines[0]["cursor"]},
+    )
+    assert [json.loads(line)["job_id"] for line in response.text.splitlines()] == [
+        line["job_id"] for line in lines[1:]
+    ]
+
+    page = client.get(f"/jobs/{batch['batch_id']}/results", params={"cursor": lines[1]["cursor"]}).json()
+    assert [line["job_id"] for line in page["results"]] == [lines[2]["job_id"]]
+    assert page["cursor"] == lines[2]["cursor"]
+
+
+def test_job_recorded_twice_counts_once_in_its_batch(client, jobs_dir):
+    from app.utils.batches import create_batch, record_job_result
+
+    create_batch("batch", ["first", "second"], tenant="default")
+    create_workspace("first")
+    update_job_meta("first", status="FAILED", error="boom", batch="batch")
+
+    assert record_job_result("first")["index"] == 1
+    assert record_job_result("first") is None
+
+    page = client.get("/jobs/batch/results").json()
+    assert [line["job_id"] for line in page["results"]] == ["first"]
+    assert client.get("/jobs/batch").json()["status"] == "RUNNING"
+
+
+def test_results_of_job_without_log(client, jobs_dir):
+    job_id = "oldjob"
+    create_workspace(job_id)
+    update_job_meta(job_id, status="FAILED", error="Boltz exited with status 1")
+
+    for _ in range(2):
+        page = client.get(f"/jobs/{job_id}/results").json()
+        assert page["status"] == "FAILED"
+        assert [(line["index"], line["error"]) for line in page["results"]] == [
+            (1, "Boltz exited with status 1")
+        ]
+
+    response = client.get(f"/jobs/{job_id}/results", params={"stream": "ndjson", "cursor": page["cursor"]})
+    assert response.text == ""
+
+
+def test_batch_rejects_invalid_smiles_in_the_route(client, jobs_dir, fake_boltz):
+    from app.schemas.predict import BatchPredictRequest
+
+    protein = {"type": "protein", "id": "A", "sequence": "MKVKVGVNGFGRIG"}
+    body = {
+        "jobs": [
+            {"sequences": [protein, {"type": "ligand", "id": "B", "smiles": "CCO"}]},
+            {"sequences": [protein, {"type": "ligand", "id": "B", "smiles": "C1CC"}]},
+        ]
+    }
+
+    # Parsing the body does not run RDKit; the route does
+    request = BatchPredictRequest(**body)
+    assert [ligand["loc"] for ligand in request.validate_ligands()] == [("jobs", 1, "sequences", 1)]
+    assert request.jobs[0].estimated_tokens == 14 + 3
+
+    response = client.post("/jobs/batch", json=body)
+    assert response.status_code == 422
+    assert [error["loc"] for error in response.json()["detail"]] == [["body", "jobs", 1, "sequences", 1]]
+
+    response = client.post("/jobs", json=body["jobs"][1])
+    assert response.status_code == 422
+    assert [error["loc"] for error in response.json()["detail"]] == [["body", "sequences", 1]]
+
+
+def test_screen_renders_inputs_from_template(client, jobs_dir, fake_boltz, tmp_path):
+    from app.schemas.predict import ScreenRequest, SequenceEntity
+    from app.utils.yaml_input import write_boltz_input_yaml
+
+    protein = {"type": "protein", "id": "A", "sequence": "MKVKVGVNGFGRIG"}
+    ligands = ["CC(=O)Oc1ccccc1C(=O)O", "C#N", "c1ccccc1"]
+
+    # Parsing the body does not run RDKit; the route does
+    request = ScreenRequest(sequences=[protein], ligands=["CCO", "C1CC"])
+    assert [ligand["loc"] for ligand in request.validate_ligands()] == [("ligands", 1)]
+
+    response = client.post("/jobs/screen", json={"sequences": [protein], "ligands": ["CCO", "C1CC"]})
+    assert response.status_code == 422
+    assert [error["loc"] for error in response.json()["detail"]] == [["body", "ligands", 1]]
+
+    response = client.post("/jobs/screen", json={"sequences": [protein], "ligands": ligands})
+    assert response.status_code == 202
+    batch = response.json()
+
+    response = client.get(f"/jobs/{batch['batch_id']}/results", params={"stream": "ndjson"})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert all(line["status"] == "COMPLETED" for line in lines)
+    assert all(line["scores"]["affinity_pred_value"] is not None for line in lines)
+
+    for job_id, smiles in zip(batch["job_ids"], ligands):
+        meta = client.get(f"/jobs/{job_id}").json()
+        assert (meta["batch"], meta["priority"]) == (batch["batch_id"], "bulk")
+
+        expected = tmp_path / f"{job_id}.yaml"
+        write_boltz_input_yaml(
+            expected,
+            [SequenceEntity(**protein), SequenceEntity(type="ligand", id="L", smiles=smiles)],
+        )
+        assert (jobs_dir / job_id / "inputs" / "input.yaml").read_text() == expected.read_text()
@@ -0,0 +1,77 @@
+import numpy as np
+
+from app.analysis.protein_ligand import compute_ligand_metrics
+from structures import ligand, residue, write_cif
+
+
+def multi_ligand_complex():
+    """
+    Protein chain A (8 ALA), an 8-atom ligand over A2/A3 (chain L), a
+    3-atom cofactor clashing with A7 (chain M), a DNA chain and an ion.
+    """
+    cofactor = ("NAP", [
+        ("C1", "C", (22.8, 0.6, 0.0)),  # 0.6 Å from A7 CA
+        ("C2", "C", (22.8, 2.1, 0.0)),
+        ("O3", "O", (22.8, 3.5, 0.0)),
+    ])
+    return [
+        ("A", [residue("ALA", (3.8 * i, 0.0, 0.0)) for i in range(8)]),
+        ("L", [ligand("LIG", (5.7, 6.0, 0.0))]),
+        ("M", [cofactor]),
+        ("D", [residue("DA", (3.8 * i, -6.0, 0.0)) for i in range(2)]),
+        ("I", [("MG", [("MG", "MG", (10.0, -3.0, 0.0))])]),
+    ]
+
+
+def test_metrics_per_ligand(tmp_path):
+    cif = write_cif(tmp_path / "model.cif", multi_ligand_complex())
+
+    result = compute_ligand_metrics(str(cif))
+
+    # Nucleotides and ions are not ligands
+    assert result["ligand_count"] == 2
+    lig, cofactor = result["ligands"]["L"], result["ligands"]["M"]
+
+    assert lig["resname"] == "LIG" and lig["heavy_atoms"] == 8
+    assert cofactor["resname"] == "NAP" and cofactor["heavy_atoms"] == 3
+
+    assert 0 < lig["burial"]["ligand_burial_percent"] < 100
+    assert lig["burial"]["sasa_bound_ligand"] < lig["burial"]["sasa_free_ligand"]
+
+    assert lig["steric_clashes"]["clash_count"] == 0
+    assert cofactor["steric_clashes"]["clash_count"] >= 1
+    assert cofactor["steric_clashes"]["worst_overlap_angstrom"] > 1.5
+
+    assert lig["pocket"]["pocket_residue_count"] > 0
+    assert cofactor["pocket"]["pocket_residue_count"] > 0
+    assert "confidence_score" not in lig["pocket"]
+
+
+def test_metrics_with_pae(tmp_path):
+    cif = write_cif(tmp_path / "model.cif", multi_ligand_complex())
+    # tokens: A 0-7, L 8-15, M 16-18, D 19-20, MG 21
+    pae = np.full((22, 22), 10.0)
+    np.savez(tmp_path / "pae.npz", pae=pae)
+
+    result = compute_ligand_metrics(str(cif), str(tmp_path / "pae.npz"))
+
+    for ligand_metrics in result["ligands"].values():
+        assert ligand_metrics["pocket"]["mean_interface_pae"] == 10.0
+        assert ligand_metrics["pocket"]["confidence_score"] == round(1 / 11, 3)
+
+
+def test_analysis_endpoint_reports_every_ligand(client, jobs_dir):
+    pred_dir = jobs_dir / "multi" / "outputs" / "boltz_results_input" / "predictions" / "input"
+    pred_dir.mkdir(parents=True)
+    write_cif(pred_dir / "input_model_0.cif", multi_ligand_complex())
+    np.savez(pred_dir / "pae_input_model_0.npz", pae=np.full((22, 22), 4.0))
+
+    response = client.post("/analysis/multi")
+
+    assert response.status_code == 200
+    metrics = response.json()["protein_ligand_metrics"]
+    assert set(metrics["ligands"]) == {"L", "M"}
+    assert metrics["primary_ligand"] == "L"
+    assert metrics["ligand_burial_percentage"]["value"] == (
+        metrics["ligands"]["L"]["burial"]["ligand_burial_percent"]
+    )
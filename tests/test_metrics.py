@@ -0,0 +1,50 @@
+import pytest
+
+from app.utils.metrics import Histogram, timed
+
+
+def test_timed_records_calls_and_failures():
+    histogram = Histogram("test_timed_seconds", "test", labelnames=("stage",), buckets=(0.5, 1.0))
+
+    @timed(histogram, stage="work")
+    def work(fail=False):
+        if fail:
+            raise ValueError("boom")
+        return 42
+
+    assert work() == 42
+    with pytest.raises(ValueError):
+        work(fail=True)
+
+    histogram.observe(0.75, stage="work")
+    histogram.observe(5.0, stage="work")
+    text = "\n".join(histogram.render())
+
+    assert 'test_timed_seconds_bucket{stage="work",le="0.5"} 2' in text
+    assert 'test_timed_seconds_bucket{stage="work",le="1.0"} 3' in text
+    assert 'test_timed_seconds_bucket{stage="work",le="+Inf"} 4' in text
+    assert 'test_timed_seconds_count{stage="work"} 4' in text
+
+
+def test_histogram_mean():
+    histogram = Histogram("test_mean_seconds", "test", labelnames=("stage",), buckets=(1.0,))
+
+    assert histogram.mean(stage="work") is None
+    histogram.observe(0.5, stage="work")
+    histogram.observe(2.5, stage="work")
+    assert histogram.mean(stage="work") == pytest.approx(1.5)
+
+
+def test_metrics_endpoint(client, jobs_dir):
+    from app.utils.workspace import create_workspace
+
+    create_workspace("metricsjob")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'boltz_pipeline_stage_seconds_count{stage="workspace"}' in response.text
+    assert "boltz_queue_depth 0" in response.text
+    assert "boltz_jobs_in_flight 0" in response.text
+    assert "boltz_subprocess_peak_rss_bytes" in response.text
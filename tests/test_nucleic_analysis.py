@@ -0,0 +1,85 @@
+import pytest
+
+from app.analysis import nucleic
+from app.analysis.pocket import load_tokenized_structure
+from app.analysis.protein_dna_rna import compute_electrostatic_contact_density, compute_groove_consistency
+from structures import cylindrical, dna_duplex, helix_position, probe, write_cif
+
+
+def near(index, radius, d_angle, d_z):
+    angle, z = helix_position(index)
+    return cylindrical(radius, angle + d_angle, z + d_z)
+
+
+def protein_dna_complex():
+    """
+    Lys on the phosphate of B3, two Arg stacked over the major-groove
+    edges of B6/B7 and B8/B9, and a Ser under the minor-groove edge of B4.
+    """
+    return [
+        ("A", [
+            probe("LYS", "NZ", "N", near(2, 12.0, 0.0, 0.0)),
+            probe("ARG", "NH1", "N", near(5, 4.0, -0.25, 4.0)),
+            probe("ARG", "NH1", "N", near(7, 4.0, -0.25, 4.0)),
+            probe("SER", "OG", "O", near(3, 3.2, 0.45, -2.0)),
+        ]),
+    ] + dna_duplex()
+
+
+def test_groove_classification_and_axis(tmp_path):
+    cif = str(write_cif(tmp_path / "model.cif", protein_dna_complex()))
+
+    result = compute_groove_consistency(cif, cutoff=3.2)
+
+    assert (result["major_groove_contacts"], result["minor_groove_contacts"], result["backbone_contacts"]) == (6, 2, 3)
+    assert result["dominant_groove"] == "major_groove"
+    assert result["groove_consistency_score"] == 0.75
+
+    # Straight helix along z, phosphates on the 8.9 Å cylinder
+    axis = result["helical_axis"]
+    assert [abs(x) for x in axis["direction"]] == pytest.approx([0, 0, 1])
+    assert axis["backbone_radius_angstrom"] == pytest.approx(8.9)
+    assert result["mean_insertion_depth_angstrom"]["backbone"] < 0 < result["mean_insertion_depth_angstrom"]["major_groove"]
+
+    per_base = result["per_base"]
+    assert per_base["B:3"]["backbone"] == 3
+    assert per_base["B:3"]["protein_residues"] == ["A:1", "A:4"]
+    assert per_base["B:7"] == {
+        "resname": "DA",
+        "major_groove": 2,
+        "minor_groove": 0,
+        "backbone": 0,
+        "protein_residues": ["A:2"],
+        "min_distance": 2.501,
+    }
+
+
+def test_metrics_share_one_contact_search(tmp_path):
+    cif = str(write_cif(tmp_path / "model.cif", protein_dna_complex()))
+    nucleic.contact_cache.clear()
+    misses = nucleic.contact_cache.misses
+
+    electro = compute_electrostatic_contact_density(cif)
+    compute_groove_consistency(cif)
+
+    assert nucleic.contact_cache.misses == misses + 1
+    # Only the Lys touches phosphate oxygens
+    assert electro["charged_contacts"] == 3
+    assert electro["interface_residues"] == 1
+
+
+def test_axis_needs_a_helix(tmp_path):
+    chains = [("A", [probe("LYS", "NZ", "N", near(0, 12.0, 0.0, 0.0))])] + [
+        (chain, residues[:1]) for chain, residues in dna_duplex()
+    ]
+    cif = str(write_cif(tmp_path / "model.cif", chains))
+
+    with pytest.raises(ValueError, match="helical axis"):
+        nucleic.helical_axis(load_tokenized_structure(cif))
+
+    # The contacts are still classified; only the axis fields are missing
+    result = compute_groove_consistency(cif)
+    assert result["backbone_contacts"] == 3
+    assert result["helical_axis"] is None
+    assert result["mean_insertion_depth_angstrom"] is None
+    assert result["axial_span_angstrom"] is None
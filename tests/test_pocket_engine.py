@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from app.analysis.pocket import find_pocket, load_tokenized_structure, pae_blocks
+from app.analysis.protein_ligand import compute_pocket_consistency
+from structures import ligand, protein_ligand_complex, residue, write_cif
+
+
+def write_pae(path, n_tokens, pocket_tokens, ligand_tokens):
+    pae = np.full((n_tokens, n_tokens), 30.0)
+    pae[np.ix_(pocket_tokens, pocket_tokens)] = 5.0
+    pae[np.ix_(pocket_tokens, ligand_tokens)] = 1.0
+    pae[np.ix_(ligand_tokens, pocket_tokens)] = 3.0
+    np.savez(path, pae=pae)
+    return path
+
+
+def test_tokens_follow_boltz_layout(tmp_path):
+    cif = write_cif(tmp_path / "model.cif", protein_ligand_complex())
+    tokenized = load_tokenized_structure(str(cif))
+
+    assert tokenized["n_tokens"] == 15
+    assert [r["token"] for r in tokenized["residues"]] == [0, 1, 2, 3, 4, 5, 6, 7]
+
+    ligand_atoms = np.flatnonzero(tokenized["atom_kind"] == "ligand")
+    assert list(tokenized["atom_token"][ligand_atoms]) == list(range(7, 15))
+
+
+def test_pocket_uses_any_ligand_atom(tmp_path):
+    # Large ring: its centroid is > 4.5 Å from every protein atom,
+    # but the nearest ring atoms touch chain A.
+    chains = [
+        ("A", [residue("ALA", (3.8 * i, 0.0, 0.0)) for i in range(4)]),
+        ("L", [ligand("LIG", (5.7, 8.0, 0.0), n_atoms=16, radius=6.0)]),
+    ]
+    cif = write_cif(tmp_path / "model.cif", chains)
+    tokenized = load_tokenized_structure(str(cif))
+
+    ligand_atoms = np.flatnonzero(tokenized["atom_kind"] == "ligand")
+    centroid = tokenized["coords"][ligand_atoms].mean(axis=0)
+    protein = tokenized["coords"][tokenized["atom_kind"] == "protein"]
+    assert np.linalg.norm(protein - centroid, axis=1).min() > 4.5
+
+    pocket = find_pocket(tokenized, ligand_atoms, cutoff=4.5)
+    assert len(pocket["residues"]) > 0
+    assert pocket["distances"].max() <= 4.5
+
+
+def test_pae_blocks_are_token_indexed(tmp_path):
+    cif = write_cif(tmp_path / "model.cif", protein_ligand_complex())
+    pae_path = write_pae(tmp_path / "pae.npz", 15, [0, 1, 2, 3], list(range(7, 15)))
+
+    result = compute_pocket_consistency(str(cif), str(pae_path))
+
+    # Chain B (tokens 4-6) is 40 Å away and must not leak into the pocket
+    assert result["pocket_residue_count"] == 4
+    assert result["pae_blocks"] == {
+        "pocket_internal": 5.0,
+        "pocket_to_ligand": 1.0,
+        "ligand_to_pocket": 3.0,
+    }
+    assert result["mean_pocket_pae"] == 5.0
+    assert result["mean_interface_pae"] == 2.0
+    assert result["confidence_score"] == round(1 / 3, 3)
+
+
+def test_pae_blocks_direct():
+    pae = np.arange(16, dtype=float).reshape(4, 4)
+    blocks = pae_blocks(pae, [0, 1], [3])
+    assert blocks == {
+        "pocket_internal": float(np.mean([0, 1, 4, 5])),
+        "pocket_to_ligand": float(np.mean([3, 7])),
+        "ligand_to_pocket": float(np.mean([12, 13])),
+    }
+
+
+def test_pae_size_mismatch_is_rejected(tmp_path):
+    cif = write_cif(tmp_path / "model.cif", protein_ligand_complex())
+    np.savez(tmp_path / "pae.npz", pae=np.zeros((4, 4)))
+
+    with pytest.raises(ValueError, match="PAE matrix covers 4 tokens"):
+        compute_pocket_consistency(str(cif), str(tmp_path / "pae.npz"))
@@ -62,3 +62,26 @@ def test_predict_protein_ligand(client):
 
     if "results" in data:
         assert isinstance(data["results"], list)
+
+
+def test_predict_rejects_invalid_inputs(client):
+    """
+    Schema-level validation answers 422 before any job is created.
+    """
+    bad_payloads = [
+        [{"type": "protein", "id": "A", "sequence": "MKV1J"}],
+        [{"type": "dna", "id": "A", "sequence": "ACGU"}],
+        [{"type": "rna", "id": "A", "sequence": "ACGT"}],
+        [{"type": "ligand", "id": "B", "smiles": "C1CC"}],
+        [{"type": "ligand", "id": "B", "sequence": "ACGT"}],
+        [{"type": "protein", "id": "A", "smiles": "CCO"}],
+        [
+            {"type": "protein", "id": "A", "sequence": "MKV"},
+            {"type": "ligand", "id": "A", "smiles": "CCO"},
+        ],
+        [],
+    ]
+
+    for sequences in bad_payloads:
+        response = client.post("/predict", json={"sequences": sequences})
+        assert response.status_code == 422, sequences
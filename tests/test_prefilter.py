@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+
+from app.analysis import sasa
+from app.analysis.pipeline import CIF_FILENAME, PAE_FILENAME, PREDICTION_SUBDIR, analyze_prediction
+from structures import ligand, protein_ligand_complex, residue, write_cif
+
+
+def ligand_at(center):
+    return [
+        ("A", [residue("ALA", (3.8 * i, 0.0, 0.0)) for i in range(4)]),
+        ("L", [ligand("LIG", center)]),
+    ]
+
+
+def write_prediction(directory, chains, pae_tokens=12):
+    directory.mkdir(parents=True, exist_ok=True)
+    cif = write_cif(directory / CIF_FILENAME, chains)
+    np.savez(directory / PAE_FILENAME, pae=np.full((pae_tokens, pae_tokens), 3.0))
+    return str(cif), str(directory / PAE_FILENAME)
+
+
+@pytest.fixture
+def no_sasa(monkeypatch):
+    def complex_sasa(tokenized):
+        raise AssertionError("SASA computed for a pose that failed the prefilter")
+
+    monkeypatch.setattr(sasa, "complex_sasa", complex_sasa)
+
+
+def test_bound_pose_gets_full_metrics(tmp_path):
+    cif, pae = write_prediction(tmp_path, ligand_at((5.7, 4.0, 0.0)))
+
+    result = analyze_prediction(cif, pae, staged=True)
+
+    staged = result["staged"]
+    assert staged["passed"] and staged["failed_checks"] == []
+    assert list(staged["checks"]) == ["bounding_box", "ligand_distance", "clashes"]
+    assert staged["skipped_metrics"] == [] and staged["estimated_seconds_saved"] == 0.0
+    assert result["protein_ligand_metrics"]["steric_clashes"]["clash_count"] == (
+        staged["checks"]["clashes"]["clash_count"]
+    )
+
+
+def test_unstaged_response_is_unchanged(tmp_path):
+    cif, pae = write_prediction(tmp_path, ligand_at((5.7, 4.0, 0.0)))
+    assert "staged" not in analyze_prediction(cif, pae)
+
+
+def test_distant_ligand_fails_on_the_summary_alone(tmp_path, no_sasa):
+    cif, pae = write_prediction(tmp_path, ligand_at((5.7, 30.0, 0.0)))
+
+    result = analyze_prediction(cif, pae, staged=True)
+
+    assert "protein_ligand_metrics" not in result
+    assert result["staged"]["failed_checks"] == ["bounding_box"]
+    # Later checks never ran
+    assert list(result["staged"]["checks"]) == ["bounding_box"]
+    assert result["staged"]["skipped_metrics"] == ["ligand_metrics"]
+
+
+def test_centroid_distance_threshold(tmp_path, no_sasa):
+    cif, pae = write_prediction(tmp_path, ligand_at((5.7, 10.0, 0.0)))
+
+    result = analyze_prediction(
+        cif, pae, staged=True, thresholds={"box_margin": 20.0, "max_ligand_distance": 5.0}
+    )
+
+    check = result["staged"]["checks"]["ligand_distance"]
+    assert not check["passed"] and check["value"] > 5.0
+    assert result["staged"]["failed_checks"] == ["ligand_distance"]
+
+
+def test_clashing_pose_is_rejected(tmp_path, no_sasa):
+    # Ring centred on the A2/A3 backbone
+    cif, pae = write_prediction(tmp_path, ligand_at((5.7, 0.3, 0.0)))
+
+    result = analyze_prediction(cif, pae, staged=True, thresholds={"max_clashes": 2})
+
+    check = result["staged"]["checks"]["clashes"]
+    assert check["clash_count"] > 2
+    assert result["staged"]["failed_checks"] == ["clashes"]
+
+
+def test_protein_pair_without_interface(tmp_path, no_sasa):
+    cif = write_cif(tmp_path / CIF_FILENAME, [
+        ("A", [residue("ALA", (3.8 * i, 0.0, 0.0)) for i in range(4)]),
+        ("B", [residue("ALA", (3.8 * i, 40.0, 0.0)) for i in range(4)]),
+    ])
+
+    result = analyze_prediction(str(cif), staged=True)
+
+    assert result["prediction_type"] == "protein_protein"
+    assert result["staged"]["checks"]["interface_contacts"]["value"] == 0
+    assert result["staged"]["skipped_metrics"] == [
+        "buried_surface_area", "contact_residue_overlap"
+    ]
+
+
+def test_savings_estimated_from_past_runs(tmp_path):
+    cif, pae = write_prediction(tmp_path / "good", protein_ligand_complex(), pae_tokens=15)
+    analyze_prediction(cif, pae)
+
+    cif, pae = write_prediction(tmp_path / "bad", ligand_at((5.7, 30.0, 0.0)))
+    saved = analyze_prediction(cif, pae, staged=True)["staged"]["estimated_seconds_saved"]
+
+    assert saved is not None and saved >= 0
+
+
+def test_staged_analysis_endpoint(client, jobs_dir):
+    write_prediction(jobs_dir / "screen" / PREDICTION_SUBDIR, ligand_at((5.7, 0.3, 0.0)))
+
+    response = client.post("/analysis/screen", params={"staged": "true", "max_clashes": 2})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["job_id"] == "screen"
+    assert body["staged"]["failed_checks"] == ["clashes"]
+    assert body["staged"]["checks"]["clashes"]["max_clashes"] == 2
+
+    response = client.post("/analysis/screen", params={"staged": "true", "max_clashes": 1000})
+    assert response.json()["staged"]["passed"]
+    assert "protein_ligand_metrics" in response.json()
+
+    assert client.post("/analysis/screen", params={"max_clashes": -1}).status_code == 422
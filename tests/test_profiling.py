@@ -0,0 +1,72 @@
+import time
+
+from app.utils import profiling
+from app.utils.metrics import analysis_phase, record_phases, timed_metric
+from app.utils.profiling import SamplingProfiler
+
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+@timed_metric("toy")
+def toy_metric():
+    with analysis_phase("toy", "parse"):
+        busy_wait(0.02)
+    with analysis_phase("toy", "neighbor_search"):
+        busy_wait(0.03)
+
+
+def test_sampling_profiler_folds_stacks():
+    with SamplingProfiler(interval=0.001) as profiler:
+        busy_wait(0.1)
+
+    assert profiler.samples > 0
+    first = profiler.folded().splitlines()[0]
+    stack, count = first.rsplit(" ", 1)
+    assert "busy_wait (test_profiling.py" in stack.split(";")[-1]
+    assert int(count) > 0
+
+
+def test_record_phases_breakdown():
+    toy_metric()  # outside record_phases: nothing collected
+
+    with record_phases() as phases:
+        toy_metric()
+
+    assert set(phases["toy"]) == {"parse", "neighbor_search", "total"}
+    assert phases["toy"]["total"] >= phases["toy"]["parse"] + phases["toy"]["neighbor_search"]
+
+
+def test_profile_requires_admin_token(client, monkeypatch):
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", None)
+    response = client.post("/analysis/somejob?profile=true", headers={"X-Admin-Token": "x"})
+    assert response.status_code == 403
+
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", "secret")
+    response = client.post("/analysis/somejob?profile=true", headers={"X-Admin-Token": "wrong"})
+    assert response.status_code == 403
+
+
+def test_profile_analysis(client, tmp_path, monkeypatch):
+    from app.routers import analysis
+
+    (tmp_path / "profjob").mkdir()
+    monkeypatch.setattr(analysis, "BASE_JOBS_DIR", tmp_path)
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", "secret")
+
+    def fake_run_analysis(job_id):
+        toy_metric()
+        return {"job_id": job_id, "prediction_type": "protein_only"}
+
+    monkeypatch.setattr(analysis, "run_analysis", fake_run_analysis)
+
+    response = client.post("/analysis/profjob?profile=true", headers={"X-Admin-Token": "secret"})
+
+    assert response.status_code == 200
+    profile = response.json()["profile"]
+    assert set(profile["phases_seconds"]["toy"]) == {"parse", "neighbor_search", "total"}
+    assert "toy_metric" in profile["folded_stacks"]
+    assert (tmp_path / "profjob" / analysis.PROFILE_FILENAME).read_text() == profile["folded_stacks"]
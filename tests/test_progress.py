@@ -0,0 +1,31 @@
+from app.utils.progress import ProgressTracker, split_lines
+
+
+def test_progress_tracker_stages():
+    tracker = ProgressTracker()
+
+    events = [
+        tracker.feed(line)
+        for line in [
+            "Checking input data.",
+            "Calling MSA server for target input with 1 sequences",
+            "Running structure prediction for 1 input.",
+            "Predicting DataLoader 0:  50%|#####     | 1/2 [00:05<00:05]",
+            "Predicting DataLoader 0:  50%|#####     | 1/2 [00:06<00:05]",
+            "Number of failed examples: 0",
+        ]
+    ]
+
+    assert [e["stage"] for e in events if e] == [
+        "featurization", "msa", "diffusion", "diffusion", "writing"
+    ]
+    assert events[3]["percent"] == 50
+    assert events[4] is None
+
+
+def test_split_lines_handles_carriage_returns():
+    lines, rest = split_lines(b"a\rb\r\nc\npartial")
+
+    assert [line for line, _ in lines] == [b"a", b"b", b"c"]
+    assert lines[-1][1] == len(b"a\rb\r\nc\n")
+    assert rest == b"partial"
@@ -0,0 +1,75 @@
+import json
+
+from app.broker.local import LocalBroker
+from app.utils import jobs
+from app.utils.scores import extract_scores, score_index
+from app.worker import run_one
+
+PAYLOAD = {
+    "sequences": [
+        {"type": "protein", "id": "A", "sequence": "MKVKVGVNGFGRIGRLVTRAAFNSGKVDIVAINDPF"}
+    ]
+}
+
+
+def test_scores_indexed_at_completion(client, jobs_dir, fake_boltz, tmp_path):
+    broker = LocalBroker(tmp_path / "broker.db")
+    fake_boltz.setattr(jobs, "broker", broker)
+
+    job_id = client.post("/jobs", json=PAYLOAD).json()["job_id"]
+    assert run_one(broker, "worker-1")
+
+    meta = client.get(f"/jobs/{job_id}").json()
+    assert meta["scores"]["iptm"] == 0.7
+    assert meta["scores"]["affinity_pred_value"] is None
+
+    response = client.get("/rankings", params={"score": "ptm"})
+    assert response.status_code == 200
+    assert [job["job_id"] for job in response.json()["jobs"]] == [job_id]
+    assert response.json()["jobs"][0]["tenant"] == "default"
+
+
+def test_extract_scores_with_affinity(tmp_path):
+    (tmp_path / "confidence_input_model_0.json").write_text(
+        json.dumps({"confidence_score": 0.9, "ptm": 0.8, "iptm": 0.75, "complex_plddt": 0.88, "chains_ptm": {}})
+    )
+    (tmp_path / "affinity_input.json").write_text(
+        json.dumps({"affinity_pred_value": -1.2, "affinity_probability_binary": 0.9, "affinity_pred_value1": -1.0})
+    )
+
+    assert extract_scores(tmp_path) == {
+        "confidence_score": 0.9,
+        "ptm": 0.8,
+        "iptm": 0.75,
+        "complex_plddt": 0.88,
+        "affinity_pred_value": -1.2,
+        "affinity_probability_binary": 0.9,
+    }
+
+
+def test_rankings_order_and_filters(client, jobs_dir):
+    index = score_index()
+    index.put("weak", {"iptm": 0.9, "affinity_pred_value": 1.5, "affinity_probability_binary": 0.2}, tenant="a")
+    index.put("tight", {"iptm": 0.6, "affinity_pred_value": -2.0, "affinity_probability_binary": 0.95}, tenant="a")
+    index.put("mid", {"iptm": 0.8, "affinity_pred_value": 0.1, "affinity_probability_binary": 0.7}, tenant="b")
+    index.put("apo", {"iptm": 0.7})
+
+    ranked = client.get("/rankings", params={"score": "iptm", "limit": 2}).json()
+    assert [job["job_id"] for job in ranked["jobs"]] == ["weak", "mid"]
+
+    # Lower predicted affinity (log10 IC50) ranks first; jobs without it are left out
+    ranked = client.get("/rankings", params={"score": "affinity_pred_value"}).json()
+    assert [job["job_id"] for job in ranked["jobs"]] == ["tight", "mid", "weak"]
+
+    ranked = client.get(
+        "/rankings",
+        params={"score": "iptm", "where": ["affinity_probability_binary>=0.5", "iptm<0.8"]},
+    ).json()
+    assert [job["job_id"] for job in ranked["jobs"]] == ["tight"]
+
+    ranked = client.get("/rankings", params={"score": "iptm", "tenant": "b"}).json()
+    assert [job["job_id"] for job in ranked["jobs"]] == ["mid"]
+
+    assert client.get("/rankings", params={"score": "plddt; DROP TABLE scores"}).status_code == 422
+    assert client.get("/rankings", params={"where": "iptm>=high"}).status_code == 422
+    assert client.get("/rankings", params={"where": "job_id>0"}).status_code == 422
@@ -0,0 +1,108 @@
+import json
+import subprocess
+import sys
+import time
+
+import pytest
+
+from app.utils import resources
+from app.utils.resources import DurationEstimator, ResourceMonitor
+
+# Burns CPU in a child, then exits
+CHILD = """
+import time
+start = time.process_time()
+while time.process_time() - start < 0.4:
+    pass
+"""
+
+# Allocates ~64 MB and waits on the child, then lingers to be sampled
+WORKLOAD = f"""
+import subprocess, sys, time
+ballast = bytearray(64 * 2**20)
+subprocess.run([sys.executable, "-c", {CHILD!r}])
+time.sleep(0.3)
+"""
+
+
+def test_monitor_samples_the_process_tree(tmp_path, monkeypatch):
+    monkeypatch.setattr(resources, "_nvml_available", False)
+    (tmp_path / "out.bin").write_bytes(b"x" * 1000)
+
+    process = subprocess.Popen([sys.executable, "-c", WORKLOAD])
+    monitor = ResourceMonitor(process.pid, interval=0.05).start()
+    process.wait()
+    usage = monitor.stop(tmp_path, log_bytes=12)
+
+    assert usage["peak_rss_bytes"] >= 64 * 2**20
+    # The child's CPU counts, although it exited before the parent
+    assert usage["cpu_seconds"] >= 0.3
+    assert usage["wall_seconds"] >= usage["cpu_seconds"]
+    assert usage["peak_gpu_memory_bytes"] is None
+    assert usage["gpu_memory_source"] == "unavailable"
+    assert (usage["output_bytes"], usage["log_bytes"]) == (1000, 12)
+    assert usage["samples"] > 1
+
+
+def test_duration_estimates_by_token_count(tmp_path):
+    path = tmp_path / "durations.ndjson"
+    estimator = DurationEstimator(path)
+    assert estimator.estimate(100) is None
+
+    for seconds in (90.0, 100.0, 400.0):
+        estimator.observe(100, seconds)
+    estimator.observe(1000, 2000.0)
+
+    # Median rate of the 64-127 bucket
+    assert estimator.estimate(120) == pytest.approx(120.0)
+    # Nearest bucket with runs: 512-1023
+    assert estimator.estimate(3000) == pytest.approx(6000.0)
+    assert estimator.estimate(None) is None
+
+    # A new process reads the history back from the log
+    assert DurationEstimator(path).estimate(120) == pytest.approx(120.0)
+    assert len(path.read_text().splitlines()) == 4
+
+
+def test_first_observation_counts_once(tmp_path):
+    estimator = DurationEstimator(tmp_path / "durations.ndjson")
+    estimator.observe(100, 50.0)
+
+    assert [len(runs) for runs in estimator._buckets.values()] == [1]
+
+
+def wait_for(client, job_id, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        meta = client.get(f"/jobs/{job_id}").json()
+        if meta["status"] in ("COMPLETED", "FAILED", "CANCELLED", "TIMED_OUT"):
+            return meta
+        time.sleep(0.05)
+    raise AssertionError(f"{job_id} did not finish")
+
+
+def test_job_records_resources_and_trains_estimator(client, jobs_dir, fake_boltz):
+    request = {"sequences": [{"type": "protein", "id": "A", "sequence": "MKVKVGVNGFGRIG"}]}
+
+    first = client.post("/jobs", json=request).json()["job_id"]
+    meta = wait_for(client, first)
+
+    assert meta["status"] == "COMPLETED"
+    assert meta["estimated_duration_seconds"] is None
+    usage = meta["resources"]
+    assert usage["wall_seconds"] > 0
+    assert usage["output_bytes"] > 0 and usage["log_bytes"] > 0
+    assert usage["gpu_memory_source"] in ("unavailable", "nvml")
+
+    history = [json.loads(line) for line in (jobs_dir / resources.DURATION_LOG_FILENAME).read_text().splitlines()]
+    assert history == [{"tokens": meta["estimated_tokens"], "wall_seconds": usage["wall_seconds"]}]
+
+    # Estimated from the first run
+    second = client.post("/jobs", json=request).json()["job_id"]
+    meta = wait_for(client, second)
+    assert meta["estimated_duration_seconds"] == pytest.approx(usage["wall_seconds"], abs=0.1)
+
+    line = client.get(f"/jobs/{second}/results").json()["results"][0]
+    assert line["resources"] == meta["resources"]
+
+    assert 'boltz_job_wall_seconds_count{status="COMPLETED"}' in client.get("/metrics").text
@@ -28,3 +28,60 @@ def test_results_html(client, tmp_path):
     assert response.status_code == 200
     assert "Boltz Prediction Results" in response.text
     assert "input_model_0.cif" in response.text
+
+
+def test_results_file_listing(client, tmp_path, monkeypatch):
+    job_id = "testjob456"
+
+    pred_dir = (
+        tmp_path
+        / job_id
+        / "outputs"
+        / "boltz_results_input"
+        / "predictions"
+        / "input"
+    )
+    pred_dir.mkdir(parents=True)
+    (pred_dir / "input_model_0.cif").write_text("FAKE CIF CONTENT")
+    (pred_dir / "notes.txt").write_text("ignored")
+
+    from app.routers import results
+    monkeypatch.setattr(results, "BASE_JOBS_DIR", tmp_path)
+
+    response = client.get(f"/results/{job_id}/files")
+
+    assert response.status_code == 200
+    files = response.json()["files"]
+    assert [f["name"] for f in files] == ["input_model_0.cif"]
+    assert files[0]["size"] == len("FAKE CIF CONTENT")
+    assert len(files[0]["sha256"]) == 64
+
+    # Manifest is persisted once and reused afterwards
+    assert (tmp_path / job_id / "manifest.json").exists()
+
+
+def test_running_job_files_hashed_once(tmp_path, monkeypatch):
+    import json
+
+    from app.utils import manifest
+
+    job_dir = tmp_path / "running"
+    pred_dir = job_dir / "predictions"
+    pred_dir.mkdir(parents=True)
+    (job_dir / "meta.json").write_text(json.dumps({"status": "RUNNING"}))
+    cif = pred_dir / "input_model_0.cif"
+    cif.write_text("FAKE CIF CONTENT")
+
+    hashed = []
+    sha256 = manifest._sha256
+    monkeypatch.setattr(manifest, "_sha256", lambda path: hashed.append(path.name) or sha256(path))
+
+    first = manifest.load_manifest(job_dir, pred_dir)
+    assert manifest.load_manifest(job_dir, pred_dir) == first
+    assert hashed == ["input_model_0.cif"]
+
+    # A file Boltz is still writing is hashed again once it changes
+    cif.write_text("FAKE CIF CONTENT, LONGER")
+    assert manifest.load_manifest(job_dir, pred_dir)["files"][0]["sha256"] != first["files"][0]["sha256"]
+    assert hashed == ["input_model_0.cif"] * 2
+    assert not (job_dir / "manifest.json").exists()
@@ -0,0 +1,63 @@
+import pytest
+
+from app.analysis import sasa
+from app.analysis.pocket import load_tokenized_structure
+from app.analysis.protein_ligand import compute_ligand_burial_percent, compute_ligand_metrics, has_ligand
+from app.analysis.protein_protein import compute_buried_surface_area
+from structures import ligand, protein_ligand_complex, residue, write_cif
+
+
+def test_burial_shares_complex_sasa(tmp_path):
+    cif = str(write_cif(tmp_path / "model.cif", protein_ligand_complex()))
+    sasa.sasa_cache.clear()
+    misses = sasa.sasa_cache.misses
+
+    assert has_ligand(cif)
+    burial = compute_ligand_burial_percent(cif)
+    per_ligand = compute_ligand_metrics(cif)["ligands"]["L"]["burial"]
+
+    # One complex SASA run served both metrics
+    assert sasa.sasa_cache.misses == misses + 1
+    assert burial == per_ligand
+    assert 0 < burial["ligand_burial_percent"] < 100
+
+
+def test_has_ligand_ignores_small_residues(tmp_path):
+    chains = [
+        ("A", [residue("ALA", (3.8 * i, 0.0, 0.0)) for i in range(3)]),
+        ("L", [ligand("ACE", (3.8, 5.0, 0.0), n_atoms=3)]),
+    ]
+    cif = str(write_cif(tmp_path / "model.cif", chains))
+
+    assert not has_ligand(cif)
+    with pytest.raises(ValueError, match="No ligand detected"):
+        compute_ligand_burial_percent(cif)
+
+
+def test_buried_surface_area_from_coordinates(tmp_path):
+    chains = [
+        ("A", [residue("ALA", (3.8 * i, 0.0, 0.0)) for i in range(4)]),
+        ("B", [residue("ALA", (3.8 * i, 4.5, 0.0)) for i in range(4)]),
+    ]
+    cif = str(write_cif(tmp_path / "model.cif", chains))
+
+    result = compute_buried_surface_area(cif)
+
+    assert (result["chain_A"], result["chain_B"]) == ("A", "B")
+    assert result["buried_surface_area"] > 0
+    assert result["sasa_complex"] < result["sasa_chain_A"] + result["sasa_chain_B"]
+
+
+def test_sasa_algorithm_is_tunable(tmp_path):
+    cif = str(write_cif(tmp_path / "model.cif", protein_ligand_complex()))
+    tokenized = load_tokenized_structure(cif)
+
+    exact = sasa.complex_sasa(tokenized)["areas"].sum()
+    shrake_rupley = sasa.complex_sasa(tokenized, algorithm="shrake-rupley")["areas"].sum()
+    coarse = sasa.complex_sasa(tokenized, algorithm="lee-richards", resolution=5)["areas"].sum()
+
+    assert shrake_rupley == pytest.approx(exact, rel=0.05)
+    assert coarse != exact
+
+    with pytest.raises(ValueError, match="Unknown SASA algorithm"):
+        sasa.sasa_parameters("voronoi")
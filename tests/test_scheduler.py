@@ -0,0 +1,140 @@
+import threading
+import time
+
+from app.utils.scheduler import JobScheduler, ScheduledJob
+
+
+def run_in_order(scheduler, jobs):
+    """
+    Hold the single slot with a blocker, queue jobs, then record the
+    order in which they are started.
+    """
+    started = []
+    gate = threading.Event()
+    blocker = scheduler.submit(ScheduledJob("blocker", run=gate.wait, tenant="x"))
+
+    for job_id, tenant, priority in jobs:
+        scheduler.submit(
+            ScheduledJob(
+                job_id,
+                run=lambda job_id=job_id: started.append(job_id),
+                tenant=tenant,
+                priority=priority,
+            )
+        )
+
+    gate.set()
+    blocker.wait()
+    deadline = time.time() + 5
+    while len(started) < len(jobs) and time.time() < deadline:
+        time.sleep(0.01)
+    return started
+
+
+def test_interactive_before_bulk():
+    scheduler = JobScheduler(max_concurrency=1)
+
+    order = run_in_order(scheduler, [
+        ("bulk-1", "a", "bulk"),
+        ("bulk-2", "a", "bulk"),
+        ("interactive-1", "b", "interactive"),
+    ])
+
+    assert order[0] == "interactive-1"
+
+
+def test_fair_share_between_tenants():
+    scheduler = JobScheduler(max_concurrency=1)
+
+    order = run_in_order(scheduler, [
+        ("a-1", "a", "bulk"),
+        ("a-2", "a", "bulk"),
+        ("a-3", "a", "bulk"),
+        ("b-1", "b", "bulk"),
+    ])
+
+    # Tenant b does not wait behind all of tenant a's campaign
+    assert order.index("b-1") <= 1
+
+
+def test_aging_prevents_starvation():
+    scheduler = JobScheduler(max_concurrency=1, aging_seconds=0.05)
+    gate = threading.Event()
+    scheduler.submit(ScheduledJob("blocker", run=gate.wait))
+
+    scheduler.submit(ScheduledJob("old-bulk", run=lambda: None, tenant="a", priority="bulk"))
+    time.sleep(0.1)
+    scheduler.submit(ScheduledJob("new-interactive", run=lambda: None, tenant="a"))
+
+    assert scheduler.queue_info("old-bulk")["position"] == 1
+
+
+def test_tenant_concurrency_limit_and_queue_info():
+    scheduler = JobScheduler(max_concurrency=2, tenant_max_concurrency=1)
+    gate = threading.Event()
+
+    scheduler.submit(ScheduledJob("a-1", run=gate.wait, tenant="a"))
+    scheduler.submit(ScheduledJob("a-2", run=gate.wait, tenant="a"))
+
+    # One free global slot, but tenant a is at its cap
+    assert scheduler.stats()["running"] == 1
+    info = scheduler.queue_info("a-2")
+    assert info["position"] == 1
+    assert info["estimated_start_seconds"] == 0.0
+
+    assert scheduler.cancel("a-2")
+    gate.set()
+
+
+def test_queue_info_positions_follow_dispatch_order():
+    scheduler = JobScheduler(max_concurrency=1)
+    gate = threading.Event()
+    started = []
+    blocker = scheduler.submit(ScheduledJob("blocker", run=gate.wait))
+
+    def job(job_id, priority):
+        return ScheduledJob(job_id, run=lambda: started.append(job_id), priority=priority)
+
+    scheduler.submit_many([job("bulk-1", "bulk"), job("bulk-2", "bulk")])
+    scheduler.submit_many([job("interactive-1", "interactive"), job("interactive-2", "interactive")])
+
+    positions = {
+        job_id: scheduler.queue_info(job_id)["position"]
+        for job_id in ("bulk-1", "bulk-2", "interactive-1", "interactive-2")
+    }
+    assert sorted(positions.values()) == [1, 2, 3, 4]
+    assert scheduler.queue_info("blocker") is None
+
+    gate.set()
+    blocker.wait()
+    deadline = time.time() + 5
+    while (len(started) < 4 or scheduler.stats()["running"]) and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert started == sorted(positions, key=positions.get)
+    assert scheduler._running_by_tenant == {} and scheduler._groups == {}
+
+
+def test_wait_async_holds_no_thread():
+    import asyncio
+
+    scheduler = JobScheduler(max_concurrency=1)
+    gate = threading.Event()
+    job = scheduler.submit(ScheduledJob("slow", run=lambda: gate.wait() and "done"))
+    cancelled = scheduler.submit(ScheduledJob("queued", run=lambda: "never"))
+
+    async def main():
+        waiters = [asyncio.ensure_future(job.wait_async()) for _ in range(200)]
+        scheduler.cancel("queued")
+        try:
+            await cancelled.wait_async()
+        except Exception as e:
+            error = e
+        assert threading.active_count() < 50
+        gate.set()
+        return await asyncio.gather(*waiters), error
+
+    results, error = asyncio.run(main())
+
+    assert results == ["done"] * 200
+    assert "cancelled while queued" in str(error)
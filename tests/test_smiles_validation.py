@@ -0,0 +1,28 @@
+from app.utils.validation import smiles_cache, validate_smiles, validate_smiles_batch
+
+
+def test_validate_smiles_returns_canonical():
+    assert validate_smiles(" C1=CC=NC=C1 ") == "c1ccncc1"
+
+
+def test_validate_smiles_batch_parallel_matches_serial():
+    smiles = ["c1ccncc1", "C1=CC=NC=C1", "not a smiles", "CCO", "CCCCCC"] * 3
+
+    serial = validate_smiles_batch(smiles, parallel=False)
+    smiles_cache.clear()
+    parallel = validate_smiles_batch(smiles, parallel=True)
+
+    assert serial == parallel
+    assert [r["valid"] for r in serial[:5]] == [True, True, False, True, True]
+    assert serial[0]["canonical_smiles"] == serial[1]["canonical_smiles"]
+    assert serial[4]["heavy_atoms"] == 6
+    assert serial[4]["rotatable_bonds"] == 3
+
+
+def test_validate_smiles_endpoint(client):
+    response = client.post("/validate/smiles", json={"smiles": ["CCO", "OCC", "xyz"]})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["valid"] == 2
+    assert data["unique_canonical"] == 1
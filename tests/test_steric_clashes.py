@@ -1,12 +1,28 @@
-from app.analysis.protein_ligand import compute_steric_clashes
+from app.analysis.protein_ligand import compute_ligand_metrics, compute_steric_clashes
+from structures import ligand, residue, write_cif
 
 
-def test_steric_clashes():
-    cif_path = (
-        "/tmp/boltz_jobs/4cc6fe181d664f9c8fd15670ccc3e317/"
-        "outputs/boltz_results_input/predictions/input/input_model_0.cif"
-    )
+def test_steric_clashes(tmp_path):
+    cofactor = ("NAP", [
+        ("C1", "C", (11.4, 0.6, 0.0)),  # 0.6 Å from A3 CA
+        ("C2", "C", (11.4, 2.1, 0.0)),
+    ])
+    cif = write_cif(tmp_path / "model.cif", [
+        ("A", [residue("ALA", (3.8 * i, 0.0, 0.0)) for i in range(4)]),
+        ("L", [ligand("LIG", (5.7, 0.3, 0.0))]),
+        ("M", [cofactor]),
+        # Overlaps the protein, but nucleotides are not ligands
+        ("D", [residue("DA", (3.8, 0.2, 0.0))]),
+    ])
 
-    result = compute_steric_clashes(cif_path)
+    result = compute_steric_clashes(str(cif))
 
-    assert result is not None
+    # The per-ligand metrics count the same clashes
+    per_ligand = compute_ligand_metrics(str(cif))["ligands"]
+    assert result["clash_count"] == sum(
+        entry["steric_clashes"]["clash_count"] for entry in per_ligand.values()
+    )
+    assert result["clash_count"] > 0
+    assert result["worst_overlap_angstrom"] == max(
+        entry["steric_clashes"]["worst_overlap_angstrom"] for entry in per_ligand.values()
+    )
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from app.analysis import pocket, summary
+from app.analysis.pipeline import CIF_FILENAME, CONTACTS_FILENAME, write_structure_artifacts
+from app.analysis.protein_ligand import detect_prediction_type, has_ligand
+from structures import dna_duplex, ligand, protein_ligand_complex, residue, write_cif
+
+
+def test_summary_contents(tmp_path):
+    cif = write_cif(tmp_path / "model.cif", protein_ligand_complex())
+    result = summary.summarize_structure(pocket.load_tokenized_structure(str(cif)))
+
+    assert result["prediction_type"] == "protein_ligand"
+    assert (result["n_residues"], result["n_tokens"]) == (8, 15)
+    assert result["entities"] == {
+        "1": {"kind": "protein", "chains": ["A"]},
+        "2": {"kind": "protein", "chains": ["B"]},
+        "3": {"kind": "ligand", "chains": ["L"]},
+    }
+
+    chain_a = result["chains"]["A"]
+    assert (chain_a["residues"], chain_a["atoms"], chain_a["tokens"]) == (4, 20, 4)
+    assert chain_a["bounding_box"] == {"min": [-1.2, -1.5, 0.0], "max": [12.7, 1.7, 0.3]}
+    assert result["chains"]["L"]["tokens"] == 8
+
+    assert result["ligands"] == [
+        {"key": "L", "chain": "L", "resname": "LIG", "residue_number": 1, "heavy_atoms": 8}
+    ]
+    # B sits 40 Å away from both
+    assert [(p["chain_a"], p["chain_b"]) for p in result["interface_pairs"]] == [("A", "L")]
+
+
+@pytest.mark.parametrize(
+    "chains, expected",
+    [
+        ([("A", [residue("ALA", (0.0, 0.0, 0.0))])], "protein_only"),
+        (
+            [("A", [residue("ALA", (3.8 * i, 0.0, 0.0)) for i in range(3)]),
+             ("B", [residue("ALA", (3.8 * i, 4.5, 0.0)) for i in range(3)])],
+            "protein_protein",
+        ),
+        ([("A", [residue("LYS", (0.0, 12.0, 0.0))])] + dna_duplex(4), "protein_dna_rna"),
+        # Small caps are still ligands for routing; has_ligand is stricter
+        (
+            [("A", [residue("ALA", (3.8 * i, 0.0, 0.0)) for i in range(3)]),
+             ("L", [ligand("ACE", (3.8, 5.0, 0.0), n_atoms=3)])],
+            "protein_ligand",
+        ),
+    ],
+)
+def test_prediction_types(tmp_path, chains, expected):
+    cif = str(write_cif(tmp_path / "model.cif", chains))
+    assert detect_prediction_type(cif) == expected
+
+
+def test_detection_reads_stored_summary(tmp_path, monkeypatch):
+    cif = write_cif(tmp_path / CIF_FILENAME, protein_ligand_complex())
+    write_structure_artifacts(tmp_path)
+
+    stored = json.loads(summary.summary_path(cif).read_text())
+    assert stored["prediction_type"] == "protein_ligand"
+    assert (tmp_path / CONTACTS_FILENAME).exists()
+
+    # A fresh process: nothing in memory, and the CIF must not be parsed
+    summary.summary_cache.clear()
+    pocket.structure_cache.clear()
+
+    def parse(cif_path):
+        raise AssertionError("CIF parsed despite a stored summary")
+
+    monkeypatch.setattr(pocket, "parse_tokenized_structure", parse)
+    assert detect_prediction_type(str(cif)) == "protein_ligand"
+    assert has_ligand(str(cif))
+
+
+def test_stale_summary_is_recomputed(tmp_path):
+    cif = write_cif(tmp_path / CIF_FILENAME, protein_ligand_complex())
+    write_structure_artifacts(tmp_path)
+    assert detect_prediction_type(str(cif)) == "protein_ligand"
+
+    # Replaced structure: the stored summary no longer matches its size
+    write_cif(cif, [("A", [residue("ALA", (3.8 * i, 0.0, 0.0)) for i in range(4)])])
+    assert detect_prediction_type(str(cif)) == "protein_only"